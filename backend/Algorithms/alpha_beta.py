@@ -1,42 +1,117 @@
 """
 Minimax algorithm WITH Alpha-Beta pruning
+
+The search makes and takes back moves on the board it is given
+(drop_disc / undo_disc) instead of copying it for every child.
 """
 import time
-from game.board import AI, HUMAN
+from game.board import AI, HUMAN, ZOBRIST_SIDE_KEY, canonical_key, mirror_column
 from game.heuristic import evaluate_board
+from Algorithms.transposition import EXACT, LOWER_BOUND, UPPER_BOUND
+from Algorithms.search_control import restoring
+from Trees.tree_recording import TREE_FULL, DEFAULT_TREE_LEVELS, recorded_plies
 
 class AlphaBetaAlgorithm:
-    def __init__(self, depth_limit=4):
+    def __init__(self, depth_limit=4, transposition_table=None, move_orderer=None,
+                 tree_mode=TREE_FULL, tree_levels=DEFAULT_TREE_LEVELS):
         self.depth_limit = depth_limit
+        # Nodes deeper than this ply are searched without building tree dicts
+        self.record_plies = recorded_plies(tree_mode, tree_levels)
         self.nodes_expanded = 0
         self.start_time = None
+        # Optional Algorithms.transposition.TranspositionTable
+        self.transposition_table = transposition_table
+        # Optional Algorithms.move_ordering.MoveOrderer (None keeps column order)
+        self.move_orderer = move_orderer
+        # Optional Algorithms.search_control.Deadline
+        self.deadline = None
+        # Principal variation of the last completed search, tried first by
+        # the next one (iterative deepening)
+        self.pv = ()
     
     def get_best_move(self, board):
         """
         Get the best move for AI using minimax with alpha-beta pruning
         Returns: (best_column, tree_structure, stats)
         """
-        self.nodes_expanded = 0
-        self.start_time = time.time()
+        self.reset_search()
+        best_pv = ()
         
         best_col = None
         best_value = -1e12
         alpha = -1e12
         beta = 1e12
         tree_children = []
+        record = self.record_plies >= 1
         
-        valid_columns = board.get_valid_columns()
+        valid_columns = self.order_moves(board.get_valid_columns(), 0, True)
         
-        for col in valid_columns:
-            # Create a copy and make the move
-            temp_board = board.copy()
-            temp_board.drop_disc(col, AI)
-            
-            # Call alpha-beta for the opponent's turn
-            value, child_tree = self.alpha_beta(temp_board, self.depth_limit - 1, 
+        with restoring(board):
+            for col in valid_columns:
+                # Ties go to the leftmost column. A column left of the current
+                # best is searched with alpha - 1 so an equal value comes back exact.
+                child_alpha = alpha - 1 if best_col is not None and col < best_col else alpha
+                
+                # Make the move, search the opponent's turn, take it back
+                board.drop_disc(col, AI)
+                value, child_tree = self.alpha_beta(board, self.depth_limit - 1,
+                                                    child_alpha, beta, False)
+                board.undo_disc()
+                
+                # Build tree node for this column
+                if record:
+                    tree_children.append({
+                        'column': col,
+                        'value': value,
+                        'type': 'max',
+                        'alpha': alpha,
+                        'beta': beta,
+                        'children': [child_tree] if child_tree else []
+                    })
+                
+                if value > best_value or (value == best_value and col < best_col):
+                    best_value = value
+                    best_col = col
+                    best_pv = (col,) + self.pv_table[1]
+                
+                alpha = max(alpha, value)
+        
+        self.pv = best_pv
+        time_taken = time.time() - self.start_time
+        
+        # Build complete tree
+        tree = None
+        if self.record_plies >= 0:
+            tree = {
+                'column': best_col,
+                'value': best_value,
+                'type': 'root',
+                'alpha': alpha,
+                'beta': beta,
+                'children': tree_children
+            }
+        
+        stats = self.build_stats(best_value, best_pv, time_taken)
+        
+        return best_col, tree, stats
+    
+    def search_move(self, board, col, alpha=-1e12, beta=1e12):
+        """
+        Search a single root move with the given window
+        (used by the parallel root splitter)
+        Returns: (value, tree_node, stats), tree_node being the root's child for col
+        """
+        self.reset_search()
+        self.follow_pv = False
+        
+        with restoring(board):
+            board.drop_disc(col, AI)
+            value, child_tree = self.alpha_beta(board, self.depth_limit - 1,
                                                 alpha, beta, False)
-            
-            # Build tree node for this column
+            board.undo_disc()
+        
+        tree_node = None
+        if self.record_plies >= 1:
             tree_node = {
                 'column': col,
                 'value': value,
@@ -45,33 +120,37 @@ class AlphaBetaAlgorithm:
                 'beta': beta,
                 'children': [child_tree] if child_tree else []
             }
-            tree_children.append(tree_node)
-            
-            if value > best_value:
-                best_value = value
-                best_col = col
-            
-            alpha = max(alpha, value)
-        
-        time_taken = time.time() - self.start_time
         
-        # Build complete tree
-        tree = {
-            'column': best_col,
-            'value': best_value,
-            'type': 'root',
-            'alpha': alpha,
-            'beta': beta,
-            'children': tree_children
-        }
+        stats = self.build_stats(value, (col,) + self.pv_table[1],
+                                 time.time() - self.start_time)
+        return value, tree_node, stats
+    
+    def reset_search(self):
+        """Reset counters and principal variation state for a new search"""
+        self.nodes_expanded = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.start_time = time.time()
+        if self.transposition_table is not None:
+            self.transposition_table.reset_stats()
         
+        self.previous_pv = self.pv
+        self.follow_pv = True
+        self.pv_table = [()] * (self.depth_limit + 1)
+    
+    def build_stats(self, evaluation, pv, time_taken):
+        """Stats dict returned with a search result"""
         stats = {
             'nodesExpanded': self.nodes_expanded,
             'timeTaken': time_taken,
-            'evaluation': best_value
+            'evaluation': evaluation,
+            'principalVariation': list(pv),
+            'cutoffs': self.cutoffs,
+            'firstMoveCutoffs': self.first_move_cutoffs
         }
-        
-        return best_col, tree, stats
+        if self.transposition_table is not None:
+            stats.update(self.transposition_table.get_stats())
+        return stats
     
     def alpha_beta(self, board, depth, alpha, beta, is_maximizing):
         """
@@ -88,10 +167,18 @@ class AlphaBetaAlgorithm:
             (value, tree_node)
         """
         self.nodes_expanded += 1
+        if self.deadline is not None and not self.nodes_expanded % self.deadline.CHECK_INTERVAL:
+            self.deadline.check()
+        
+        ply = self.depth_limit - depth
+        self.pv_table[ply] = ()
+        record = ply <= self.record_plies
         
         # Terminal conditions
         if depth == 0 or board.is_terminal():
             eval_value = evaluate_board(board)
+            if not record:
+                return eval_value, None
             return eval_value, {
                 'value': eval_value,
                 'type': 'leaf',
@@ -101,39 +188,97 @@ class AlphaBetaAlgorithm:
                 'children': []
             }
         
-        valid_columns = board.get_valid_columns()
+        # Transposition table lookup. Only entries searched to exactly this
+        # depth are used, so results match a search without the table.
+        tt = self.transposition_table
+        alpha_orig = alpha
+        beta_orig = beta
+        tt_move = None
+        if tt is not None:
+            # Mirror images share an entry; moves are stored in the key's orientation
+            key, mirrored = canonical_key(board.hash, board.mirror_hash)
+            if is_maximizing:
+                key ^= ZOBRIST_SIDE_KEY
+            entry = tt.probe(key)
+            if entry is not None:
+                tt_move = entry[3]
+                if mirrored and tt_move is not None:
+                    tt_move = mirror_column(tt_move)
+            if entry is not None and entry[0] == depth:
+                _, tt_value, bound, _ = entry
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, tt_value)
+                elif bound == UPPER_BOUND:
+                    beta = min(beta, tt_value)
+                if bound == EXACT or alpha >= beta:
+                    if not record:
+                        return tt_value, None
+                    return tt_value, {
+                        'value': tt_value,
+                        'type': 'leaf',
+                        'depth': self.depth_limit - depth,
+                        'alpha': alpha,
+                        'beta': beta,
+                        'transposition': True,
+                        'children': []
+                    }
+        
+        valid_columns = self.order_moves(board.get_valid_columns(), ply,
+                                         is_maximizing, tt_move)
+        best_col = None
+        # Children are recorded one ply deeper
+        record_children = ply + 1 <= self.record_plies
+        node = None
         
         if is_maximizing:
             # Maximizing player (AI)
             max_value = -1e12
-            children_trees = []
+            children_trees = [] if record else None
             
-            for col in valid_columns:
-                temp_board = board.copy()
-                temp_board.drop_disc(col, AI)
-                
-                value, child_tree = self.alpha_beta(temp_board, depth - 1, 
+            for index, col in enumerate(valid_columns):
+                board.drop_disc(col, AI)
+                value, child_tree = self.alpha_beta(board, depth - 1,
                                                     alpha, beta, False)
+                board.undo_disc()
                 
-                node = {
-                    'column': col,
-                    'value': value,
-                    'type': 'max',
-                    'depth': self.depth_limit - depth,
-                    'alpha': alpha,
-                    'beta': beta,
-                    'children': [child_tree] if child_tree else []
-                }
-                children_trees.append(node)
+                if record_children:
+                    node = {
+                        'column': col,
+                        'value': value,
+                        'type': 'max',
+                        'depth': self.depth_limit - depth,
+                        'alpha': alpha,
+                        'beta': beta,
+                        'children': [child_tree] if child_tree else []
+                    }
+                    children_trees.append(node)
                 
-                max_value = max(max_value, value)
+                if value > max_value:
+                    max_value = value
+                    best_col = col
+                    self.pv_table[ply] = (col,) + self.pv_table[ply + 1]
                 alpha = max(alpha, value)
                 
                 # Beta cutoff (pruning)
                 if beta <= alpha:
-                    node['pruned'] = True
+                    if node is not None:
+                        node['pruned'] = True
+                    self.record_cutoff(col, index, ply, True, depth)
                     break
             
+            if tt is not None:
+                if max_value <= alpha_orig:
+                    bound = UPPER_BOUND
+                elif max_value >= beta_orig:
+                    bound = LOWER_BOUND
+                else:
+                    bound = EXACT
+                if mirrored and best_col is not None:
+                    best_col = mirror_column(best_col)
+                tt.store(key, depth, max_value, bound, best_col)
+            
+            if not record:
+                return max_value, None
             return max_value, {
                 'value': max_value,
                 'type': 'max',
@@ -146,34 +291,52 @@ class AlphaBetaAlgorithm:
         else:
             # Minimizing player (Human)
             min_value = 1e12
-            children_trees = []
+            children_trees = [] if record else None
             
-            for col in valid_columns:
-                temp_board = board.copy()
-                temp_board.drop_disc(col, HUMAN)
-                
-                value, child_tree = self.alpha_beta(temp_board, depth - 1, 
+            for index, col in enumerate(valid_columns):
+                board.drop_disc(col, HUMAN)
+                value, child_tree = self.alpha_beta(board, depth - 1,
                                                     alpha, beta, True)
+                board.undo_disc()
                 
-                node = {
-                    'column': col,
-                    'value': value,
-                    'type': 'min',
-                    'depth': self.depth_limit - depth,
-                    'alpha': alpha,
-                    'beta': beta,
-                    'children': [child_tree] if child_tree else []
-                }
-                children_trees.append(node)
+                if record_children:
+                    node = {
+                        'column': col,
+                        'value': value,
+                        'type': 'min',
+                        'depth': self.depth_limit - depth,
+                        'alpha': alpha,
+                        'beta': beta,
+                        'children': [child_tree] if child_tree else []
+                    }
+                    children_trees.append(node)
                 
-                min_value = min(min_value, value)
+                if value < min_value:
+                    min_value = value
+                    best_col = col
+                    self.pv_table[ply] = (col,) + self.pv_table[ply + 1]
                 beta = min(beta, value)
                 
                 # Alpha cutoff (pruning)
                 if beta <= alpha:
-                    node['pruned'] = True
+                    if node is not None:
+                        node['pruned'] = True
+                    self.record_cutoff(col, index, ply, False, depth)
                     break
             
+            if tt is not None:
+                if min_value >= beta_orig:
+                    bound = LOWER_BOUND
+                elif min_value <= alpha_orig:
+                    bound = UPPER_BOUND
+                else:
+                    bound = EXACT
+                if mirrored and best_col is not None:
+                    best_col = mirror_column(best_col)
+                tt.store(key, depth, min_value, bound, best_col)
+            
+            if not record:
+                return min_value, None
             return min_value, {
                 'value': min_value,
                 'type': 'min',
@@ -181,4 +344,30 @@ class AlphaBetaAlgorithm:
                 'alpha': alpha,
                 'beta': beta,
                 'children': children_trees
-            }
\ No newline at end of file
+            }
+    
+    def order_moves(self, columns, ply, is_maximizing, tt_move=None):
+        """
+        Order columns with the move orderer (if any), then put the previous
+        search's principal variation move first while the search is still
+        following that line
+        """
+        if self.move_orderer is not None:
+            columns = self.move_orderer.order(columns, ply, is_maximizing, tt_move)
+        
+        if self.follow_pv:
+            self.follow_pv = False
+            if ply < len(self.previous_pv) and self.previous_pv[ply] in columns:
+                pv_move = self.previous_pv[ply]
+                columns.remove(pv_move)
+                columns.insert(0, pv_move)
+                self.follow_pv = True
+        return columns
+    
+    def record_cutoff(self, col, index, ply, is_maximizing, depth):
+        """Count a cutoff and let the move orderer learn from it"""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if self.move_orderer is not None:
+            self.move_orderer.record_cutoff(col, ply, is_maximizing, depth)
@@ -1,66 +1,127 @@
 """
 Expected Minimax algorithm
 Accounts for probability: 60% chosen column, 40% split between adjacent columns
+
+Neighbouring column choices share outcomes (choosing column 3 or 4 can both
+land a disc in either), so the same MAX / MIN positions come up repeatedly.
+An optional transposition table memoizes their values by (position, depth,
+side to move); each is searched once per table.
+
+The search makes and takes back moves on the board it is given
+(drop_disc / undo_disc) instead of copying it for every outcome.
 """
 import time
-from game.board import AI, HUMAN, COLS
+from game.board import AI, HUMAN, COLS, ZOBRIST_SIDE_KEY
+from Algorithms.transposition import EXACT
+from Algorithms.search_control import restoring
 from game.heuristic import evaluate_board
+from Trees.tree_recording import TREE_FULL, DEFAULT_TREE_LEVELS, recorded_plies
 
 class ExpectiminiMaxAlgorithm:
-    def __init__(self, depth_limit=4):
+    def __init__(self, depth_limit=4, transposition_table=None, tree_mode=TREE_FULL,
+                 tree_levels=DEFAULT_TREE_LEVELS):
         self.depth_limit = depth_limit
+        # Optional Algorithms.transposition.TranspositionTable used as a memo
+        self.transposition_table = transposition_table
+        # Nodes deeper than this ply are searched without building tree dicts
+        self.record_plies = recorded_plies(tree_mode, tree_levels)
         self.nodes_expanded = 0
+        self.cache_hits = 0
         self.start_time = None
+        # Optional Algorithms.search_control.Deadline
+        self.deadline = None
     
     def get_best_move(self, board):
         """
         Get the best move for AI using expectiminimax algorithm
         Returns: (best_column, tree_structure, stats)
         """
-        self.nodes_expanded = 0
-        self.start_time = time.time()
+        self.reset_search()
         
         best_col = None
         best_value = float('-inf')
         tree_children = []
+        record = self.record_plies >= 1
         
         valid_columns = board.get_valid_columns()
         
-        for col in valid_columns:
-            # Expected value for this column choice
+        with restoring(board):
+            for col in valid_columns:
+                # Expected value for this column choice
+                expected_value, child_tree = self.expectiminimax_chance(
+                    board, col, self.depth_limit - 1, False
+                )
+                
+                if record:
+                    tree_children.append({
+                        'column': col,
+                        'value': expected_value,
+                        'type': 'max',
+                        'children': [child_tree] if child_tree else []
+                    })
+                
+                if expected_value > best_value:
+                    best_value = expected_value
+                    best_col = col
+        
+        time_taken = time.time() - self.start_time
+        
+        # Build complete tree
+        tree = None
+        if self.record_plies >= 0:
+            tree = {
+                'column': best_col,
+                'value': best_value,
+                'type': 'root',
+                'children': tree_children
+            }
+        
+        stats = self.build_stats(best_value, time_taken)
+        
+        return best_col, tree, stats
+    
+    def search_move(self, board, col):
+        """
+        Search a single root move (used by the parallel root splitter)
+        Returns: (value, tree_node, stats), tree_node being the root's child for col
+        """
+        self.reset_search()
+        
+        with restoring(board):
             expected_value, child_tree = self.expectiminimax_chance(
                 board, col, self.depth_limit - 1, False
             )
-            
+        
+        tree_node = None
+        if self.record_plies >= 1:
             tree_node = {
                 'column': col,
                 'value': expected_value,
                 'type': 'max',
                 'children': [child_tree] if child_tree else []
             }
-            tree_children.append(tree_node)
-            
-            if expected_value > best_value:
-                best_value = expected_value
-                best_col = col
-        
-        time_taken = time.time() - self.start_time
-        
-        # Build complete tree
-        tree = {
-            'column': best_col,
-            'value': best_value,
-            'type': 'root',
-            'children': tree_children
-        }
         
+        stats = self.build_stats(expected_value, time.time() - self.start_time)
+        return expected_value, tree_node, stats
+    
+    def reset_search(self):
+        """Reset counters for a new search"""
+        self.nodes_expanded = 0
+        self.cache_hits = 0
+        self.start_time = time.time()
+    
+    def build_stats(self, evaluation, time_taken):
+        """Stats dict returned with a search result"""
         stats = {
             'nodesExpanded': self.nodes_expanded,
             'timeTaken': time_taken,
-            'evaluation': best_value
+            'evaluation': evaluation
         }
-        
-        return best_col, tree, stats
+        if self.transposition_table is not None:
+            # Positions answered from the memo (their subtrees are not
+            # counted in nodesExpanded)
+            stats['cacheHits'] = self.cache_hits
+        return stats
     
     def expectiminimax_chance(self, board, chosen_col, depth, is_maximizing):
         """
@@ -73,8 +134,13 @@ class ExpectiminiMaxAlgorithm:
         """
         self.nodes_expanded += 1
         
+        ply = self.depth_limit - depth
+        record = ply <= self.record_plies
+        
         if depth == 0 or board.is_terminal():
             eval_value = evaluate_board(board)
+            if not record:
+                return eval_value, None
             return eval_value, {
                 'value': eval_value,
                 'type': 'leaf',
@@ -103,6 +169,8 @@ class ExpectiminiMaxAlgorithm:
         # If no valid outcomes, return evaluation
         if not outcomes:
             eval_value = evaluate_board(board)
+            if not record:
+                return eval_value, None
             return eval_value, {
                 'value': eval_value,
                 'type': 'leaf',
@@ -116,26 +184,29 @@ class ExpectiminiMaxAlgorithm:
         
         # Calculate expected value
         expected_value = 0
-        outcome_trees = []
+        outcome_trees = [] if record else None
+        # Outcomes lead to the next ply
+        record_children = ply + 1 <= self.record_plies
         
         for actual_col, probability in outcomes:
-            temp_board = board.copy()
-            temp_board.drop_disc(actual_col, player)
-            
-            # Recursively call expectiminimax
-            value, child_tree = self.expectiminimax(temp_board, depth - 1, not is_maximizing)
+            board.drop_disc(actual_col, player)
+            value, child_tree = self.expectiminimax(board, depth - 1, not is_maximizing)
+            board.undo_disc()
             
-            outcome_trees.append({
-                'column': actual_col,
-                'probability': probability,
-                'value': value,
-                'type': 'chance',
-                'depth': self.depth_limit - depth,
-                'children': [child_tree] if child_tree else []
-            })
+            if record_children:
+                outcome_trees.append({
+                    'column': actual_col,
+                    'probability': probability,
+                    'value': value,
+                    'type': 'chance',
+                    'depth': self.depth_limit - depth,
+                    'children': [child_tree] if child_tree else []
+                })
             
             expected_value += probability * value
         
+        if not record:
+            return expected_value, None
         return expected_value, {
             'value': expected_value,
             'type': 'chance',
@@ -147,11 +218,38 @@ class ExpectiminiMaxAlgorithm:
         """
         Main expectiminimax recursive function
         """
+        ply = self.depth_limit - depth
+        record = ply <= self.record_plies
+        
+        # Memo lookup. The key is the plain hash, not the mirror-canonical
+        # one: mirrored positions sum their outcomes in a different order,
+        # which can change the last bits of the value.
+        tt = self.transposition_table
+        if tt is not None and depth > 0:
+            key = board.hash ^ ZOBRIST_SIDE_KEY if is_maximizing else board.hash
+            entry = tt.probe(key)
+            if entry is not None and entry[0] == depth:
+                self.cache_hits += 1
+                cached_value = entry[1]
+                if not record:
+                    return cached_value, None
+                return cached_value, {
+                    'value': cached_value,
+                    'type': 'max' if is_maximizing else 'min',
+                    'depth': self.depth_limit - depth,
+                    'cached': True,
+                    'children': []
+                }
+        
         self.nodes_expanded += 1
+        if self.deadline is not None and not self.nodes_expanded % self.deadline.CHECK_INTERVAL:
+            self.deadline.check()
         
         # Terminal conditions
         if depth == 0 or board.is_terminal():
             eval_value = evaluate_board(board)
+            if not record:
+                return eval_value, None
             return eval_value, {
                 'value': eval_value,
                 'type': 'leaf',
@@ -164,7 +262,7 @@ class ExpectiminiMaxAlgorithm:
         if is_maximizing:
             # Maximizing player (AI)
             max_value = float('-inf')
-            children_trees = []
+            children_trees = [] if record else None
             
             for col in valid_columns:
                 # Each choice leads to a chance node
@@ -172,16 +270,24 @@ class ExpectiminiMaxAlgorithm:
                     board, col, depth, is_maximizing
                 )
                 
-                children_trees.append({
-                    'column': col,
-                    'value': expected_value,
-                    'type': 'max',
-                    'depth': self.depth_limit - depth,
-                    'children': [child_tree] if child_tree else []
-                })
+                # The chance node sits on this ply, so its edge is recorded
+                # together with this node
+                if record:
+                    children_trees.append({
+                        'column': col,
+                        'value': expected_value,
+                        'type': 'max',
+                        'depth': self.depth_limit - depth,
+                        'children': [child_tree] if child_tree else []
+                    })
                 
                 max_value = max(max_value, expected_value)
             
+            if tt is not None:
+                tt.store(key, depth, max_value, EXACT, None)
+            
+            if not record:
+                return max_value, None
             return max_value, {
                 'value': max_value,
                 'type': 'max',
@@ -192,7 +298,7 @@ class ExpectiminiMaxAlgorithm:
         else:
             # Minimizing player (Human)
             min_value = float('inf')
-            children_trees = []
+            children_trees = [] if record else None
             
             for col in valid_columns:
                 # Each choice leads to a chance node
@@ -200,16 +306,24 @@ class ExpectiminiMaxAlgorithm:
                     board, col, depth, is_maximizing
                 )
                 
-                children_trees.append({
-                    'column': col,
-                    'value': expected_value,
-                    'type': 'min',
-                    'depth': self.depth_limit - depth,
-                    'children': [child_tree] if child_tree else []
-                })
+                # The chance node sits on this ply, so its edge is recorded
+                # together with this node
+                if record:
+                    children_trees.append({
+                        'column': col,
+                        'value': expected_value,
+                        'type': 'min',
+                        'depth': self.depth_limit - depth,
+                        'children': [child_tree] if child_tree else []
+                    })
                 
                 min_value = min(min_value, expected_value)
             
+            if tt is not None:
+                tt.store(key, depth, min_value, EXACT, None)
+            
+            if not record:
+                return min_value, None
             return min_value, {
                 'value': min_value,
                 'type': 'min',
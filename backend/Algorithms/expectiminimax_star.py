@@ -0,0 +1,362 @@
+"""
+Expectiminimax with Star1 / Star2 pruning
+
+Same game model and move choice as ExpectiminiMaxAlgorithm (60% chosen
+column, 40% split between the adjacent columns), searched with alpha-beta
+windows that are carried through the chance nodes:
+
+- Star1: every evaluate_board value lies in [EVAL_MIN, EVAL_MAX], so after
+  some outcomes of a chance node are known, the unexplored ones can move
+  the expected value only so far. Each outcome is searched with the window
+  that still matters and the chance node is cut off as soon as its value
+  is known to fall outside (alpha, beta).
+- Star2: before that, every outcome is probed by searching only its first
+  move. That bounds the outcome from the side the parent needs (a MIN
+  outcome is at most any of its moves, a MAX outcome at least), which
+  replaces the loose evaluation bounds in the Star1 windows and often cuts
+  the chance node off without a full search.
+
+Chance nodes return alpha / beta when cut off (fail-hard) and their exact
+value otherwise, so the move and evaluation at the root match the
+unpruned search.
+
+Like the other searchers, moves are made and taken back on the board that
+is passed in (drop_disc / undo_disc).
+"""
+import time
+from game.board import AI, HUMAN, COLS
+from game.heuristic import evaluate_board, EVAL_MIN, EVAL_MAX
+from Algorithms.move_ordering import CENTER_SCORES
+from Algorithms.search_control import restoring
+from Trees.tree_recording import TREE_FULL, DEFAULT_TREE_LEVELS, recorded_plies
+
+# Root columns must beat the best value by more than float rounding to be
+# pruned, so ties are resolved exactly like the unpruned search
+ROOT_MARGIN = 1e-6
+
+# Open window edge; finite so recorded windows stay valid JSON
+INFINITY = 1e12
+
+
+class StarExpectiminimaxAlgorithm:
+    def __init__(self, depth_limit=4, probing=True, tree_mode=TREE_FULL,
+                 tree_levels=DEFAULT_TREE_LEVELS):
+        self.depth_limit = depth_limit
+        # Star2 probing phase (Star1 only when False)
+        self.probing = probing
+        # Nodes deeper than this ply are searched without building tree dicts
+        self.record_plies = recorded_plies(tree_mode, tree_levels)
+        self.nodes_expanded = 0
+        self.cutoffs = 0
+        self.probe_cutoffs = 0
+        self.start_time = None
+        # Optional Algorithms.search_control.Deadline
+        self.deadline = None
+
+    def get_best_move(self, board):
+        """
+        Get the best move for AI using pruned expectiminimax
+        Returns: (best_column, tree_structure, stats)
+        """
+        self.reset_search()
+
+        best_col = None
+        best_value = -INFINITY
+        tree_children = []
+        record = self.record_plies >= 1
+
+        # Columns in index order: the first of equal values wins, as in
+        # ExpectiminiMaxAlgorithm
+        with restoring(board):
+            for col in board.get_valid_columns():
+                alpha = best_value - ROOT_MARGIN
+                expected_value, child_tree = self.expectiminimax_chance(
+                    board, col, self.depth_limit - 1, False, alpha, INFINITY
+                )
+
+                if record:
+                    node = {
+                        'column': col,
+                        'value': expected_value,
+                        'type': 'max',
+                        'alpha': alpha,
+                        'beta': INFINITY,
+                        'children': [child_tree] if child_tree else []
+                    }
+                    if expected_value <= alpha:
+                        node['pruned'] = True
+                    tree_children.append(node)
+
+                if expected_value > best_value:
+                    best_value = expected_value
+                    best_col = col
+
+        time_taken = time.time() - self.start_time
+
+        tree = None
+        if self.record_plies >= 0:
+            tree = {
+                'column': best_col,
+                'value': best_value,
+                'type': 'root',
+                'children': tree_children
+            }
+
+        return best_col, tree, self.build_stats(best_value, time_taken)
+
+    def search_move(self, board, col):
+        """
+        Search a single root move (used by the parallel root splitter)
+        Returns: (value, tree_node, stats), tree_node being the root's child for col
+        """
+        self.reset_search()
+
+        with restoring(board):
+            expected_value, child_tree = self.expectiminimax_chance(
+                board, col, self.depth_limit - 1, False, -INFINITY, INFINITY
+            )
+
+        tree_node = None
+        if self.record_plies >= 1:
+            tree_node = {
+                'column': col,
+                'value': expected_value,
+                'type': 'max',
+                'children': [child_tree] if child_tree else []
+            }
+
+        stats = self.build_stats(expected_value, time.time() - self.start_time)
+        return expected_value, tree_node, stats
+
+    def reset_search(self):
+        """Reset counters for a new search"""
+        self.nodes_expanded = 0
+        self.cutoffs = 0
+        self.probe_cutoffs = 0
+        self.start_time = time.time()
+
+    def build_stats(self, evaluation, time_taken):
+        """Stats dict returned with a search result"""
+        return {
+            'nodesExpanded': self.nodes_expanded,
+            'timeTaken': time_taken,
+            'evaluation': evaluation,
+            'cutoffs': self.cutoffs,
+            'probeCutoffs': self.probe_cutoffs
+        }
+
+    def leaf(self, board, depth, record):
+        """Evaluate a leaf; Returns: (value, tree_node)"""
+        eval_value = evaluate_board(board)
+        if not record:
+            return eval_value, None
+        return eval_value, {
+            'value': eval_value,
+            'type': 'leaf',
+            'depth': self.depth_limit - depth,
+            'children': []
+        }
+
+    def expectiminimax_chance(self, board, chosen_col, depth, is_maximizing, alpha, beta):
+        """
+        Chance node: the disc falls in chosen_col (60%) or an adjacent
+        column (20% each, renormalized when one is not available)
+        Returns: (value, tree_node); the value is alpha or beta when the
+        node was cut off
+        """
+        self.nodes_expanded += 1
+
+        ply = self.depth_limit - depth
+        record = ply <= self.record_plies
+
+        if depth == 0 or board.is_terminal():
+            return self.leaf(board, depth, record)
+
+        outcomes = []
+        player = AI if is_maximizing else HUMAN
+
+        if board.is_valid_column(chosen_col):
+            outcomes.append((chosen_col, 0.6))
+        left_col = chosen_col - 1
+        if left_col >= 0 and board.is_valid_column(left_col):
+            outcomes.append((left_col, 0.2))
+        right_col = chosen_col + 1
+        if right_col < COLS and board.is_valid_column(right_col):
+            outcomes.append((right_col, 0.2))
+
+        if not outcomes:
+            return self.leaf(board, depth, record)
+
+        total_prob = sum(prob for _, prob in outcomes)
+        outcomes = [(col, prob / total_prob) for col, prob in outcomes]
+
+        # Known bounds on each outcome's value
+        lower = [EVAL_MIN] * len(outcomes)
+        upper = [EVAL_MAX] * len(outcomes)
+
+        # Star2 probing: outcomes are MIN nodes after an AI disc (probes give
+        # upper bounds, which can prove value <= alpha) and MAX nodes after a
+        # human disc (lower bounds, value >= beta)
+        if self.probing and depth > 1:
+            for i, (actual_col, probability) in enumerate(outcomes):
+                if is_maximizing:
+                    rest = sum(p * upper[j] for j, (_, p) in enumerate(outcomes) if j != i)
+                    target = (alpha - rest) / probability
+                    if target >= EVAL_MAX:
+                        continue
+                    board.drop_disc(actual_col, player)
+                    upper[i] = self.probe(board, depth - 1, False, target, EVAL_MAX)
+                    board.undo_disc()
+                    if sum(p * u for (_, p), u in zip(outcomes, upper)) <= alpha:
+                        self.probe_cutoffs += 1
+                        return self.cut_off(alpha, depth, alpha, beta, record)
+                else:
+                    rest = sum(p * lower[j] for j, (_, p) in enumerate(outcomes) if j != i)
+                    target = (beta - rest) / probability
+                    if target <= EVAL_MIN:
+                        continue
+                    board.drop_disc(actual_col, player)
+                    lower[i] = self.probe(board, depth - 1, True, EVAL_MIN, target)
+                    board.undo_disc()
+                    if sum(p * l for (_, p), l in zip(outcomes, lower)) >= beta:
+                        self.probe_cutoffs += 1
+                        return self.cut_off(beta, depth, alpha, beta, record)
+
+        # Star1: search each outcome with the window that can still change
+        # the result; outcomes are summed in order, as in the plain search
+        expected_value = 0
+        outcome_trees = [] if record else None
+        record_children = ply + 1 <= self.record_plies
+
+        for i, (actual_col, probability) in enumerate(outcomes):
+            rest_low = sum(p * lower[j] for j, (_, p) in enumerate(outcomes) if j > i)
+            rest_high = sum(p * upper[j] for j, (_, p) in enumerate(outcomes) if j > i)
+            child_alpha = (alpha - expected_value - rest_high) / probability
+            child_beta = (beta - expected_value - rest_low) / probability
+
+            board.drop_disc(actual_col, player)
+            value, child_tree = self.expectiminimax(board, depth - 1,
+                                                    not is_maximizing, child_alpha, child_beta)
+            board.undo_disc()
+
+            if record_children:
+                outcome_trees.append({
+                    'column': actual_col,
+                    'probability': probability,
+                    'value': value,
+                    'type': 'chance',
+                    'depth': self.depth_limit - depth,
+                    'children': [child_tree] if child_tree else []
+                })
+
+            if value <= child_alpha or value >= child_beta:
+                self.cutoffs += 1
+                bound = alpha if value <= child_alpha else beta
+                return self.cut_off(bound, depth, alpha, beta, record, outcome_trees)
+
+            expected_value += probability * value
+
+        if not record:
+            return expected_value, None
+        return expected_value, {
+            'value': expected_value,
+            'type': 'chance',
+            'depth': self.depth_limit - depth,
+            'alpha': alpha,
+            'beta': beta,
+            'children': outcome_trees
+        }
+
+    def cut_off(self, value, depth, alpha, beta, record, children=None):
+        """Result of a chance node whose value is outside (alpha, beta)"""
+        if not record:
+            return value, None
+        return value, {
+            'value': value,
+            'type': 'chance',
+            'depth': self.depth_limit - depth,
+            'alpha': alpha,
+            'beta': beta,
+            'pruned': True,
+            'children': children or []
+        }
+
+    def probe(self, board, depth, is_maximizing, alpha, beta):
+        """
+        Bound a node's value by searching only its first move
+        Returns: an upper bound for a MIN node, a lower bound for a MAX node
+        """
+        if depth == 0 or board.is_terminal():
+            self.nodes_expanded += 1
+            return evaluate_board(board)
+
+        col = self.order_moves(board.get_valid_columns())[0]
+        # A chance node's value, fail-hard at the window edge, bounds the
+        # node from the side the probe asks for
+        value, _ = self.expectiminimax_chance(board, col, depth, is_maximizing, alpha, beta)
+        return value
+
+    def order_moves(self, columns):
+        """Center columns first (prunes more than left to right)"""
+        return sorted(columns, key=lambda col: -CENTER_SCORES[col])
+
+    def expectiminimax(self, board, depth, is_maximizing, alpha, beta):
+        """
+        MAX / MIN node searched with an (alpha, beta) window
+        Returns: (value, tree_node), fail-soft
+        """
+        self.nodes_expanded += 1
+        if self.deadline is not None and not self.nodes_expanded % self.deadline.CHECK_INTERVAL:
+            self.deadline.check()
+
+        ply = self.depth_limit - depth
+        record = ply <= self.record_plies
+
+        if depth == 0 or board.is_terminal():
+            return self.leaf(board, depth, record)
+
+        best_value = -INFINITY if is_maximizing else INFINITY
+        children_trees = [] if record else None
+        node = None
+
+        for col in self.order_moves(board.get_valid_columns()):
+            expected_value, child_tree = self.expectiminimax_chance(
+                board, col, depth, is_maximizing, alpha, beta
+            )
+
+            # The chance node sits on this ply, so its edge is recorded
+            # together with this node
+            if record:
+                node = {
+                    'column': col,
+                    'value': expected_value,
+                    'type': 'max' if is_maximizing else 'min',
+                    'depth': self.depth_limit - depth,
+                    'alpha': alpha,
+                    'beta': beta,
+                    'children': [child_tree] if child_tree else []
+                }
+                children_trees.append(node)
+
+            if is_maximizing:
+                best_value = max(best_value, expected_value)
+                alpha = max(alpha, expected_value)
+            else:
+                best_value = min(best_value, expected_value)
+                beta = min(beta, expected_value)
+
+            if alpha >= beta:
+                if node is not None:
+                    node['pruned'] = True
+                break
+
+        if not record:
+            return best_value, None
+        return best_value, {
+            'value': best_value,
+            'type': 'max' if is_maximizing else 'min',
+            'depth': self.depth_limit - depth,
+            'alpha': alpha,
+            'beta': beta,
+            'children': children_trees
+        }
@@ -1,15 +1,24 @@
 """
 Minimax algorithm WITHOUT Alpha-Beta pruning
+
+The search makes and takes back moves on the board it is given
+(drop_disc / undo_disc) instead of copying it for every child.
 """
 import time
 from game.board import AI, HUMAN
 from game.heuristic import evaluate_board
+from Algorithms.search_control import restoring
+from Trees.tree_recording import TREE_FULL, DEFAULT_TREE_LEVELS, recorded_plies
 
 class MinimaxAlgorithm:
-    def __init__(self, depth_limit=4):
+    def __init__(self, depth_limit=4, tree_mode=TREE_FULL, tree_levels=DEFAULT_TREE_LEVELS):
         self.depth_limit = depth_limit
+        # Nodes deeper than this ply are searched without building tree dicts
+        self.record_plies = recorded_plies(tree_mode, tree_levels)
         self.nodes_expanded = 0
         self.start_time = None
+        # Optional Algorithms.search_control.Deadline
+        self.deadline = None
     
     def get_best_move(self, board):
         """
@@ -22,39 +31,41 @@ class MinimaxAlgorithm:
         best_col = None
         best_value = float('-inf')
         tree_children = []
+        record = self.record_plies >= 1
         
         valid_columns = board.get_valid_columns()
         
-        for col in valid_columns:
-            # Create a copy and make the move
-            temp_board = board.copy()
-            temp_board.drop_disc(col, AI)
-            
-            # Call minimax for the opponent's turn
-            value, child_tree = self.minimax(temp_board, self.depth_limit - 1, False)
-            
-            # Build tree node for this column
-            tree_node = {
-                'column': col,
-                'value': value,
-                'type': 'max',
-                'children': [child_tree] if child_tree else []
-            }
-            tree_children.append(tree_node)
-            
-            if value > best_value:
-                best_value = value
-                best_col = col
+        with restoring(board):
+            for col in valid_columns:
+                # Make the move, search the opponent's turn, take it back
+                board.drop_disc(col, AI)
+                value, child_tree = self.minimax(board, self.depth_limit - 1, False)
+                board.undo_disc()
+                
+                # Build tree node for this column
+                if record:
+                    tree_children.append({
+                        'column': col,
+                        'value': value,
+                        'type': 'max',
+                        'children': [child_tree] if child_tree else []
+                    })
+                
+                if value > best_value:
+                    best_value = value
+                    best_col = col
         
         time_taken = time.time() - self.start_time
         
         # Build complete tree
-        tree = {
-            'column': best_col,
-            'value': best_value,
-            'type': 'root',
-            'children': tree_children
-        }
+        tree = None
+        if self.record_plies >= 0:
+            tree = {
+                'column': best_col,
+                'value': best_value,
+                'type': 'root',
+                'children': tree_children
+            }
         
         stats = {
             'nodesExpanded': self.nodes_expanded,
@@ -64,6 +75,35 @@ class MinimaxAlgorithm:
         
         return best_col, tree, stats
     
+    def search_move(self, board, col):
+        """
+        Search a single root move (used by the parallel root splitter)
+        Returns: (value, tree_node, stats), tree_node being the root's child for col
+        """
+        self.nodes_expanded = 0
+        self.start_time = time.time()
+        
+        with restoring(board):
+            board.drop_disc(col, AI)
+            value, child_tree = self.minimax(board, self.depth_limit - 1, False)
+            board.undo_disc()
+        
+        tree_node = None
+        if self.record_plies >= 1:
+            tree_node = {
+                'column': col,
+                'value': value,
+                'type': 'max',
+                'children': [child_tree] if child_tree else []
+            }
+        
+        stats = {
+            'nodesExpanded': self.nodes_expanded,
+            'timeTaken': time.time() - self.start_time,
+            'evaluation': value
+        }
+        return value, tree_node, stats
+    
     def minimax(self, board, depth, is_maximizing):
         """
         Minimax recursive function
@@ -77,10 +117,17 @@ class MinimaxAlgorithm:
             (value, tree_node)
         """
         self.nodes_expanded += 1
+        if self.deadline is not None and not self.nodes_expanded % self.deadline.CHECK_INTERVAL:
+            self.deadline.check()
+        
+        ply = self.depth_limit - depth
+        record = ply <= self.record_plies
         
         # Terminal conditions
         if depth == 0 or board.is_terminal():
             eval_value = evaluate_board(board)
+            if not record:
+                return eval_value, None
             return eval_value, {
                 'value': eval_value,
                 'type': 'leaf',
@@ -89,32 +136,33 @@ class MinimaxAlgorithm:
             }
         
         valid_columns = board.get_valid_columns()
+        # Children are recorded one ply deeper
+        record_children = ply + 1 <= self.record_plies
         
         if is_maximizing:
             # Maximizing player (AI)
             max_value = float('-inf')
-            best_tree = None
-            children_trees = []
+            children_trees = [] if record else None
             
             for col in valid_columns:
-                temp_board = board.copy()
-                temp_board.drop_disc(col, AI)
+                board.drop_disc(col, AI)
+                value, child_tree = self.minimax(board, depth - 1, False)
+                board.undo_disc()
                 
-                value, child_tree = self.minimax(temp_board, depth - 1, False)
-                
-                node = {
-                    'column': col,
-                    'value': value,
-                    'type': 'max',
-                    'depth': self.depth_limit - depth,
-                    'children': [child_tree] if child_tree else []
-                }
-                children_trees.append(node)
+                if record_children:
+                    children_trees.append({
+                        'column': col,
+                        'value': value,
+                        'type': 'max',
+                        'depth': self.depth_limit - depth,
+                        'children': [child_tree] if child_tree else []
+                    })
                 
                 if value > max_value:
                     max_value = value
-                    best_tree = node
             
+            if not record:
+                return max_value, None
             return max_value, {
                 'value': max_value,
                 'type': 'max',
@@ -125,28 +173,27 @@ class MinimaxAlgorithm:
         else:
             # Minimizing player (Human)
             min_value = float('inf')
-            best_tree = None
-            children_trees = []
+            children_trees = [] if record else None
             
             for col in valid_columns:
-                temp_board = board.copy()
-                temp_board.drop_disc(col, HUMAN)
-                
-                value, child_tree = self.minimax(temp_board, depth - 1, True)
+                board.drop_disc(col, HUMAN)
+                value, child_tree = self.minimax(board, depth - 1, True)
+                board.undo_disc()
                 
-                node = {
-                    'column': col,
-                    'value': value,
-                    'type': 'min',
-                    'depth': self.depth_limit - depth,
-                    'children': [child_tree] if child_tree else []
-                }
-                children_trees.append(node)
+                if record_children:
+                    children_trees.append({
+                        'column': col,
+                        'value': value,
+                        'type': 'min',
+                        'depth': self.depth_limit - depth,
+                        'children': [child_tree] if child_tree else []
+                    })
                 
                 if value < min_value:
                     min_value = value
-                    best_tree = node
             
+            if not record:
+                return min_value, None
             return min_value, {
                 'value': min_value,
                 'type': 'min',
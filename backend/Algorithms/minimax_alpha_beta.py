@@ -1,30 +1,65 @@
-import copy
-import json
-from backend.Trees.minimax_alpha_beta_tree import TreeNode
+"""
+Alpha-beta search with a configurable, weighted heuristic
+
+Connect4 is a tuning layer over the shared board engines (game.board /
+game.bitboard): the position is a Board or BitBoard, moves are made and
+taken back with drop_disc / undo_disc, and the heuristic is computed from
+the window counts of game.heuristic, scaled by the `weights` dict.
+
+WeightedAlphaBetaAlgorithm wraps it in the get_best_move contract of the
+other searchers so /api/move can use it ("weighted_alpha_beta").
+"""
+import time
+
+from game.board import AI, HUMAN, ROWS, COLS
+from game.engines import create_board, DEFAULT_ENGINE
+from game.heuristic import count_window_patterns, count_center_discs
+from Algorithms.search_control import restoring
+from Trees.minimax_alpha_beta_tree import TreeNode
+from Trees.tree_json import dump_json
+from Trees.tree_recording import TREE_FULL, DEFAULT_TREE_LEVELS, recorded_plies
+
+DEFAULT_WEIGHTS = {
+    "four": 100000,
+    "three": 120,
+    "two": 10,
+    "center": 4,
+    "opp_four": -100000,
+    "opp_three": -150,
+    "opp_two": -15
+}
+
 
 class Connect4:
-    def __init__(self, rows=6, cols=7, max_depth=4):
+    def __init__(self, rows=ROWS, cols=COLS, max_depth=4, engine=DEFAULT_ENGINE):
+        if (rows, cols) != (ROWS, COLS):
+            raise ValueError(f"Only {ROWS}x{COLS} boards are supported")
         self.rows = rows
         self.cols = cols
-        self.board = [[0] * cols for _ in range(rows)]
+        self.engine = engine
+        self.board = create_board(None, engine)
         self.current_player = 1
         self.max_depth = max_depth
-
-        self.weights = {
-            "four": 100000,
-            "three": 120,
-            "two": 10,
-            "center": 4,
-            "opp_four": -100000,
-            "opp_three": -150,
-            "opp_two": -15
-        }
+        # Optional Algorithms.move_ordering.MoveOrderer (None keeps column order)
+        self.move_orderer = None
+        self.nodes_expanded = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # Optional Algorithms.search_control.Deadline
+        self.deadline = None
+        # Nodes deeper than this ply are searched without building TreeNodes
+        self.record_plies = recorded_plies(TREE_FULL)
+
+        self.weights = dict(DEFAULT_WEIGHTS)
 
     def set_board(self, board):
-        self.board = copy.deepcopy(board)
+        # Accepts a list of lists or any board engine (Board / BitBoard)
+        if hasattr(board, "get_state"):
+            board = board.get_state()
+        self.board = create_board(board, self.engine)
 
     def get_board(self):
-        return copy.deepcopy(self.board)
+        return self.board.get_state()
 
     def set_player(self, player):
         self.current_player = player
@@ -44,112 +79,53 @@ class Connect4:
     def get_weights(self):
         return dict(self.weights)
 
-    def is_valid_move(self, col):
-        return 0 <= col < self.cols and self.board[0][col] == 0
+    def set_move_orderer(self, move_orderer):
+        self.move_orderer = move_orderer
 
-    def get_valid_moves(self, board):
-        return [c for c in range(self.cols) if board[0][c] == 0]
+    def get_move_orderer(self):
+        return self.move_orderer
 
-    def apply_move_on_board(self, board, col, player):
-        new_board = copy.deepcopy(board)
-        for r in range(self.rows - 1, -1, -1):
-            if new_board[r][col] == 0:
-                new_board[r][col] = player
-                return new_board
-        return None
+    def set_tree_mode(self, mode, levels=DEFAULT_TREE_LEVELS):
+        self.record_plies = recorded_plies(mode, levels)
+
+    def get_cutoff_stats(self):
+        return {"cutoffs": self.cutoffs, "firstMoveCutoffs": self.first_move_cutoffs}
+
+    def is_valid_move(self, col):
+        return 0 <= col < self.cols and self.board.is_valid_column(col)
+
+    def get_valid_moves(self, board=None):
+        b = board if board is not None else self.board
+        return b.get_valid_columns()
 
     def apply_move(self, col, player):
-        new_board = self.apply_move_on_board(self.board, col, player)
-        if new_board:
-            self.board = new_board
-            return True
-        return False
+        return 0 <= col < self.cols and self.board.drop_disc(col, player)
 
     def board_full(self, board=None):
         b = board if board is not None else self.board
-        return all(b[0][c] != 0 for c in range(self.cols))
+        return b.is_full()
 
     def terminal_check(self, board):
         if self.board_full(board):
             return True, 0
         return False, 0
 
-    def count_connect4(self, board=None, player=2):
+    def count_connect4(self, board=None, player=AI):
         b = board if board is not None else self.board
-        cnt = 0
-
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                if all(b[r][c+i] == player for i in range(4)):
-                    cnt += 1
-
-        for c in range(self.cols):
-            for r in range(self.rows - 3):
-                if all(b[r+i][c] == player for i in range(4)):
-                    cnt += 1
-
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                if all(b[r+i][c+i] == player for i in range(4)):
-                    cnt += 1
-
-        for r in range(3, self.rows):
-            for c in range(self.cols - 3):
-                if all(b[r-i][c+i] == player for i in range(4)):
-                    cnt += 1
-
-        return cnt
-
-    def evaluate_window(self, window, player):
-        opp = 1 if player == 2 else 2
-        pc = window.count(player)
-        oc = window.count(opp)
-        ec = window.count(0)
-        score = 0
-
-        if pc == 4:
-            score += self.weights["four"]
-        elif pc == 3 and ec == 1:
-            score += self.weights["three"]
-        elif pc == 2 and ec == 2:
-            score += self.weights["two"]
-
-        if oc == 4:
-            score += self.weights["opp_four"]
-        elif oc == 3 and ec == 1:
-            score += self.weights["opp_three"]
-        elif oc == 2 and ec == 2:
-            score += self.weights["opp_two"]
-
-        return score
+        human_count, ai_count = b.check_winner()
+        return ai_count if player == AI else human_count
 
     def heuristic(self, board=None):
         b = board if board is not None else self.board
-        AI = 2
-        score = 0
-
-        # center bonus
-        c = self.cols // 2
-        score += sum(1 for r in range(self.rows) if b[r][c] == AI) * self.weights["center"]
-
-        # windows
-        for r in range(self.rows):
-            for col in range(self.cols - 3):
-                score += self.evaluate_window([b[r][col+i] for i in range(4)], AI)
-
-        for col in range(self.cols):
-            for r in range(self.rows - 3):
-                score += self.evaluate_window([b[r+i][col] for i in range(4)], AI)
+        w = self.weights
 
-        for r in range(self.rows - 3):
-            for col in range(self.cols - 3):
-                score += self.evaluate_window([b[r+i][col+i] for i in range(4)], AI)
+        human_fours, ai_fours = b.check_winner()
+        (_, human_twos, human_threes), (_, ai_twos, ai_threes) = count_window_patterns(b)
 
-        for r in range(3, self.rows):
-            for col in range(self.cols - 3):
-                score += self.evaluate_window([b[r-i][col+i] for i in range(4)], AI)
-
-        return score
+        return (count_center_discs(b, AI) * w["center"]
+                + ai_fours * w["four"] + ai_threes * w["three"] + ai_twos * w["two"]
+                + human_fours * w["opp_four"] + human_threes * w["opp_three"]
+                + human_twos * w["opp_two"])
 
     def minimax_build_tree(self, board, depth, maximizing_player, player_to_move, alpha=-1e12, beta=1e12):
         """
@@ -157,33 +133,46 @@ class Connect4:
         player_to_move: the player who will place a disc at this node
         maximizing_player: True if we are maximizing (AI's turn)
         """
-        node = TreeNode(board, move=None, player=None, depth=depth)
+        self.nodes_expanded += 1
+        if self.deadline is not None and not self.nodes_expanded % self.deadline.CHECK_INTERVAL:
+            self.deadline.check()
+
+        ply = self.max_depth - depth
+        node = None
+        if ply <= self.record_plies:
+            # Only the root keeps a board, the others are replayed from it
+            node = TreeNode(board.get_state() if ply == 0 else None, depth=depth)
 
         terminal, val = self.terminal_check(board)
         if terminal or depth == 0:
-            node.score = val if terminal else self.heuristic(board)
-            return node.score, None, node
+            score = val if terminal else self.heuristic(board)
+            if node is not None:
+                node.score = score
+            return score, None, node
 
         moves = self.get_valid_moves(board)
+        if self.move_orderer is not None:
+            moves = self.move_orderer.order(moves, ply, maximizing_player)
 
         # ========== MAX ==========
         if maximizing_player:
             best = -1e12
             best_move = None
 
-            for mv in moves:
-                new_board = self.apply_move_on_board(board, mv, player_to_move)
+            for index, mv in enumerate(moves):
+                board.drop_disc(mv, player_to_move)
                 score, _, child = self.minimax_build_tree(
-                    new_board, depth - 1,
+                    board, depth - 1,
                     False,
-                    1 if player_to_move == 2 else 2,
+                    HUMAN if player_to_move == AI else AI,
                     alpha, beta
                 )
+                board.undo_disc()
 
-                child.move = mv
-                child.player = player_to_move
-                node.children.append(child)
-                node.nodes_expanded += 1
+                if child is not None:
+                    node.add_child(child, mv, player_to_move)
+                if node is not None:
+                    node.nodes_expanded += 1
 
                 if score > best:
                     best = score
@@ -191,9 +180,11 @@ class Connect4:
 
                 alpha = max(alpha, best)
                 if beta <= alpha:
+                    self.record_cutoff(mv, index, ply, True, depth)
                     break
 
-            node.score = best
+            if node is not None:
+                node.score = best
             return best, best_move, node
 
         # ========== MIN ==========
@@ -201,19 +192,20 @@ class Connect4:
             best = 1e12
             best_move = None
 
-            for mv in moves:
-                new_board = self.apply_move_on_board(board, mv, player_to_move)
+            for index, mv in enumerate(moves):
+                board.drop_disc(mv, player_to_move)
                 score, _, child = self.minimax_build_tree(
-                    new_board, depth - 1,
+                    board, depth - 1,
                     True,
-                    1 if player_to_move == 2 else 2,
+                    HUMAN if player_to_move == AI else AI,
                     alpha, beta
                 )
+                board.undo_disc()
 
-                child.move = mv
-                child.player = player_to_move
-                node.children.append(child)
-                node.nodes_expanded += 1
+                if child is not None:
+                    node.add_child(child, mv, player_to_move)
+                if node is not None:
+                    node.nodes_expanded += 1
 
                 if score < best:
                     best = score
@@ -221,30 +213,44 @@ class Connect4:
 
                 beta = min(beta, best)
                 if beta <= alpha:
+                    self.record_cutoff(mv, index, ply, False, depth)
                     break
 
-            node.score = best
+            if node is not None:
+                node.score = best
             return best, best_move, node
 
+    def record_cutoff(self, move, index, ply, maximizing_player, depth):
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if self.move_orderer is not None:
+            self.move_orderer.record_cutoff(move, ply, maximizing_player, depth)
+
     def build_minimax_tree_current(self):
-        return self.minimax_build_tree(
-            self.board,
-            self.max_depth,
-            True,
-            2
-        )
+        self.nodes_expanded = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # Moves are made and taken back on the game's own board
+        with restoring(self.board):
+            return self.minimax_build_tree(
+                self.board,
+                self.max_depth,
+                True,
+                AI
+            )
 
     def save_tree_json(self, root_node: TreeNode, path):
-        data = root_node.to_dict(include_board=True)
+        # Written node by node, without building the whole dict tree first
         with open(path, "w") as f:
-            json.dump(data, f, indent=2)
+            dump_json(root_node.stream_dict(include_board=True), f, indent=2)
 
     def print_tree_console(self, root_node: TreeNode, show_boards=False):
         print(root_node.pretty_print(indent=0, show_board=show_boards))
 
     def final_winner_by_count(self):
-        ai = self.count_connect4(player=2)
-        human = self.count_connect4(player=1)
+        ai = self.count_connect4(player=AI)
+        human = self.count_connect4(player=HUMAN)
         if ai > human:
             return "AI", ai, human
         elif human > ai:
@@ -253,7 +259,82 @@ class Connect4:
             return "DRAW", ai, human
 
 
+class WeightedAlphaBetaAlgorithm:
+    """Connect4's weighted alpha-beta search behind the get_best_move contract"""
+
+    def __init__(self, depth_limit=4, weights=None, move_orderer=None,
+                 tree_mode=TREE_FULL, tree_levels=DEFAULT_TREE_LEVELS):
+        self.depth_limit = depth_limit
+        self.game = Connect4(max_depth=depth_limit)
+        if weights:
+            self.game.set_weights(weights)
+        self.game.set_move_orderer(move_orderer)
+        self.game.set_tree_mode(tree_mode, tree_levels)
+        # Optional Algorithms.search_control.Deadline
+        self.deadline = None
+
+    @property
+    def nodes_expanded(self):
+        return self.game.nodes_expanded
+
+    def get_best_move(self, board):
+        """
+        Get the best move for AI using the weighted heuristic
+        Returns: (best_column, tree_structure, stats)
+        """
+        start_time = time.time()
+        self.game.board = board
+        self.game.set_depth(self.depth_limit)
+        self.game.deadline = self.deadline
+
+        score, best_col, root = self.game.build_minimax_tree_current()
+
+        tree = None
+        if root is not None:
+            tree = root.to_tree_dict(self.depth_limit)
+            tree['column'] = best_col
+
+        return best_col, tree, self.build_stats(score, time.time() - start_time)
+
+    def search_move(self, board, col):
+        """
+        Search a single root move (used by the parallel root splitter)
+        Returns: (value, tree_node, stats), tree_node being the root's child for col
+        """
+        start_time = time.time()
+        game = self.game
+        game.board = board
+        game.set_depth(self.depth_limit)
+        game.deadline = self.deadline
+        game.nodes_expanded = game.cutoffs = game.first_move_cutoffs = 0
+
+        with restoring(board):
+            board.drop_disc(col, AI)
+            value, _, node = game.minimax_build_tree(board, self.depth_limit - 1, False, HUMAN)
+            board.undo_disc()
+
+        tree_node = None
+        if node is not None and game.record_plies >= 1:
+            node.move = col
+            node.player = AI
+            tree_node = node.to_tree_dict(self.depth_limit)
+
+        return value, tree_node, self.build_stats(value, time.time() - start_time)
+
+    def build_stats(self, evaluation, time_taken):
+        """Stats dict returned with a search result"""
+        stats = {
+            'nodesExpanded': self.game.nodes_expanded,
+            'timeTaken': time_taken,
+            'evaluation': evaluation,
+            'weights': self.game.get_weights()
+        }
+        stats.update(self.game.get_cutoff_stats())
+        return stats
+
+
 if __name__ == "__main__":
+    # Run from the backend directory: python -m Algorithms.minimax_alpha_beta
     game = Connect4(rows=6, cols=7, max_depth=4)
 
     game.apply_move(3, 1)
@@ -289,4 +370,4 @@ if __name__ == "__main__":
         print("\nGame is already in a terminal state (board full). No move to apply.")
 
     game.save_tree_json(tree, "tree_output_alpha_beta.json")
-    print("\nTree saved as tree_output_alpha_beta.json")
\ No newline at end of file
+    print("\nTree saved as tree_output_alpha_beta.json")
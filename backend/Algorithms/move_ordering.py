@@ -0,0 +1,71 @@
+"""
+Move ordering for the alpha-beta searchers
+
+Alpha-beta prunes the most when the best move is tried first. The
+MoveOrderer sorts the valid columns of a node by, in priority order:
+1. the transposition table's best move for the position
+2. killer moves: columns that caused a cutoff at the same ply
+3. history heuristic: columns that caused cutoffs anywhere, weighted by depth
+4. static center-out order (center columns take part in more lines)
+"""
+from game.board import COLS
+
+CENTER_COL = COLS // 2
+
+# Static score per column: 3 for the center, 0 for the edges
+CENTER_SCORES = [CENTER_COL - abs(col - CENTER_COL) for col in range(COLS)]
+
+KILLERS_PER_PLY = 2
+
+TT_MOVE_SCORE = 1 << 40
+KILLER_SCORE = 1 << 30
+
+
+class MoveOrderer:
+    def __init__(self, center_first=True, killers=True, history=True, tt_move_first=True):
+        self.center_first = center_first
+        self.use_killers = killers
+        self.use_history = history
+        self.tt_move_first = tt_move_first
+        self.reset()
+
+    def reset(self):
+        """Forget killer moves and history scores"""
+        # killers[ply] = most recent cutoff columns at that ply
+        self.killers = []
+        # history[side][col], side is 1 for the maximizing player, 0 otherwise
+        self.history = [[0] * COLS, [0] * COLS]
+
+    def order(self, columns, ply, is_maximizing, tt_move=None):
+        """
+        Sort columns so the most promising are searched first
+        Returns: a new list of columns
+        """
+        killers = self.killers[ply] if self.use_killers and ply < len(self.killers) else ()
+        history = self.history[is_maximizing] if self.use_history else None
+
+        def score(col):
+            value = CENTER_SCORES[col] if self.center_first else 0
+            if history is not None:
+                value += history[col] * COLS
+            if col in killers:
+                value += KILLER_SCORE - killers.index(col)
+            if self.tt_move_first and col == tt_move:
+                value += TT_MOVE_SCORE
+            return value
+
+        return sorted(columns, key=score, reverse=True)
+
+    def record_cutoff(self, col, ply, is_maximizing, depth):
+        """Update killers and history after col caused a cutoff"""
+        if self.use_killers:
+            while len(self.killers) <= ply:
+                self.killers.append([])
+            killers = self.killers[ply]
+            if col in killers:
+                killers.remove(col)
+            killers.insert(0, col)
+            del killers[KILLERS_PER_PLY:]
+
+        if self.use_history:
+            self.history[is_maximizing][col] += depth * depth
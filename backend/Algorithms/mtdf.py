@@ -0,0 +1,198 @@
+"""
+MTD(f): the root value found with zero-window alpha-beta passes
+
+Each pass runs AlphaBetaAlgorithm's search with a window of width one
+(beta - 1, beta), which only tells whether the root value is below beta
+(fail low, an upper bound) or not (fail high, a lower bound). The bounds
+close in on the value from a first guess, and the transposition table
+carries each pass's results into the next, so a good guess takes few
+passes.
+
+The first guess is a previous search's value when iterative deepening
+runs this searcher depth after depth, else the opening book's value for
+the position, else the result of MTD(f) itself on the shallower depths.
+The heuristic swings between odd and even depths (the side that moved
+last is ahead), so the value two plies shallower is preferred to the
+value one ply shallower, and the shallower searches skip every other
+depth.
+
+The column is the leftmost one with the root value, as with
+AlphaBetaAlgorithm: a pass that fails high on the value has found a
+column reaching it, and only the columns left of it are probed again.
+"""
+import time
+from game.board import AI
+from Algorithms.alpha_beta import AlphaBetaAlgorithm
+from Algorithms.search_control import restoring
+from Trees.tree_recording import TREE_FULL, DEFAULT_TREE_LEVELS
+
+INFINITY = 1e12
+
+# Where the first guess of a search came from
+GUESS_ITERATION = 'iteration'
+GUESS_BOOK = 'book'
+GUESS_SEARCH = 'search'
+GUESS_NONE = 'none'
+
+
+class MTDFAlgorithm(AlphaBetaAlgorithm):
+    def __init__(self, depth_limit=4, transposition_table=None, move_orderer=None,
+                 tree_mode=TREE_FULL, tree_levels=DEFAULT_TREE_LEVELS, opening_book=None):
+        super().__init__(depth_limit, transposition_table, move_orderer, tree_mode,
+                         tree_levels)
+        # Optional book.opening_book.OpeningBook, for first guesses
+        self.opening_book = opening_book
+        # Values of the completed searches by depth, for first guesses
+        self.values = {}
+
+    def get_best_move(self, board):
+        """
+        Get the best move for AI with MTD(f)
+        Returns: (best_column, tree_structure, stats)
+        """
+        self.reset_search()
+
+        with restoring(board):
+            guess, guess_source = self.first_guess(board)
+            self.zero_window_passes = 0
+            best_value, best_col, best_pv, tree_children = self.mtdf(board, guess)
+            best_col, best_pv = self.leftmost_column(board, best_value, best_col, best_pv)
+
+        self.pv = best_pv
+        self.values[self.depth_limit] = best_value
+        time_taken = time.time() - self.start_time
+
+        tree = None
+        if self.record_plies >= 0:
+            tree = {
+                'column': best_col,
+                'value': best_value,
+                'type': 'root',
+                'alpha': best_value - 1,
+                'beta': best_value,
+                'zeroWindowPasses': self.zero_window_passes,
+                'children': tree_children
+            }
+
+        stats = self.build_stats(best_value, best_pv, time_taken)
+        stats.update({
+            'zeroWindowPasses': self.zero_window_passes,
+            'guessPasses': self.guess_passes,
+            'columnProbes': self.column_probes,
+            'firstGuess': guess,
+            'firstGuessSource': guess_source
+        })
+        return best_col, tree, stats
+
+    def reset_search(self):
+        """Reset counters and principal variation state for a new search"""
+        super().reset_search()
+        self.zero_window_passes = 0
+        self.guess_passes = 0
+        self.column_probes = 0
+
+    def first_guess(self, board):
+        """
+        First guess of the root value
+        Returns: (guess, source)
+        """
+        for depth in (self.depth_limit - 2, self.depth_limit - 1):
+            if depth in self.values:
+                return self.values[depth], GUESS_ITERATION
+        if self.opening_book is not None:
+            book_move = self.opening_book.find_move(board)
+            if book_move is not None:
+                return book_move[1], GUESS_BOOK
+        if self.depth_limit <= 2:
+            return 0, GUESS_NONE
+
+        # MTD(f) on depth_limit - 2, depth_limit - 4, ... (from the
+        # shallowest), each guessing the next, without recording trees; the
+        # passes also fill the table
+        depth_limit, record_plies = self.depth_limit, self.record_plies
+        self.record_plies = -1
+        guess = 0
+        try:
+            for depth in range(2 - depth_limit % 2, depth_limit, 2):
+                self.depth_limit = depth
+                guess = self.mtdf(board, guess)[0]
+        finally:
+            self.depth_limit, self.record_plies = depth_limit, record_plies
+        self.guess_passes = self.zero_window_passes
+        return guess, GUESS_SEARCH
+
+    def mtdf(self, board, guess):
+        """
+        Narrow the bounds on the root value from guess until they meet
+        Returns: (value, column reaching it, its principal variation,
+        tree children of the last pass)
+        """
+        lower, upper = -INFINITY, INFINITY
+        value = guess
+        best_col = None
+        best_pv = ()
+        tree_children = []
+        while lower < upper:
+            beta = max(value, lower + 1)
+            value, col, pv, tree_children = self.zero_window_pass(board, beta)
+            self.zero_window_passes += 1
+            if value < beta:
+                upper = value
+            else:
+                lower = value
+                best_col, best_pv = col, pv
+        return value, best_col, best_pv, tree_children
+
+    def zero_window_pass(self, board, beta):
+        """
+        Search the root with the window (beta - 1, beta)
+        Returns: (value, best column, its principal variation, tree children);
+        value >= beta is a lower bound, value < beta an upper bound
+        """
+        self.follow_pv = True
+        best_value = -INFINITY
+        best_col = None
+        best_pv = ()
+        tree_children = []
+        record = self.record_plies >= 1
+
+        for col in self.order_moves(board.get_valid_columns(), 0, True):
+            board.drop_disc(col, AI)
+            value, child_tree = self.alpha_beta(board, self.depth_limit - 1, beta - 1, beta, False)
+            board.undo_disc()
+
+            if record:
+                tree_children.append({
+                    'column': col,
+                    'value': value,
+                    'type': 'max',
+                    'alpha': beta - 1,
+                    'beta': beta,
+                    'children': [child_tree] if child_tree else []
+                })
+
+            if value > best_value:
+                best_value = value
+                best_col = col
+                best_pv = (col,) + self.pv_table[1]
+            if best_value >= beta:
+                break
+
+        return best_value, best_col, best_pv, tree_children
+
+    def leftmost_column(self, board, value, best_col, best_pv):
+        """
+        Leftmost column whose value is the root value: the columns left of
+        best_col are probed with the window (value - 1, value)
+        Returns: (column, principal variation)
+        """
+        for col in board.get_valid_columns():
+            if col >= best_col:
+                break
+            board.drop_disc(col, AI)
+            child_value, _ = self.alpha_beta(board, self.depth_limit - 1, value - 1, value, False)
+            board.undo_disc()
+            self.column_probes += 1
+            if child_value >= value:
+                return col, (col,) + self.pv_table[1]
+        return best_col, best_pv
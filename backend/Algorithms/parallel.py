@@ -0,0 +1,435 @@
+"""
+Parallel root splitting over a reusable process pool
+
+The root's valid columns are searched in separate worker processes (the
+GIL rules out threads). The pool is started once and reused by every
+request. With young brothers wait, the most promising column is searched
+first and the others follow in parallel, using its value as alpha.
+
+Alpha-beta workers share alpha through one slot of a shared array per
+search: a worker reads the slot when its column starts and publishes its
+value when it is better. Columns are searched with alpha - 1, so a column
+that ties the best one still reports its exact value and the leftmost of
+equal columns wins, exactly like the serial search.
+
+The slot also holds a cancel flag in a second shared array. Cancelling
+the search (its Deadline, or cancel_slot for a batch) sets the flag, and
+the tasks already running stop at their next deadline check with
+SearchCancelled. A slot is only reused once every task of its search has
+finished.
+
+The same pool runs whole searches for /api/move/batch (submit_search), one
+task per position. Those tasks share the worker's transposition table,
+so positions of a batch that run in the same worker reuse each other's
+entries. A worker keeps a single table, replaced when a task asks for
+another algorithm or size; its size is reported in the stats as ttSize.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from game.engines import create_board, DEFAULT_ENGINE
+from Algorithms.minimax import MinimaxAlgorithm
+from Algorithms.alpha_beta import AlphaBetaAlgorithm
+from Algorithms.expectiminimax import ExpectiminiMaxAlgorithm
+from Algorithms.expectiminimax_star import StarExpectiminimaxAlgorithm
+from Algorithms.minimax_alpha_beta import WeightedAlphaBetaAlgorithm
+from Algorithms.pvs import PrincipalVariationSearch, DEFAULT_ASPIRATION_WINDOW
+from Algorithms.mtdf import MTDFAlgorithm
+from Algorithms.move_ordering import MoveOrderer, CENTER_SCORES
+from Algorithms.search_control import (Deadline, SearchCancelled, SearchTimeout,
+                                       iterative_deepening)
+from Algorithms.transposition import TranspositionTable, DEFAULT_SIZE, REPLACE_DEPTH
+from Trees.tree_recording import TREE_NONE, TREE_FULL, DEFAULT_TREE_LEVELS
+
+WORKERS = int(os.environ.get('CONNECT4_WORKERS', os.cpu_count() or 1))
+
+# Searches that can share alpha at the same time; later ones run unshared
+MAX_SHARED_SEARCHES = 64
+
+NO_ALPHA = -1e12
+
+# Seconds between looks at the parent's Deadline while waiting for workers
+CANCEL_POLL_INTERVAL = 0.05
+
+# Searchers that share alpha and search the eldest brother first
+ALPHA_BETA_ALGORITHMS = ('minimax_alpha_beta', 'pvs', 'mtdf')
+
+_pool = None
+_pool_lock = threading.Lock()
+_shared_alpha = None
+_shared_cancel = None
+_free_slots = queue.Queue()
+
+
+def get_pool():
+    """Start the worker pool on first use and return it"""
+    global _pool, _shared_alpha, _shared_cancel
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context('spawn')
+            _shared_alpha = context.Array('d', MAX_SHARED_SEARCHES)
+            _shared_cancel = context.Array('b', MAX_SHARED_SEARCHES)
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=context,
+                                        initializer=_init_worker,
+                                        initargs=(_shared_alpha, _shared_cancel))
+            for slot in range(MAX_SHARED_SEARCHES):
+                _free_slots.put(slot)
+        return _pool
+
+
+def acquire_slot():
+    """
+    A shared slot (alpha and cancel flag) for one search
+    Returns: the slot, or None when all are taken (the search then runs
+    without sharing alpha and cannot be stopped once started)
+    """
+    get_pool()
+    try:
+        slot = _free_slots.get_nowait()
+    except queue.Empty:
+        return None
+    _shared_alpha[slot] = NO_ALPHA
+    _shared_cancel[slot] = 0
+    return slot
+
+
+def cancel_slot(slot):
+    """Make the running tasks of a slot's search stop at their next check"""
+    if slot is not None:
+        _shared_cancel[slot] = 1
+
+
+def release_slot(slot, futures=()):
+    """Free a slot once all the futures of its search are done"""
+    if slot is None:
+        return
+    pending = [future for future in futures if not future.done()]
+    if not pending:
+        _free_slots.put(slot)
+        return
+
+    remaining = [len(pending)]
+    lock = threading.Lock()
+
+    def task_done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            _free_slots.put(slot)
+
+    for future in pending:
+        future.add_done_callback(task_done)
+
+
+def shutdown_pool():
+    """Stop the worker pool (a new one is started on next use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+            while not _free_slots.empty():
+                _free_slots.get_nowait()
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_worker_alpha = None
+_worker_cancel = None
+# (algorithm, TranspositionTable) kept by a worker across tasks. Entries
+# only depend on the position, side to move and remaining depth, so they
+# stay valid from one request to the next of the same algorithm.
+_worker_table = None
+
+# Algorithms that take a transposition table
+TABLE_ALGORITHMS = ('minimax_alpha_beta', 'expectiminimax', 'pvs', 'mtdf')
+
+
+def _init_worker(shared_alpha, shared_cancel):
+    global _worker_alpha, _worker_cancel
+    _worker_alpha = shared_alpha
+    _worker_cancel = shared_cancel
+
+
+class _SlotDeadline(Deadline):
+    """Worker Deadline that is also cancelled through its search's slot"""
+
+    def __init__(self, time_limit_ms, slot):
+        super().__init__(time_limit_ms)
+        self.slot = slot
+
+    def check(self):
+        if _worker_cancel[self.slot]:
+            self.cancelled = True
+        super().check()
+
+
+def _worker_deadline(time_limit_ms, slot):
+    """Deadline of a task, None when it has neither a time limit nor a slot"""
+    if slot is not None:
+        deadline = _SlotDeadline(time_limit_ms, slot)
+        # A task that starts after its search was cancelled stops at once
+        deadline.check()
+        return deadline
+    if time_limit_ms is not None:
+        return Deadline(time_limit_ms)
+    return None
+
+
+def _build_algorithm(name, options):
+    """Create a searcher from its request name and options"""
+    depth = options['depth']
+    tree_mode = options.get('tree_mode', TREE_FULL)
+    tree_levels = options.get('tree_levels', DEFAULT_TREE_LEVELS)
+
+    table = None
+    tt_size = options.get('tt_size', DEFAULT_SIZE)
+    if tt_size and name in TABLE_ALGORITHMS:
+        table = _get_worker_table(name, tt_size, options.get('tt_replacement', REPLACE_DEPTH))
+
+    if name == 'minimax':
+        return MinimaxAlgorithm(depth, tree_mode=tree_mode, tree_levels=tree_levels)
+    if name == 'minimax_alpha_beta':
+        orderer = MoveOrderer() if options.get('move_ordering', True) else None
+        return AlphaBetaAlgorithm(depth, transposition_table=table, move_orderer=orderer,
+                                  tree_mode=tree_mode, tree_levels=tree_levels)
+    if name == 'expectiminimax':
+        return ExpectiminiMaxAlgorithm(depth, transposition_table=table, tree_mode=tree_mode,
+                                       tree_levels=tree_levels)
+    if name == 'expectiminimax_star':
+        return StarExpectiminimaxAlgorithm(depth, tree_mode=tree_mode, tree_levels=tree_levels)
+    if name == 'weighted_alpha_beta':
+        orderer = MoveOrderer() if options.get('move_ordering', True) else None
+        return WeightedAlphaBetaAlgorithm(depth, weights=options.get('weights'),
+                                          move_orderer=orderer, tree_mode=tree_mode,
+                                          tree_levels=tree_levels)
+    if name == 'pvs':
+        orderer = MoveOrderer() if options.get('move_ordering', True) else None
+        return PrincipalVariationSearch(depth, transposition_table=table, move_orderer=orderer,
+                                        tree_mode=tree_mode, tree_levels=tree_levels,
+                                        aspiration_window=options.get(
+                                            'aspiration_window', DEFAULT_ASPIRATION_WINDOW))
+    if name == 'mtdf':
+        orderer = MoveOrderer() if options.get('move_ordering', True) else None
+        return MTDFAlgorithm(depth, transposition_table=table, move_orderer=orderer,
+                             tree_mode=tree_mode, tree_levels=tree_levels)
+    raise ValueError(f'Unknown algorithm: {name}')
+
+
+def _get_worker_table(name, size, replacement):
+    """
+    The worker's table for a task, allocated again only when the algorithm
+    or the size differs from the previous task's
+    """
+    global _worker_table
+    if _worker_table is None or _worker_table[0] != name or _worker_table[1].size != size:
+        # Drop the old table before allocating the new one
+        _worker_table = None
+        _worker_table = (name, TranspositionTable(size, replacement))
+    table = _worker_table[1]
+    # The policy only affects future stores, so the entries are kept
+    table.replacement = replacement
+    return table
+
+
+def _table_stats(algorithm, stats):
+    """Add the size of the searcher's table to its stats"""
+    table = getattr(algorithm, 'transposition_table', None)
+    if table is not None:
+        stats['ttSize'] = table.size
+    return stats
+
+
+def _search_column(name, options, board_state, engine, col, slot, time_limit_ms):
+    """
+    Search one root column in a worker
+    Returns: (col, value, tree_node, stats), or (col, None, None, stats) on timeout
+    """
+    algorithm = _build_algorithm(name, options)
+    board = create_board(board_state, engine)
+
+    try:
+        algorithm.deadline = _worker_deadline(time_limit_ms, slot)
+        if isinstance(algorithm, AlphaBetaAlgorithm):
+            alpha = _worker_alpha[slot] if slot is not None else NO_ALPHA
+            value, tree_node, stats = algorithm.search_move(board, col, alpha - 1)
+            # Values above alpha - 1 are exact and can be shared
+            if slot is not None and value > alpha - 1:
+                with _worker_alpha.get_lock():
+                    if value > _worker_alpha[slot]:
+                        _worker_alpha[slot] = value
+        else:
+            value, tree_node, stats = algorithm.search_move(board, col)
+    except SearchTimeout:
+        return col, None, None, {'nodesExpanded': algorithm.nodes_expanded}
+
+    return col, value, tree_node, _table_stats(algorithm, stats)
+
+
+def _search_position(name, options, board_state, engine, time_limit_ms, slot=None):
+    """
+    Run a whole search in a worker (batch requests)
+    Returns: (best_column, tree_structure, stats) with 'depthReached' set
+    """
+    algorithm = _build_algorithm(name, options)
+    board = create_board(board_state, engine)
+    deadline = _worker_deadline(time_limit_ms, slot)
+    if time_limit_ms is not None:
+        best_col, tree, stats = iterative_deepening(algorithm, board, time_limit_ms,
+                                                    options['depth'], deadline=deadline)
+    else:
+        algorithm.deadline = deadline
+        best_col, tree, stats = algorithm.get_best_move(board)
+        stats['depthReached'] = options['depth']
+    return best_col, tree, _table_stats(algorithm, stats)
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+def submit_search(algorithm, board_state, engine=DEFAULT_ENGINE, options=None,
+                  time_limit_ms=None, slot=None):
+    """
+    Search one position in the worker pool
+    options are the _build_algorithm options ('depth' is required); slot,
+    from acquire_slot, lets cancel_slot stop the search once it runs
+    Returns: a Future of (best_column, tree_structure, stats)
+    """
+    return get_pool().submit(_search_position, algorithm, options, board_state, engine,
+                             time_limit_ms, slot)
+
+
+class ParallelRootSearch:
+    """
+    Searches the root columns in the worker pool and merges the results
+    into the same (best_column, tree, stats) contract as get_best_move
+    """
+
+    def __init__(self, algorithm, depth_limit=4, engine=DEFAULT_ENGINE, options=None,
+                 young_brothers_wait=True):
+        self.algorithm = algorithm
+        self.depth_limit = depth_limit
+        self.engine = engine
+        self.options = dict(options or {})
+        self.young_brothers_wait = young_brothers_wait
+        self.nodes_expanded = 0
+        # Optional Algorithms.search_control.Deadline (iterative deepening)
+        self.deadline = None
+        # Principal variation of the last completed search; its first move
+        # is the eldest brother of the next one
+        self.pv = ()
+
+    def get_best_move(self, board):
+        """
+        Get the best move with the root split across worker processes
+        Returns: (best_column, tree_structure, stats)
+        """
+        start_time = time.time()
+        pool = get_pool()
+        board_state = board.get_state()
+        options = dict(self.options, depth=self.depth_limit)
+        is_alpha_beta = self.algorithm in ALPHA_BETA_ALGORITHMS
+
+        columns = sorted(board.get_valid_columns(), key=lambda col: -CENTER_SCORES[col])
+        if self.pv and self.pv[0] in columns:
+            columns.remove(self.pv[0])
+            columns.insert(0, self.pv[0])
+
+        slot = acquire_slot()
+        futures = []
+
+        def submit(col):
+            time_limit_ms = None
+            if self.deadline is not None and self.deadline.end_time is not None:
+                time_limit_ms = max(0.0, (self.deadline.end_time - time.perf_counter()) * 1000)
+            future = pool.submit(_search_column, self.algorithm, options, board_state,
+                                 self.engine, col, slot, time_limit_ms)
+            futures.append(future)
+            return future
+
+        try:
+            results = []
+            remaining = columns
+            if self.young_brothers_wait and is_alpha_beta and len(columns) > 1:
+                # Eldest brother first, to give the others a good alpha
+                self.wait([submit(columns[0])], slot)
+                results.append(futures[0].result())
+                remaining = columns[1:]
+            pending = [submit(col) for col in remaining]
+            self.wait(pending, slot)
+            results.extend(future.result() for future in pending)
+        finally:
+            for future in futures:
+                future.cancel()
+            release_slot(slot, futures)
+
+        self.nodes_expanded = sum(stats['nodesExpanded'] for _, _, _, stats in results)
+        if any(value is None for _, value, _, _ in results):
+            raise SearchTimeout()
+
+        return self.merge(results, time.time() - start_time)
+
+    def wait(self, futures, slot):
+        """
+        Wait for tasks, passing a cancel of the Deadline on to them
+        Raises: SearchCancelled once cancelled (the tasks stop on their own)
+        """
+        while True:
+            _, not_done = wait(futures, timeout=CANCEL_POLL_INTERVAL)
+            if self.deadline is not None and self.deadline.cancelled:
+                cancel_slot(slot)
+                raise SearchCancelled()
+            if not not_done:
+                return
+
+    def merge(self, results, time_taken):
+        """Combine per-column worker results into one search result"""
+        results.sort(key=lambda result: result[0])
+
+        best_col = None
+        best_value = None
+        best_stats = None
+        for col, value, _, stats in results:
+            # Results are in column order, so ties keep the leftmost column
+            if best_value is None or value > best_value:
+                best_col, best_value, best_stats = col, value, stats
+
+        tree = None
+        if self.options.get('tree_mode', TREE_FULL) != TREE_NONE:
+            tree = {
+                'column': best_col,
+                'value': best_value,
+                'type': 'root',
+                'children': [node for _, _, node, _ in results if node is not None]
+            }
+            if self.algorithm in ALPHA_BETA_ALGORITHMS:
+                tree['alpha'] = best_value
+                tree['beta'] = 1e12
+
+        stats = {
+            'nodesExpanded': self.nodes_expanded,
+            'timeTaken': time_taken,
+            'evaluation': best_value,
+            'workers': WORKERS,
+            'parallelTasks': len(results)
+        }
+        if 'ttSize' in best_stats:
+            stats['ttSize'] = best_stats['ttSize']
+        if 'principalVariation' in best_stats:
+            stats['principalVariation'] = best_stats['principalVariation']
+            self.pv = tuple(best_stats['principalVariation'])
+        # Sum the remaining integer counters (cutoffs, TT hits, ...)
+        for key in ('cutoffs', 'firstMoveCutoffs', 'probeCutoffs', 'cacheHits',
+                    'ttHits', 'ttMisses', 'ttCollisions', 'researches', 'zeroWindowPasses'):
+            if key in best_stats:
+                stats[key] = sum(result[3].get(key, 0) for result in results)
+
+        return best_col, tree, stats
@@ -0,0 +1,292 @@
+"""
+Principal variation search (negascout) on a negamax core
+
+Same results as AlphaBetaAlgorithm, which it extends for move ordering,
+the transposition table, principal variation following and stats. The
+max and min branches become one negamax function (values from the side
+to move's point of view), and every move after the first is only
+scouted with a null window (alpha, alpha + 1) to prove it is no better;
+a move that fails high is searched again with the full window. The
+evaluation is integral, so the null window is an exact test.
+
+With an aspiration window, a search that follows another one (iterative
+deepening) starts the root with a window of +/- aspiration_window around
+the previous iteration's value, and searches again with the full window
+if the value falls outside it.
+"""
+import time
+from game.board import AI, HUMAN, ZOBRIST_SIDE_KEY, canonical_key, mirror_column
+from game.heuristic import evaluate_board
+from Algorithms.alpha_beta import AlphaBetaAlgorithm
+from Algorithms.transposition import EXACT, LOWER_BOUND, UPPER_BOUND
+from Algorithms.search_control import restoring
+from Trees.tree_recording import TREE_FULL, DEFAULT_TREE_LEVELS
+
+DEFAULT_ASPIRATION_WINDOW = 50
+
+INFINITY = 1e12
+
+
+class PrincipalVariationSearch(AlphaBetaAlgorithm):
+    def __init__(self, depth_limit=4, transposition_table=None, move_orderer=None,
+                 tree_mode=TREE_FULL, tree_levels=DEFAULT_TREE_LEVELS,
+                 aspiration_window=DEFAULT_ASPIRATION_WINDOW):
+        super().__init__(depth_limit, transposition_table, move_orderer, tree_mode,
+                         tree_levels)
+        # Half width of the root window around the previous value (0: off)
+        self.aspiration_window = aspiration_window
+        # Value of the last completed search, the center of the next window
+        self.last_value = None
+
+    def get_best_move(self, board):
+        """
+        Get the best move for AI with principal variation search
+        Returns: (best_column, tree_structure, stats)
+        """
+        self.reset_search()
+
+        alpha, beta = -INFINITY, INFINITY
+        if self.aspiration_window and self.last_value is not None:
+            alpha = self.last_value - self.aspiration_window
+            beta = self.last_value + self.aspiration_window
+
+        with restoring(board):
+            best_col, best_value, best_pv, tree_children = self.search_root(board, alpha, beta)
+            if best_value <= alpha or best_value >= beta:
+                # Outside the aspiration window: the value is only a bound
+                self.aspiration_researches += 1
+                self.follow_pv = True
+                alpha, beta = -INFINITY, INFINITY
+                best_col, best_value, best_pv, tree_children = self.search_root(board, alpha,
+                                                                                beta)
+
+        self.pv = best_pv
+        self.last_value = best_value
+        time_taken = time.time() - self.start_time
+
+        tree = None
+        if self.record_plies >= 0:
+            tree = {
+                'column': best_col,
+                'value': best_value,
+                'type': 'root',
+                'alpha': alpha,
+                'beta': beta,
+                'children': tree_children
+            }
+
+        stats = self.build_stats(best_value, best_pv, time_taken)
+        return best_col, tree, stats
+
+    def search_root(self, board, alpha, beta):
+        """
+        Search the root moves within (alpha, beta)
+        Returns: (best_column, value, principal variation, tree children)
+        """
+        best_col = None
+        best_value = -INFINITY
+        best_pv = ()
+        tree_children = []
+        record = self.record_plies >= 1
+
+        for col in self.order_moves(board.get_valid_columns(), 0, True):
+            board.drop_disc(col, AI)
+            researched = False
+            if best_col is None:
+                value, child_tree = self.negamax(board, self.depth_limit - 1, -beta, -alpha, -1)
+                value = -value
+            else:
+                # Ties go to the leftmost column: a column left of the current
+                # best only has to equal it
+                bound = alpha - 1 if col < best_col else alpha
+                value, child_tree = self.negamax(board, self.depth_limit - 1,
+                                                 -bound - 1, -bound, -1)
+                value = -value
+                if bound < value < beta:
+                    researched = True
+                    self.researches += 1
+                    value, child_tree = self.negamax(board, self.depth_limit - 1,
+                                                     -beta, -bound, -1)
+                    value = -value
+            board.undo_disc()
+
+            if record:
+                node = {
+                    'column': col,
+                    'value': value,
+                    'type': 'max',
+                    'alpha': alpha,
+                    'beta': beta,
+                    'children': [child_tree] if child_tree else []
+                }
+                if researched:
+                    node['researched'] = True
+                tree_children.append(node)
+
+            if value > best_value or (value == best_value and col < best_col):
+                best_value = value
+                best_col = col
+                best_pv = (col,) + self.pv_table[1]
+            alpha = max(alpha, value)
+
+            # Only with an aspiration window: the value is above it
+            if alpha >= beta:
+                break
+
+        return best_col, best_value, best_pv, tree_children
+
+    def reset_search(self):
+        """Reset counters and principal variation state for a new search"""
+        super().reset_search()
+        self.researches = 0
+        self.aspiration_researches = 0
+
+    def build_stats(self, evaluation, pv, time_taken):
+        """Stats dict returned with a search result"""
+        stats = super().build_stats(evaluation, pv, time_taken)
+        stats['researches'] = self.researches
+        stats['aspirationResearches'] = self.aspiration_researches
+        return stats
+
+    def alpha_beta(self, board, depth, alpha, beta, is_maximizing):
+        """
+        AlphaBetaAlgorithm's interface (AI's point of view) on the negamax
+        search, for search_move and the parallel root splitter
+        """
+        if is_maximizing:
+            return self.negamax(board, depth, alpha, beta, 1)
+        value, tree_node = self.negamax(board, depth, -beta, -alpha, -1)
+        return -value, tree_node
+
+    def negamax(self, board, depth, alpha, beta, color):
+        """
+        Principal variation search
+
+        Args:
+            board: Current board state
+            depth: Remaining depth to search
+            alpha, beta: Window, from the side to move's point of view
+            color: 1 when AI is to move, -1 for Human
+
+        Returns:
+            (value for the side to move, tree_node); tree nodes hold
+            values and windows from AI's point of view like AlphaBetaAlgorithm's
+        """
+        self.nodes_expanded += 1
+        if self.deadline is not None and not self.nodes_expanded % self.deadline.CHECK_INTERVAL:
+            self.deadline.check()
+
+        ply = self.depth_limit - depth
+        self.pv_table[ply] = ()
+        record = ply <= self.record_plies
+
+        # Terminal conditions
+        if depth == 0 or board.is_terminal():
+            value = color * evaluate_board(board)
+            if not record:
+                return value, None
+            return value, self.tree_node('leaf', color * value, depth, alpha, beta, color)
+
+        # Transposition table lookup, as in AlphaBetaAlgorithm (exact depth only)
+        tt = self.transposition_table
+        alpha_orig = alpha
+        beta_orig = beta
+        tt_move = None
+        if tt is not None:
+            key, mirrored = canonical_key(board.hash, board.mirror_hash)
+            if color == 1:
+                key ^= ZOBRIST_SIDE_KEY
+            entry = tt.probe(key)
+            if entry is not None:
+                tt_move = entry[3]
+                if mirrored and tt_move is not None:
+                    tt_move = mirror_column(tt_move)
+            if entry is not None and entry[0] == depth:
+                _, tt_value, bound, _ = entry
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, tt_value)
+                elif bound == UPPER_BOUND:
+                    beta = min(beta, tt_value)
+                if bound == EXACT or alpha >= beta:
+                    if not record:
+                        return tt_value, None
+                    node = self.tree_node('leaf', color * tt_value, depth, alpha, beta, color)
+                    node['transposition'] = True
+                    return tt_value, node
+
+        is_maximizing = color == 1
+        player = AI if is_maximizing else HUMAN
+        node_type = 'max' if is_maximizing else 'min'
+        valid_columns = self.order_moves(board.get_valid_columns(), ply, is_maximizing, tt_move)
+        best_value = -INFINITY
+        best_col = None
+        record_children = ply + 1 <= self.record_plies
+        children_trees = [] if record else None
+        node = None
+
+        for index, col in enumerate(valid_columns):
+            board.drop_disc(col, player)
+            researched = False
+            if index == 0:
+                value, child_tree = self.negamax(board, depth - 1, -beta, -alpha, -color)
+                value = -value
+            else:
+                # Scout with a null window, search again if it fails high
+                value, child_tree = self.negamax(board, depth - 1, -alpha - 1, -alpha, -color)
+                value = -value
+                if alpha < value < beta:
+                    researched = True
+                    self.researches += 1
+                    value, child_tree = self.negamax(board, depth - 1, -beta, -value, -color)
+                    value = -value
+            board.undo_disc()
+
+            if record_children:
+                node = self.tree_node(node_type, color * value, depth, alpha, beta, color)
+                node['column'] = col
+                node['children'] = [child_tree] if child_tree else []
+                if researched:
+                    node['researched'] = True
+                children_trees.append(node)
+
+            if value > best_value:
+                best_value = value
+                best_col = col
+                self.pv_table[ply] = (col,) + self.pv_table[ply + 1]
+            alpha = max(alpha, value)
+
+            if alpha >= beta:
+                if node is not None:
+                    node['pruned'] = True
+                self.record_cutoff(col, index, ply, is_maximizing, depth)
+                break
+
+        if tt is not None:
+            if best_value <= alpha_orig:
+                bound = UPPER_BOUND
+            elif best_value >= beta_orig:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            if mirrored and best_col is not None:
+                best_col = mirror_column(best_col)
+            tt.store(key, depth, best_value, bound, best_col)
+
+        if not record:
+            return best_value, None
+        node = self.tree_node(node_type, color * best_value, depth, alpha, beta, color)
+        node['children'] = children_trees
+        return best_value, node
+
+    def tree_node(self, node_type, value, depth, alpha, beta, color):
+        """Tree dict with the window turned to AI's point of view"""
+        if color == -1:
+            alpha, beta = -beta, -alpha
+        return {
+            'value': value,
+            'type': node_type,
+            'depth': self.depth_limit - depth,
+            'alpha': alpha,
+            'beta': beta,
+            'children': []
+        }
@@ -0,0 +1,123 @@
+"""
+Time-limited and cancellable search: deadlines and the iterative
+deepening driver
+"""
+import time
+from contextlib import contextmanager
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget has run out"""
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search that was cancelled (Deadline.cancel)"""
+
+
+class Deadline:
+    """
+    Wall-clock deadline checked cooperatively by the searchers, which can
+    also be cancelled from another thread; without a time limit it only
+    ends on cancel()
+
+    sampler, when set, is called at every check (every CHECK_INTERVAL
+    nodes) to sample the search's progress; it is None unless someone
+    is watching, so an unwatched search only pays for the None test
+    """
+
+    # Searchers look at the clock once every CHECK_INTERVAL nodes
+    CHECK_INTERVAL = 256
+
+    def __init__(self, time_limit_ms=None, start=True):
+        self.time_limit_ms = time_limit_ms
+        self.end_time = None
+        self.cancelled = False
+        self.sampler = None
+        if start:
+            self.start()
+
+    def start(self):
+        """Start the clock (of a Deadline made with start=False)"""
+        if self.time_limit_ms is not None:
+            self.end_time = time.perf_counter() + self.time_limit_ms / 1000.0
+
+    def expired(self):
+        return self.end_time is not None and time.perf_counter() >= self.end_time
+
+    def cancel(self):
+        """Make the search stop at its next check"""
+        self.cancelled = True
+
+    def check(self):
+        """Raise SearchCancelled once cancelled, SearchTimeout once the deadline has passed"""
+        if self.sampler is not None:
+            self.sampler()
+        if self.cancelled:
+            raise SearchCancelled()
+        if self.end_time is not None and time.perf_counter() >= self.end_time:
+            raise SearchTimeout()
+
+
+@contextmanager
+def restoring(board):
+    """
+    Searchers make and take back moves on the board they are given; if a
+    search is abandoned (SearchTimeout), take back whatever it left on it
+    """
+    move_count = len(board.moves)
+    try:
+        yield board
+    finally:
+        while len(board.moves) > move_count:
+            board.undo_disc()
+
+
+def iterative_deepening(algorithm, board, time_limit_ms, max_depth, deadline=None,
+                        on_iteration=None):
+    """
+    Run algorithm.get_best_move at depth 1, 2, ... max_depth until the
+    time budget runs out
+
+    The move comes from the deepest iteration that finished; an iteration
+    cut off by the deadline is thrown away. Depth 1 always runs to
+    completion so there is a move to return.
+
+    deadline: Deadline to use instead of a new one of time_limit_ms, so the
+    caller can cancel the search (SearchCancelled is not caught)
+    on_iteration: called as on_iteration(depth, best_column, stats) after
+    every completed iteration
+
+    Returns: (best_column, tree_structure, stats) like get_best_move, with
+    'depthReached' added and nodesExpanded / timeTaken covering all
+    iterations
+    """
+    start_time = time.time()
+    if deadline is None:
+        deadline = Deadline(time_limit_ms)
+    total_nodes = 0
+    result = None
+    depth_reached = 0
+
+    try:
+        for depth in range(1, max_depth + 1):
+            algorithm.depth_limit = depth
+            algorithm.deadline = deadline if depth > 1 else None
+            try:
+                result = algorithm.get_best_move(board)
+            except SearchTimeout:
+                total_nodes += algorithm.nodes_expanded
+                break
+            total_nodes += result[2]['nodesExpanded']
+            depth_reached = depth
+            if on_iteration is not None:
+                on_iteration(depth, result[0], result[2])
+            if deadline.expired():
+                break
+    finally:
+        algorithm.deadline = None
+
+    best_col, tree, stats = result
+    stats['nodesExpanded'] = total_nodes
+    stats['timeTaken'] = time.time() - start_time
+    stats['depthReached'] = depth_reached
+    return best_col, tree, stats
@@ -0,0 +1,91 @@
+"""
+Transposition table for the alpha-beta searchers
+
+Positions are keyed by their canonical Zobrist hash (see game.board), so a
+position and its mirror image share one entry; the searchers store best
+moves in the orientation of the key. The table is a fixed-size array
+indexed by hash % size, so memory stays bounded no matter how many
+positions a search visits.
+"""
+
+# Bound types of a stored value
+EXACT = 0
+LOWER_BOUND = 1   # real value >= stored value (search failed high)
+UPPER_BOUND = 2   # real value <= stored value (search failed low)
+
+# Replacement policies
+REPLACE_ALWAYS = 'always'   # newest entry wins
+REPLACE_DEPTH = 'depth'     # keep the entry searched to the greater depth
+
+DEFAULT_SIZE = 1 << 20
+# Smallest table size_for_depth gives
+MIN_SIZE = 1 << 10
+
+
+def size_for_depth(depth):
+    """
+    Table size for a search of this depth when none is requested: 4^(depth + 1)
+    slots, between MIN_SIZE and DEFAULT_SIZE. The searchers store about three
+    times more positions per extra ply (44k at most at depth 10 on the benchmark
+    corpus), so this leaves 4-20 slots per position instead of a full-size
+    table for every shallow search.
+    """
+    return max(MIN_SIZE, min(DEFAULT_SIZE, 4 ** (depth + 1)))
+
+
+class TranspositionTable:
+    def __init__(self, size=DEFAULT_SIZE, replacement=REPLACE_DEPTH):
+        if size < 1:
+            raise ValueError('Transposition table size must be positive')
+        if replacement not in (REPLACE_ALWAYS, REPLACE_DEPTH):
+            raise ValueError(f'Unknown replacement policy: {replacement}')
+
+        self.size = size
+        self.replacement = replacement
+        # Each slot is None or (key, depth, value, bound, best_move)
+        self.entries = [None] * size
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the hit / miss / collision counters"""
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        """
+        Look up a position
+        Returns: (depth, value, bound, best_move) or None
+        """
+        entry = self.entries[key % self.size]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            # Slot is taken by a different position
+            self.collisions += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1:]
+
+    def store(self, key, depth, value, bound, best_move):
+        """Store a search result, subject to the replacement policy"""
+        index = key % self.size
+        entry = self.entries[index]
+        if (entry is not None and self.replacement == REPLACE_DEPTH
+                and entry[0] != key and entry[1] > depth):
+            return
+        self.entries[index] = (key, depth, value, bound, best_move)
+
+    def clear(self):
+        """Remove all entries"""
+        self.entries = [None] * self.size
+
+    def get_stats(self):
+        """Counters in the format used by the searchers' stats dicts"""
+        return {
+            'ttHits': self.hits,
+            'ttMisses': self.misses,
+            'ttCollisions': self.collisions
+        }
@@ -1,33 +1,70 @@
-import copy
-
-class TreeNode:
-    def __init__(self, board, move=None, player=None, depth=0):
-        self.board = copy.deepcopy(board)
-        self.move = move
-        self.player = player
-        self.depth = depth
-        self.score = None
-        self.children = []
-        self.nodes_expanded = 0
+from Trees.minimax_tree import TreeNode as CompactTreeNode
+from Trees.tree_json import JsonObject
+
+
+class TreeNode(CompactTreeNode):
+    # Same compact storage as Trees.minimax_tree.TreeNode (boards replayed
+    # from the root on demand), with this tree's JSON layout
+    __slots__ = ()
 
     def to_dict(self, include_board=True):
+        return self._to_dict(include_board, self.board if include_board else None)
+
+    def _to_dict(self, include_board, board):
         d = {
             "move": self.move,
             "player": self.player,
             "score": self.score,
             "depth": self.depth,
-            "children": [c.to_dict(include_board) for c in self.children]
+            "children": [c._to_dict(include_board,
+                                    self.child_board(board, c) if include_board else None)
+                         for c in self.children]
         }
         if include_board:
-            d["board"] = self.board
+            d["board"] = board
+        return d
+
+    def stream_dict(self, include_board=True):
+        """to_dict as a JsonObject whose children are built while it is written"""
+        return self._stream_dict(include_board, self.board if include_board else None)
+
+    def _stream_dict(self, include_board, board):
+        items = [
+            ("move", self.move),
+            ("player", self.player),
+            ("score", self.score),
+            ("depth", self.depth),
+            ("children", (c._stream_dict(include_board,
+                                         self.child_board(board, c) if include_board else None)
+                          for c in self.children))
+        ]
+        if include_board:
+            items.append(("board", board))
+        return JsonObject(items)
+
+    def to_tree_dict(self, depth_limit):
+        """Node dicts in the layout of the other searchers' trees (TreeViewer)"""
+        if self.move is None:
+            node_type = "root"
+        else:
+            node_type = "max" if self.player == 2 else "min"
+        d = {
+            "value": self.score,
+            "type": node_type,
+            "depth": depth_limit - self.depth,
+            "children": [c.to_tree_dict(depth_limit) for c in self.children]
+        }
+        if self.move is not None:
+            d["column"] = self.move
         return d
 
-    def pretty_print(self, indent=0, show_board=False):
+    def _pretty_print(self, indent, show_board, board):
         pad = "  " * indent
         s = f"{pad}- move={self.move}, player={self.player}, score={self.score}, depth={self.depth}\n"
-        if show_board:
-            for row in self.board:
+        if show_board and board is not None:
+            for row in board:
                 s += pad + "  " + str(row) + "\n"
         for c in self.children:
-            s += c.pretty_print(indent + 1, show_board=show_board)
-        return s
\ No newline at end of file
+            s += c._pretty_print(indent + 1, show_board,
+                                 self.child_board(board, c) if show_board else None)
+        return s
@@ -1,9 +1,27 @@
 import copy
 import json
 
+from Trees.tree_json import JsonObject
+
+
+def play_move(board, move, player):
+    """Drop a disc on a 2D list board in place (lowest empty row of the column)"""
+    for row in range(len(board) - 1, -1, -1):
+        if board[row][move] == 0:
+            board[row][move] = player
+            return
+
+
 class TreeNode:
-    def __init__(self, board, move=None, player=None, depth=0):
-        self.board = copy.deepcopy(board)   # 2D list
+    # Only the root keeps a board (2D list); every other node rebuilds its
+    # board on demand by replaying the moves from the root, so a node costs
+    # a few slots instead of a full board copy
+    __slots__ = ("_board", "parent", "move", "player", "score", "children", "depth",
+                 "nodes_expanded")
+
+    def __init__(self, board=None, move=None, player=None, depth=0):
+        self._board = copy.deepcopy(board) if board is not None else None
+        self.parent = None                  # TreeNode this node was reached from
         self.move = move                    # column index that led here
         self.player = player                # player who just moved to get this state
         self.score = None                   # heuristic / minimax value
@@ -11,6 +29,43 @@ class TreeNode:
         self.depth = depth                  # depth from root (root depth = max_depth)
         self.nodes_expanded = 0             # optional stat
 
+    def add_child(self, child, move, player):
+        """Attach a child reached by `player` dropping a disc in column `move`"""
+        child.parent = self
+        child.move = move
+        child.player = player
+        self.children.append(child)
+        return child
+
+    @property
+    def board(self):
+        """Board at this node, replayed from the nearest node that keeps one"""
+        if self._board is not None or self.parent is None:
+            return self._board
+        path = []
+        node = self
+        while node._board is None and node.parent is not None:
+            path.append(node)
+            node = node.parent
+        if node._board is None:
+            return None
+        board = [row[:] for row in node._board]
+        for step in reversed(path):
+            play_move(board, step.move, step.player)
+        return board
+
+    @board.setter
+    def board(self, board):
+        self._board = board
+
+    def child_board(self, board, child):
+        """Board of a child given this node's board (None stays None)"""
+        if child._board is not None or board is None:
+            return child._board
+        child_board = [row[:] for row in board]
+        play_move(child_board, child.move, child.player)
+        return child_board
+
     # getters
     def get_board(self): return copy.deepcopy(self.board)
     def get_move(self): return self.move
@@ -21,6 +76,11 @@ class TreeNode:
 
     # serialize to python dict (JSON serializable)
     def to_dict(self, include_board=True, max_child_depth=None):
+        return self._to_dict(include_board, max_child_depth,
+                             self.board if include_board else None)
+
+    def _to_dict(self, include_board, max_child_depth, board):
+        # Child boards are built from this node's board, one move each
         d = {
             "move": self.move,
             "player": self.player,
@@ -28,19 +88,49 @@ class TreeNode:
             "depth": self.depth,
         }
         if include_board:
-            d["board"] = self.board
+            d["board"] = board
         if max_child_depth is None or self.depth > 0:
-            d["children"] = [c.to_dict(include_board=include_board, max_child_depth=max_child_depth) for c in self.children]
+            d["children"] = [c._to_dict(include_board, max_child_depth,
+                                        self.child_board(board, c) if include_board else None)
+                             for c in self.children]
         else:
             d["children"] = []
         return d
 
+    def stream_dict(self, include_board=True, max_child_depth=None):
+        """to_dict as a JsonObject whose children are built while it is written
+        (see Trees.tree_json), so the whole dict tree never exists at once"""
+        return self._stream_dict(include_board, max_child_depth,
+                                 self.board if include_board else None)
+
+    def _stream_dict(self, include_board, max_child_depth, board):
+        items = [
+            ("move", self.move),
+            ("player", self.player),
+            ("score", self.score),
+            ("depth", self.depth),
+        ]
+        if include_board:
+            items.append(("board", board))
+        if max_child_depth is None or self.depth > 0:
+            children = (c._stream_dict(include_board, max_child_depth,
+                                       self.child_board(board, c) if include_board else None)
+                        for c in self.children)
+        else:
+            children = []
+        items.append(("children", children))
+        return JsonObject(items)
+
     def pretty_print(self, indent=0, show_board=False):
+        return self._pretty_print(indent, show_board, self.board if show_board else None)
+
+    def _pretty_print(self, indent, show_board, board):
         pad = "  " * indent
         s = f"{pad}- move={self.move} player={self.player} score={self.score} depth={self.depth}\n"
-        if show_board:
-            for row in self.board:
+        if show_board and board is not None:
+            for row in board:
                 s += pad + "  " + str(row) + "\n"
         for c in self.children:
-            s += c.pretty_print(indent+1, show_board=show_board)
-        return s
\ No newline at end of file
+            s += c._pretty_print(indent+1, show_board,
+                                 self.child_board(board, c) if show_board else None)
+        return s
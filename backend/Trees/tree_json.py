@@ -0,0 +1,123 @@
+"""
+Streaming JSON serialization for search trees
+
+iter_json walks a value and yields its JSON text in chunks of about
+chunk_size characters, so a large tree is never turned into one big
+string. Nested dicts and lists (the searchers' trees), TreeNodes and
+JsonObjects are walked node by node. For TreeNodes and JsonObjects, even
+the child dicts are only built while their parent is being written.
+
+The output is what json.dumps gives for the equivalent plain structure
+(same separators, indentation and float formatting), with keys in
+insertion order.
+"""
+import json
+from collections.abc import Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class JsonObject:
+    """
+    A JSON object given as (key, value) pairs, produced while it is written
+    Values may be generators (written as arrays) or other JsonObjects.
+    """
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+
+def _is_flat(value):
+    """True for lists of scalars or of lists of scalars (boards, principal variations)"""
+    for item in value:
+        if isinstance(item, (list, tuple)):
+            if not all(isinstance(cell, _SCALARS) for cell in item):
+                return False
+        elif not isinstance(item, _SCALARS):
+            return False
+    return True
+
+
+def iter_json(value, indent=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield the JSON text of value in chunks
+    indent works like json.dumps(indent=...)
+    """
+    separators = (',', ':') if indent is None else (',', ': ')
+    encode = json.JSONEncoder(indent=indent, separators=separators).encode
+    item_separator, key_separator = separators
+
+    parts = []
+    size = 0
+    # Open containers: [iterator, is_object, has_items]
+    stack = []
+    pending = value
+    has_pending = True
+
+    while True:
+        if has_pending:
+            has_pending = False
+            item = pending
+            pending = None
+            if hasattr(item, 'stream_dict'):
+                item = item.stream_dict()
+
+            if isinstance(item, dict):
+                piece = '{'
+                stack.append([iter(item.items()), True, False])
+            elif isinstance(item, JsonObject):
+                piece = '{'
+                stack.append([iter(item.items), True, False])
+            elif isinstance(item, (list, tuple)) and not _is_flat(item):
+                piece = '['
+                stack.append([iter(item), False, False])
+            elif isinstance(item, Iterator):
+                piece = '['
+                stack.append([item, False, False])
+            else:
+                piece = encode(item)
+                if indent is not None and stack and '\n' in piece:
+                    piece = piece.replace('\n', '\n' + ' ' * (indent * len(stack)))
+        else:
+            if not stack:
+                break
+            top = stack[-1]
+            try:
+                item = next(top[0])
+            except StopIteration:
+                stack.pop()
+                closing = '}' if top[1] else ']'
+                if indent is not None and top[2]:
+                    piece = '\n' + ' ' * (indent * len(stack)) + closing
+                else:
+                    piece = closing
+            else:
+                piece = item_separator if top[2] else ''
+                top[2] = True
+                if indent is not None:
+                    piece += '\n' + ' ' * (indent * len(stack))
+                if top[1]:
+                    key, pending = item
+                    piece += encode(str(key)) + key_separator
+                else:
+                    pending = item
+                has_pending = True
+
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(parts)
+            parts = []
+            size = 0
+
+    if parts:
+        yield ''.join(parts)
+
+
+def dump_json(value, stream, indent=None, chunk_size=CHUNK_SIZE):
+    """Write value as JSON to a text stream, chunk by chunk"""
+    for chunk in iter_json(value, indent, chunk_size):
+        stream.write(chunk)
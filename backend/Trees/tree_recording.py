@@ -0,0 +1,31 @@
+"""
+Search tree recording options shared by the searchers
+
+The searchers only build tree node dicts for the plies they are asked to
+record, so a search with recording turned off allocates no nodes at all.
+"""
+
+TREE_NONE = 'none'
+TREE_TOP_LEVELS = 'top-k-levels'
+TREE_FULL = 'full'
+
+TREE_MODES = (TREE_NONE, TREE_TOP_LEVELS, TREE_FULL)
+
+DEFAULT_TREE_LEVELS = 2
+
+
+def recorded_plies(mode=TREE_FULL, levels=DEFAULT_TREE_LEVELS):
+    """
+    Deepest ply whose nodes are recorded
+
+    - 'none': -1, not even the root
+    - 'top-k-levels': the root plus the first `levels` plies of moves
+    - 'full': every ply
+    """
+    if mode == TREE_NONE:
+        return -1
+    if mode == TREE_TOP_LEVELS:
+        return levels
+    if mode == TREE_FULL:
+        return float('inf')
+    raise ValueError(f'Unknown tree mode: {mode}')
@@ -1,17 +1,72 @@
 """
 Flask API for Connect 4 AI
 """
-from flask import Flask, request, jsonify
+import json
+import queue
+import time
+from concurrent.futures import as_completed
+
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
 from game.board import Board
+from game.engines import BOARD_ENGINES, DEFAULT_ENGINE, create_board
 from Algorithms.minimax import MinimaxAlgorithm
 from Algorithms.alpha_beta import AlphaBetaAlgorithm
 from Algorithms.expectiminimax import ExpectiminiMaxAlgorithm
+from Algorithms.expectiminimax_star import StarExpectiminimaxAlgorithm
+from Algorithms.minimax_alpha_beta import WeightedAlphaBetaAlgorithm, DEFAULT_WEIGHTS
+from Algorithms.pvs import PrincipalVariationSearch, DEFAULT_ASPIRATION_WINDOW
+from Algorithms.mtdf import MTDFAlgorithm
+from Algorithms.move_ordering import MoveOrderer
+from Algorithms.search_control import iterative_deepening
+from Algorithms.parallel import (ParallelRootSearch, acquire_slot, cancel_slot, release_slot,
+                                 submit_search)
+from Trees.tree_recording import TREE_MODES, TREE_NONE, TREE_FULL, DEFAULT_TREE_LEVELS
+from Trees.tree_json import iter_json
+from Algorithms.transposition import (TranspositionTable, size_for_depth,
+                                      REPLACE_ALWAYS, REPLACE_DEPTH)
+from book.opening_book import OpeningBook
+from server.search_log import configure_logging, get_logger, TreeDumpWriter
+from server.response_cache import ResponseCache
+from server.tree_store import TreeStore, truncate_tree, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from server.search_jobs import JobManager, JobQueueFull, SearchJob, FINISHED
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
 
+configure_logging()
+logger = get_logger('api')
+tree_dumps = TreeDumpWriter()
+
+# Built offline with `python -m book.build_book`; None when there is no book file
+opening_book = OpeningBook.load()
+# The book holds minimax values, which do not apply to expectiminimax
+BOOK_ALGORITHMS = ('minimax', 'minimax_alpha_beta', 'pvs', 'mtdf')
+
+ALGORITHMS = ('minimax', 'minimax_alpha_beta', 'expectiminimax', 'expectiminimax_star',
+              'weighted_alpha_beta', 'pvs', 'mtdf')
+
+# Searchers that break ties by their move ordering, which the earlier
+# iterations of a job train: a job's result can differ from the single
+# search /api/move caches, so it is not cached
+ORDERING_TIE_ALGORITHMS = ('weighted_alpha_beta',)
+
+# Positions accepted by one /api/move/batch request
+MAX_BATCH_JOBS = 1000
+
+# Results of repeated (board, algorithm, depth, ...) requests
+response_cache = ResponseCache()
+
+# Full trees of recent searches, fetched level by level by the TreeViewer
+tree_store = TreeStore()
+
+# Searches run in the background for the /api/jobs endpoints
+job_manager = JobManager()
+
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE = 15
+
 @app.route('/api/move', methods=['POST'])
 def get_ai_move():
     """
@@ -20,125 +75,786 @@ def get_ai_move():
     Request body:
     {
         "board": [[0,0,0,...], ...],
-        "algorithm": "minimax" | "minimax_alpha_beta" | "expectiminimax",
+        "algorithm": "minimax" | "minimax_alpha_beta" | "expectiminimax" | "expectiminimax_star"
+                     | "weighted_alpha_beta" | "pvs" | "mtdf",
         "depth": 4,
-        "player": 2
+        "player": 2,
+        "boardEngine": "numpy" | "bitboard"   (optional, default "numpy"),
+        "ttSize": 1048576,                    (optional, alpha-beta / expectiminimax memo, 0 disables;
+                                               default sized from the depth)
+        "ttReplacement": "depth" | "always"   (optional),
+        "moveOrdering": true,                 (optional, alpha-beta only, default true)
+        "weights": {"three": 120, ...},       (optional, weighted_alpha_beta heuristic weights)
+        "aspirationWindow": 50,               (optional, pvs root window around the previous
+                                               iteration's value when time limited, 0 disables)
+        "timeLimitMs": 500,                   (optional, iterative deepening up to "depth")
+        "parallel": false,                    (optional, split the root across worker processes)
+        "tree": "none" | "top-k-levels" | "full"   (optional, default "full"),
+        "treeLevels": 2,                      (optional, plies kept by "top-k-levels")
+        "dumpTree": false,                    (optional, write the tree to a file in the background)
+        "useBook": true,                      (optional, answer from the opening book when possible)
+        "useCache": true,                     (optional, answer from the response cache when possible)
+        "stream": false,                      (optional, send the response as chunked JSON)
+        "treePaging": true,                   (optional, keep the tree server-side, see below)
+        "treeInlineLevels": 1                 (optional, tree levels returned inline when paging)
     }
     
+    The opening book answers when it has the position and "depth" is the
+    depth the book was built with; the response then has "source": "book"
+    and no tree.
+    
+    Otherwise a cached result for the same position and search parameters
+    is returned with "source": "cache"; the stats are those of the original
+    search. Time-limited searches are not cached.
+    
+    With "stream": true the response body is written in chunks while the
+    tree is serialized (Trees.tree_json), instead of being built as one
+    string first; useful with large trees.
+    
+    With "treePaging" (the default) the full tree is kept in the tree
+    store and the response only has its top "treeInlineLevels" levels,
+    every node carrying a "childCount"; the rest is fetched with
+    GET /api/tree/<searchId>/children.
+    
     Response:
     {
         "column": 3,
-        "tree": {...},
+        "tree": {...} | null,
+        "searchId": "..." | null,             (tree store id when the tree was paged)
         "nodesExpanded": 1250,
         "timeTaken": 0.345,
-        "evaluation": 10
+        "evaluation": 10,
+        "depthReached": 4,
+        "source": "search" | "book" | "cache",
+        "stats": {...}    (all search counters, e.g. ttHits / ttMisses)
     }
     """
     try:
+        request_start = time.perf_counter()
         data = request.get_json()
         
         # Extract parameters
         board_state = data.get('board')
         algorithm = data.get('algorithm', 'minimax_alpha_beta')
         depth = data.get('depth', 4)
+        engine = data.get('boardEngine', DEFAULT_ENGINE)
+        tt_size = data.get('ttSize')
+        tt_replacement = data.get('ttReplacement', REPLACE_DEPTH)
+        time_limit_ms = data.get('timeLimitMs')
+        move_ordering = data.get('moveOrdering', True)
+        aspiration_window = data.get('aspirationWindow', DEFAULT_ASPIRATION_WINDOW)
+        tree_mode = data.get('tree', TREE_FULL)
+        tree_levels = data.get('treeLevels', DEFAULT_TREE_LEVELS)
+        dump_tree = data.get('dumpTree', False)
+        parallel = data.get('parallel', False)
+        use_book = data.get('useBook', True)
+        use_cache = data.get('useCache', True) and time_limit_ms is None
+        weights = data.get('weights')
+        stream = data.get('stream', False)
+        tree_paging = data.get('treePaging', True)
+        inline_levels = data.get('treeInlineLevels', 1)
         
         # Validate inputs
-        if not board_state:
-            return jsonify({'error': 'Board state is required'}), 400
+        error = search_options_error(board_state, algorithm, depth, engine, tt_size,
+                                     tt_replacement, time_limit_ms, tree_mode, tree_levels,
+                                     weights, aspiration_window)
+        if error:
+            return jsonify({'error': error}), 400
+        if tt_size is None:
+            tt_size = size_for_depth(depth)
         
-        if depth < 1 or depth > 10:
-            return jsonify({'error': 'Depth must be between 1 and 10'}), 400
+        if not is_integer(inline_levels):
+            return jsonify({'error': 'treeInlineLevels must be an integer'}), 400
+        if inline_levels < 0:
+            return jsonify({'error': 'treeInlineLevels must not be negative'}), 400
+        
+        # Levels of the tree sent inline, None to send all of it
+        inline_levels = inline_levels if tree_paging and tree_store.enabled else None
         
         # Create board from state
-        board = Board(board_state)
+        board = create_board(board_state, engine)
         
         # Check if board is full
         if board.is_terminal():
             return jsonify({'error': 'Board is full'}), 400
         
+        if use_book:
+            book_move = find_book_move(board, algorithm, depth)
+            if book_move is not None:
+                return book_response(board, algorithm, depth, book_move, request_start, stream)
+        
+        cache_key, mirrored = make_cache_key(board, algorithm, depth, tree_mode, tree_levels,
+                                             tt_size, tt_replacement, move_ordering, weights)
+        if use_cache and response_cache.enabled:
+            cached = response_cache.get(cache_key, mirrored)
+            if cached is not None:
+                best_column, tree, stats = cached
+                logger.info('move', extra={'fields': {
+                    'algorithm': algorithm,
+                    'depth': depth,
+                    'column': best_column,
+                    'source': 'cache',
+                    'requestMs': round((time.perf_counter() - request_start) * 1000, 3),
+                    'evaluation': stats['evaluation']
+                }})
+                return move_response(board, best_column, tree, stats, 'cache', stream,
+                                     inline_levels)
+        
         # Select algorithm
-        if algorithm == 'minimax':
-            ai_algorithm = MinimaxAlgorithm(depth_limit=depth)
-        elif algorithm == 'minimax_alpha_beta':
-            ai_algorithm = AlphaBetaAlgorithm(depth_limit=depth)
-        elif algorithm == 'expectiminimax':
-            ai_algorithm = ExpectiminiMaxAlgorithm(depth_limit=depth)
+        ai_algorithm = build_searcher(algorithm, depth, tt_size, tt_replacement, move_ordering,
+                                      weights, tree_mode, tree_levels, aspiration_window)
+        
+        # Root columns are searched by the worker pool, which builds the same
+        # searcher from the request options in each worker
+        if parallel:
+            ai_algorithm = ParallelRootSearch(algorithm, depth_limit=depth, engine=engine, options={
+                'tree_mode': tree_mode,
+                'tree_levels': tree_levels,
+                'tt_size': tt_size,
+                'tt_replacement': tt_replacement,
+                'move_ordering': move_ordering,
+                'aspiration_window': aspiration_window,
+                'weights': weights
+            })
+        
+        # Get best move (deepest completed iteration when time limited)
+        if time_limit_ms is not None:
+            best_column, tree, stats = iterative_deepening(ai_algorithm, board,
+                                                           time_limit_ms, depth)
         else:
-            return jsonify({'error': f'Unknown algorithm: {algorithm}'}), 400
-        
-        # Get best move
-        best_column, tree, stats = ai_algorithm.get_best_move(board)
-        board.drop_disc(best_column,2)
-        score = board.check_winner()
-        
-        # Print tree to console (for debugging/verification)
-        print(f"\n{'='*50}")
-        print(f"Algorithm: {algorithm}")
-        print(f"Depth: {depth}")
-        print(f"Best Column: {best_column}")
-        print(f"Nodes Expanded: {stats['nodesExpanded']}")
-        print(f"Time Taken: {stats['timeTaken']:.4f}s")
-        print(f"Evaluation: {stats['evaluation']}")
-        print(f"{'='*50}\n")
-        print_tree(tree, indent=0)
-        print(f"\n{'='*50}\n")
+            best_column, tree, stats = ai_algorithm.get_best_move(board)
+            stats['depthReached'] = depth
+            if use_cache and response_cache.enabled:
+                response_cache.put(cache_key, mirrored, best_column, tree, stats)
         
-        # Return response
-        response = {
+        # Tree dumps are only written on request, by a background thread
+        if dump_tree:
+            tree_dumps.submit(tree, f'{algorithm}-d{depth}')
+        
+        logger.info('move', extra={'fields': {
+            'algorithm': algorithm,
+            'depth': depth,
+            'depthReached': stats['depthReached'],
             'column': best_column,
-            'tree': tree,
             'nodesExpanded': stats['nodesExpanded'],
-            'timeTaken': stats['timeTaken'],
-            'evaluation': stats['evaluation'],
-            'score': score
-            
-        }
+            'searchMs': round(stats['timeTaken'] * 1000, 2),
+            'requestMs': round((time.perf_counter() - request_start) * 1000, 2),
+            'evaluation': stats['evaluation']
+        }})
         
-        return jsonify(response), 200
+        return move_response(board, best_column, tree, stats, 'search', stream,
+                             inline_levels)
+    
+    except Exception as e:
+        logger.exception('request failed')
+        return jsonify({'error': str(e)}), 500
+
+
+def is_integer(value):
+    """JSON integers (true / false decode to bool, a subclass of int, and are not)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_number(value):
+    return is_integer(value) or isinstance(value, float)
+
+
+def search_options_error(board_state, algorithm, depth, engine, tt_size, tt_replacement,
+                         time_limit_ms, tree_mode, tree_levels, weights,
+                         aspiration_window=DEFAULT_ASPIRATION_WINDOW):
+    """Message for the first invalid search option, or None when all are valid"""
+    if not board_state:
+        return 'Board state is required'
+    if algorithm not in ALGORITHMS:
+        return f'Unknown algorithm: {algorithm}'
+    if not is_integer(depth):
+        return 'Depth must be an integer'
+    if depth < 1 or depth > 10:
+        return 'Depth must be between 1 and 10'
+    if not isinstance(engine, str) or engine not in BOARD_ENGINES:
+        return f'Unknown board engine: {engine}'
+    if tt_size is not None and not is_integer(tt_size):
+        return 'ttSize must be an integer'
+    if tt_size is not None and tt_size < 0:
+        return 'ttSize must not be negative'
+    if tt_replacement not in (REPLACE_ALWAYS, REPLACE_DEPTH):
+        return f'Unknown ttReplacement: {tt_replacement}'
+    if time_limit_ms is not None and not is_number(time_limit_ms):
+        return 'timeLimitMs must be a number'
+    if time_limit_ms is not None and time_limit_ms <= 0:
+        return 'timeLimitMs must be positive'
+    if tree_mode not in TREE_MODES:
+        return f'Unknown tree mode: {tree_mode}'
+    if not is_integer(tree_levels):
+        return 'treeLevels must be an integer'
+    if tree_levels < 0:
+        return 'treeLevels must not be negative'
+    if not is_number(aspiration_window):
+        return 'aspirationWindow must be a number'
+    if aspiration_window < 0:
+        return 'aspirationWindow must not be negative'
+    if weights is not None:
+        if not isinstance(weights, dict):
+            return 'weights must be an object'
+        unknown = [name for name in weights if name not in DEFAULT_WEIGHTS]
+        if unknown:
+            return f"Unknown weights: {', '.join(unknown)}"
+        if not all(isinstance(value, (int, float)) for value in weights.values()):
+            return 'weights must be numbers'
+    return None
+
+
+def build_searcher(algorithm, depth, tt_size, tt_replacement, move_ordering, weights,
+                   tree_mode, tree_levels, aspiration_window=DEFAULT_ASPIRATION_WINDOW):
+    """Create the searcher of a request (options already validated)"""
+    if algorithm == 'minimax':
+        return MinimaxAlgorithm(depth_limit=depth, tree_mode=tree_mode, tree_levels=tree_levels)
+    if algorithm == 'minimax_alpha_beta':
+        table = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        orderer = MoveOrderer() if move_ordering else None
+        return AlphaBetaAlgorithm(depth_limit=depth, transposition_table=table,
+                                  move_orderer=orderer, tree_mode=tree_mode,
+                                  tree_levels=tree_levels)
+    if algorithm == 'expectiminimax':
+        table = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        return ExpectiminiMaxAlgorithm(depth_limit=depth, transposition_table=table,
+                                       tree_mode=tree_mode, tree_levels=tree_levels)
+    if algorithm == 'expectiminimax_star':
+        return StarExpectiminimaxAlgorithm(depth_limit=depth, tree_mode=tree_mode,
+                                           tree_levels=tree_levels)
+    if algorithm == 'weighted_alpha_beta':
+        orderer = MoveOrderer() if move_ordering else None
+        return WeightedAlphaBetaAlgorithm(depth_limit=depth, weights=weights,
+                                          move_orderer=orderer, tree_mode=tree_mode,
+                                          tree_levels=tree_levels)
+    if algorithm == 'pvs':
+        table = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        orderer = MoveOrderer() if move_ordering else None
+        return PrincipalVariationSearch(depth_limit=depth, transposition_table=table,
+                                        move_orderer=orderer, tree_mode=tree_mode,
+                                        tree_levels=tree_levels,
+                                        aspiration_window=aspiration_window)
+    if algorithm == 'mtdf':
+        table = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        orderer = MoveOrderer() if move_ordering else None
+        # The book's values make first guesses for positions beyond its moves too
+        return MTDFAlgorithm(depth_limit=depth, transposition_table=table,
+                             move_orderer=orderer, tree_mode=tree_mode,
+                             tree_levels=tree_levels, opening_book=opening_book)
+    raise ValueError(f'Unknown algorithm: {algorithm}')
+
+
+def make_cache_key(board, algorithm, depth, tree_mode, tree_levels, tt_size, tt_replacement,
+                   move_ordering, weights):
+    """
+    Response cache key of a search: everything that changes the result
+    except the board engine, which gives identical results
+    Returns: (key, mirrored) as from board.canonical()
+    """
+    canonical_key, mirrored = board.canonical()
+    cache_key = (canonical_key, algorithm, depth, tree_mode, tree_levels,
+                 tt_size, tt_replacement, bool(move_ordering),
+                 tuple(sorted(weights.items())) if weights else None)
+    return cache_key, mirrored
+
+
+def page_tree(tree, inline_levels):
+    """
+    Put a tree in the tree store and keep its top inline_levels levels
+    (inline_levels None: keep the whole tree)
+    Returns: (tree to send, searchId or None)
+    """
+    if tree is None or inline_levels is None:
+        return tree, None
+    search_id = tree_store.put(tree)
+    if search_id is None:
+        return tree, None
+    return truncate_tree(tree, inline_levels), search_id
+
+
+def move_result(board, best_column, tree, stats, source, search_id=None):
+    """Result fields of a move (board is the position before the move)"""
+    board.drop_disc(best_column, 2)
+    score = board.check_winner()
+    
+    return {
+        'column': best_column,
+        'tree': tree,
+        'searchId': search_id,
+        'nodesExpanded': stats['nodesExpanded'],
+        'timeTaken': stats['timeTaken'],
+        'evaluation': stats['evaluation'],
+        'depthReached': stats['depthReached'],
+        'score': score,
+        'source': source,
+        'stats': stats
+    }
+
+
+def move_response(board, best_column, tree, stats, source, stream=False,
+                  inline_levels=None):
+    """
+    Build the /api/move response (board is the position before the move)
+    With stream=True the JSON is generated chunk by chunk as it is sent;
+    with inline_levels set, the tree goes to the tree store and only its
+    top levels are sent
+    """
+    tree, search_id = page_tree(tree, inline_levels)
+    response = move_result(board, best_column, tree, stats, source, search_id)
+    
+    if stream:
+        return Response(iter_json(response), mimetype='application/json'), 200
+    return jsonify(response), 200
+
+
+def find_book_move(board, algorithm, depth):
+    """
+    The opening book's move for a search request, or None. The book only
+    answers searches of the depth it was built with: a deeper request
+    would silently get a weaker move, a shallower one a stronger move.
+    Returns: (column, evaluation) as from OpeningBook.find_move
+    """
+    if (opening_book is None or algorithm not in BOOK_ALGORITHMS
+            or depth != opening_book.depth):
+        return None
+    return opening_book.find_move(board)
+
+
+def book_stats(evaluation, time_taken):
+    """Stats of a move answered by the opening book"""
+    return {
+        'nodesExpanded': 0,
+        'timeTaken': time_taken,
+        'evaluation': evaluation,
+        'depthReached': opening_book.depth
+    }
+
+
+def book_response(board, algorithm, depth, book_move, request_start, stream=False):
+    """Build the /api/move response for a position found in the opening book"""
+    best_column, evaluation = book_move
+    time_taken = time.perf_counter() - request_start
+    stats = book_stats(evaluation, time_taken)
+    
+    logger.info('move', extra={'fields': {
+        'algorithm': algorithm,
+        'depth': depth,
+        'column': best_column,
+        'source': 'book',
+        'requestMs': round(time_taken * 1000, 3),
+        'evaluation': evaluation
+    }})
+    
+    return move_response(board, best_column, None, stats, 'book', stream)
+
+
+@app.route('/api/move/batch', methods=['POST'])
+def get_ai_moves_batch():
+    """
+    Get AI moves for many positions in one request
+    
+    Request body:
+    {
+        "jobs": [{"board": [[...]], "algorithm": "minimax_alpha_beta", "depth": 6}, ...],
+        "defaults": {"depth": 4, ...},      (optional, fields applied to every job)
+        "order": "input" | "completion"     (optional, default "input")
+    }
+    
+    A job takes the search fields of /api/move ("board", "algorithm",
+    "depth", "boardEngine", "ttSize", "ttReplacement", "moveOrdering",
+    "weights", "aspirationWindow", "timeLimitMs", "tree", "treeLevels",
+    "useBook", "useCache");
+    "tree" defaults to "none". Jobs are answered from the opening book and
+    the response cache when possible and otherwise searched in the worker
+    pool (Algorithms.parallel), one task per position. Identical positions
+    are searched once, and searches in the same worker share its
+    transposition tables.
+    
+    Response: newline-delimited JSON, one line per job as soon as it is
+    available, in job order or in completion order:
+        {"index": 0, "column": 3, "tree": null, ..., "stats": {...}}
+        {"index": 1, "error": "Board is full"}
+    The result fields are those of /api/move; a job that fails only gets
+    an "error" and does not stop the others.
+    """
+    try:
+        request_start = time.perf_counter()
+        data = request.get_json()
+        
+        jobs = data.get('jobs')
+        defaults = data.get('defaults', {})
+        order = data.get('order', 'input')
+        
+        if not isinstance(jobs, list) or not jobs:
+            return jsonify({'error': 'jobs must be a non-empty list'}), 400
+        
+        if len(jobs) > MAX_BATCH_JOBS:
+            return jsonify({'error': f'At most {MAX_BATCH_JOBS} jobs per batch'}), 400
+        
+        if not isinstance(defaults, dict) or not all(isinstance(job, dict) for job in jobs):
+            return jsonify({'error': 'jobs and defaults must be objects'}), 400
+        
+        if order not in ('input', 'completion'):
+            return jsonify({'error': f'Unknown order: {order}'}), 400
+        
+        # Searches submitted so far, by position and options. They share one
+        # slot, so a client disconnect also stops the ones already running.
+        searches = {}
+        slot = acquire_slot()
+        entries = [start_batch_job(dict(defaults, **job), searches, slot) for job in jobs]
+        
+        futures = [entry[0] for entry in entries if not isinstance(entry, dict)]
+        
+        def release():
+            # Searches still running when the response closes (the client
+            # disconnected) stop at their next check
+            if not all(future.done() for future in futures):
+                cancel_slot(slot)
+            release_slot(slot, futures)
+        
+        response = Response(batch_lines(entries, order == 'completion', request_start),
+                            mimetype='application/x-ndjson')
+        response.call_on_close(release)
+        return response, 200
     
     except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('request failed')
         return jsonify({'error': str(e)}), 500
 
 
-def print_tree(node, indent=0):
+def start_batch_job(job, searches, slot=None):
+    """
+    Validate a batch job and answer it from the opening book or the
+    response cache, or submit its search to the worker pool under the
+    batch's slot (Algorithms.parallel.acquire_slot)
+    Returns: the job's result dict, or (future, board, cache key) for a
+    submitted search (cache key None when the result is not to be cached)
+    """
+    try:
+        board_state = job.get('board')
+        algorithm = job.get('algorithm', 'minimax_alpha_beta')
+        depth = job.get('depth', 4)
+        engine = job.get('boardEngine', DEFAULT_ENGINE)
+        tt_size = job.get('ttSize')
+        tt_replacement = job.get('ttReplacement', REPLACE_DEPTH)
+        time_limit_ms = job.get('timeLimitMs')
+        move_ordering = job.get('moveOrdering', True)
+        aspiration_window = job.get('aspirationWindow', DEFAULT_ASPIRATION_WINDOW)
+        tree_mode = job.get('tree', TREE_NONE)
+        tree_levels = job.get('treeLevels', DEFAULT_TREE_LEVELS)
+        use_book = job.get('useBook', True)
+        use_cache = job.get('useCache', True) and time_limit_ms is None
+        weights = job.get('weights')
+        
+        error = search_options_error(board_state, algorithm, depth, engine, tt_size,
+                                     tt_replacement, time_limit_ms, tree_mode, tree_levels,
+                                     weights, aspiration_window)
+        if error:
+            return {'error': error}
+        if tt_size is None:
+            tt_size = size_for_depth(depth)
+        
+        lookup_start = time.perf_counter()
+        board = create_board(board_state, engine)
+        if board.is_terminal():
+            return {'error': 'Board is full'}
+        
+        if use_book:
+            book_move = find_book_move(board, algorithm, depth)
+            if book_move is not None:
+                best_column, evaluation = book_move
+                stats = book_stats(evaluation, time.perf_counter() - lookup_start)
+                return move_result(board, best_column, None, stats, 'book')
+        
+        cache_key, mirrored = make_cache_key(board, algorithm, depth, tree_mode, tree_levels,
+                                             tt_size, tt_replacement, move_ordering, weights)
+        if use_cache and response_cache.enabled:
+            cached = response_cache.get(cache_key, mirrored)
+            if cached is not None:
+                return move_result(board, *cached, 'cache')
+        
+        # Time-limited searches depend on the machine's load, so they are
+        # neither shared nor cached
+        search_key = (cache_key, mirrored) if time_limit_ms is None else None
+        future = searches.get(search_key)
+        if future is None:
+            future = submit_search(algorithm, board.get_state(), engine, options={
+                'depth': depth,
+                'tree_mode': tree_mode,
+                'tree_levels': tree_levels,
+                'tt_size': tt_size,
+                'tt_replacement': tt_replacement,
+                'move_ordering': move_ordering,
+                'aspiration_window': aspiration_window,
+                'weights': weights
+            }, time_limit_ms=time_limit_ms, slot=slot)
+            if search_key is not None:
+                searches[search_key] = future
+        return future, board, search_key if use_cache else None
+    
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def batch_lines(entries, completion_order, request_start):
+    """
+    Yield the response lines of a batch from start_batch_job's entries,
+    waiting for the searches in job order or as they complete
+    """
+    sources = {'book': 0, 'cache': 0, 'search': 0, 'error': 0}
+    
+    def finish(index):
+        result = entries[index]
+        if not isinstance(result, dict):
+            future, board, cache_entry = result
+            try:
+                best_column, tree, stats = future.result()
+            except Exception as e:
+                logger.exception('batch search failed')
+                result = {'error': str(e)}
+            else:
+                if cache_entry is not None and response_cache.enabled:
+                    response_cache.put(*cache_entry, best_column, tree, stats)
+                result = move_result(board, best_column, tree, stats, 'search')
+        sources[result.get('source', 'error')] += 1
+        return ''.join(iter_json({'index': index, **result})) + '\n'
+    
+    searches = {}
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            searches.setdefault(entry[0], []).append(index)
+    
+    try:
+        if completion_order:
+            for index, entry in enumerate(entries):
+                if isinstance(entry, dict):
+                    yield finish(index)
+            for future in as_completed(searches):
+                for index in searches[future]:
+                    yield finish(index)
+        else:
+            for index in range(len(entries)):
+                yield finish(index)
+    finally:
+        # Searches the client no longer waits for (it disconnected)
+        for future in searches:
+            future.cancel()
+        logger.info('batch', extra={'fields': {
+            'jobs': len(entries),
+            'searches': len(searches),
+            'requestMs': round((time.perf_counter() - request_start) * 1000, 2),
+            **sources
+        }})
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
     """
-    Print tree in readable format to console
+    Start a search in the background
+    
+    Request body: the fields of /api/move, except "parallel", "dumpTree"
+    and "stream"
+    
+    The search runs by iterative deepening up to "depth" (within
+    "timeLimitMs" if given), so polling shows the best move of the deepest
+    finished iteration. A position found in the opening book or the
+    response cache gives a job that is already done; jobs without a time
+    limit put their results in the response cache.
+    
+    Response (202, or 200 when already done; 429 when the job queue is full):
+        the job, as from GET /api/jobs/<jobId>
     """
-    if not node:
-        return
+    try:
+        data = request.get_json()
+        
+        board_state = data.get('board')
+        algorithm = data.get('algorithm', 'minimax_alpha_beta')
+        depth = data.get('depth', 4)
+        engine = data.get('boardEngine', DEFAULT_ENGINE)
+        tt_size = data.get('ttSize')
+        tt_replacement = data.get('ttReplacement', REPLACE_DEPTH)
+        time_limit_ms = data.get('timeLimitMs')
+        move_ordering = data.get('moveOrdering', True)
+        aspiration_window = data.get('aspirationWindow', DEFAULT_ASPIRATION_WINDOW)
+        tree_mode = data.get('tree', TREE_FULL)
+        tree_levels = data.get('treeLevels', DEFAULT_TREE_LEVELS)
+        use_book = data.get('useBook', True)
+        use_cache = data.get('useCache', True) and time_limit_ms is None
+        weights = data.get('weights')
+        tree_paging = data.get('treePaging', True)
+        inline_levels = data.get('treeInlineLevels', 1)
+        
+        error = search_options_error(board_state, algorithm, depth, engine, tt_size,
+                                     tt_replacement, time_limit_ms, tree_mode, tree_levels,
+                                     weights, aspiration_window)
+        if error:
+            return jsonify({'error': error}), 400
+        if tt_size is None:
+            tt_size = size_for_depth(depth)
+        
+        if not is_integer(inline_levels):
+            return jsonify({'error': 'treeInlineLevels must be an integer'}), 400
+        if inline_levels < 0:
+            return jsonify({'error': 'treeInlineLevels must not be negative'}), 400
+        
+        inline_levels = inline_levels if tree_paging and tree_store.enabled else None
+        
+        lookup_start = time.perf_counter()
+        board = create_board(board_state, engine)
+        if board.is_terminal():
+            return jsonify({'error': 'Board is full'}), 400
+        
+        job = SearchJob(algorithm, depth, time_limit_ms)
+        
+        if use_book:
+            book_move = find_book_move(board, algorithm, depth)
+            if book_move is not None:
+                best_column, evaluation = book_move
+                stats = book_stats(evaluation, time.perf_counter() - lookup_start)
+                job_manager.finish(job, move_result(board, best_column, None, stats, 'book'))
+                return jsonify(job.to_dict()), 200
+        
+        cache_key, mirrored = make_cache_key(board, algorithm, depth, tree_mode, tree_levels,
+                                             tt_size, tt_replacement, move_ordering, weights)
+        if use_cache and response_cache.enabled:
+            cached = response_cache.get(cache_key, mirrored)
+            if cached is not None:
+                best_column, tree, stats = cached
+                tree, search_id = page_tree(tree, inline_levels)
+                job_manager.finish(job, move_result(board, best_column, tree, stats, 'cache',
+                                                    search_id))
+                return jsonify(job.to_dict()), 200
+        
+        searcher = build_searcher(algorithm, depth, tt_size, tt_replacement, move_ordering,
+                                  weights, tree_mode, tree_levels, aspiration_window)
+        
+        def run(job):
+            job.searcher = searcher
+            best_column, tree, stats = iterative_deepening(searcher, board, time_limit_ms, depth,
+                                                           deadline=job.deadline,
+                                                           on_iteration=job.record_iteration)
+            logger.info('job', extra={'fields': {
+                'jobId': job.id,
+                'algorithm': algorithm,
+                'depth': depth,
+                'depthReached': stats['depthReached'],
+                'column': best_column,
+                'nodesExpanded': stats['nodesExpanded'],
+                'searchMs': round(stats['timeTaken'] * 1000, 2),
+                'evaluation': stats['evaluation']
+            }})
+            if (use_cache and response_cache.enabled
+                    and algorithm not in ORDERING_TIE_ALGORITHMS):
+                response_cache.put(cache_key, mirrored, best_column, tree, stats)
+            tree, search_id = page_tree(tree, inline_levels)
+            return move_result(board, best_column, tree, stats, 'search', search_id)
+        
+        try:
+            job_manager.submit(job, run)
+        except JobQueueFull:
+            return jsonify({'error': 'Too many search jobs, try again later'}), 429, \
+                {'Retry-After': '1'}
+        return jsonify(job.to_dict()), 202
     
-    prefix = "  " * indent
-    node_type = node.get('type', 'unknown')
-    value = node.get('value', 'N/A')
-    column = node.get('column', '')
+    except Exception as e:
+        logger.exception('request failed')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Status, progress and (once done) result of a search job
     
-    # Print node info
-    if column != '':
-        print(f"{prefix}[{node_type.upper()}] Col:{column} Value:{value}", end='')
-    else:
-        print(f"{prefix}[{node_type.upper()}] Value:{value}", end='')
+    Response:
+    {
+        "jobId": "...",
+        "status": "queued" | "running" | "done" | "cancelled" | "failed",
+        "algorithm": "minimax",
+        "depth": 10,
+        "progress": {
+            "depth": 7,              (iteration in progress)
+            "depthCompleted": 6,
+            "nodesExpanded": 123456,
+            "nodesPerSecond": 54321.0,
+            "bestColumn": 3,         (best move of the deepest finished iteration)
+            "evaluation": 12,
+            "elapsed": 2.27
+        },
+        "result": {...} | null,      (the /api/move response fields once done)
+        "error": "..."               (only when failed)
+    }
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired jobId'}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-sent events with the progress of a search job
     
-    # Print alpha-beta values if present
-    if 'alpha' in node and 'beta' in node:
-        print(f" α:{node['alpha']} β:{node['beta']}", end='')
+    event: progress   the "progress" fields of GET /api/jobs/<jobId> plus
+                      "status", sent a few times a second while the search
+                      runs and after every finished iteration; includes
+                      "principalVariation" of the deepest finished iteration
+    event: done       the whole job, as from GET /api/jobs/<jobId>, when it
+                      has finished (done, cancelled or failed); the stream
+                      then ends
     
-    # Print probability if present (expectiminimax)
-    if 'probability' in node:
-        print(f" P:{node['probability']:.2f}", end='')
+    Progress is sampled from inside the search loop only while the job has
+    subscribers.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired jobId'}), 404
     
-    # Print if pruned
-    if node.get('pruned'):
-        print(" [PRUNED]", end='')
+    def format_event(event, data):
+        return f'event: {event}\ndata: {json.dumps(data)}\n\n'
     
-    print()
+    def stream():
+        events = job.subscribe()
+        try:
+            # Subscribed before looking at the status, so a job finishing
+            # now still sends its done event
+            if job.status in FINISHED:
+                yield format_event('done', job.to_dict())
+                return
+            yield format_event('progress', job.progress())
+            while True:
+                try:
+                    event, data = events.get(timeout=EVENT_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_event(event, data)
+                if event == 'done':
+                    return
+        finally:
+            job.unsubscribe(events)
     
-    # Print children
-    children = node.get('children', [])
-    for child in children:
-        print_tree(child, indent + 1)
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancel a search job; the search stops at its next deadline check and
+    the job keeps the progress it had made
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired jobId'}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/api/jobs/stats', methods=['GET'])
+def job_stats():
+    """Search job counts and queue limits"""
+    return jsonify(job_manager.get_stats()), 200
 
 
 @app.route('/api/health', methods=['GET'])
@@ -147,6 +863,70 @@ def health_check():
     return jsonify({'status': 'ok', 'message': 'Connect 4 AI backend is running'}), 200
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Response cache hit / miss counters and memory use"""
+    return jsonify(response_cache.get_stats()), 200
+
+
+@app.route('/api/tree/stats', methods=['GET'])
+def tree_store_stats():
+    """Tree store size and evictions"""
+    return jsonify(tree_store.get_stats()), 200
+
+
+@app.route('/api/tree/<search_id>', methods=['GET'])
+def get_tree(search_id):
+    """Full stored tree of a search, streamed"""
+    tree = tree_store.get(search_id)
+    if tree is None:
+        return jsonify({'error': 'Unknown or expired searchId'}), 404
+    return Response(iter_json(tree), mimetype='application/json'), 200
+
+
+@app.route('/api/tree/<search_id>/children', methods=['GET'])
+def get_tree_children(search_id):
+    """
+    Children of one node of a stored tree, a page at a time
+    
+    Query parameters:
+        path     child indices from the root, e.g. "0.3" (default "": the root)
+        levels   levels returned below the node, nodes at the cut keep
+                 only their childCount (default 1)
+        offset   first child returned (default 0)
+        limit    children per page (default 50, at most 500)
+    
+    Response:
+    {
+        "searchId": "...",
+        "path": [0, 3],
+        "offset": 0,
+        "total": 7,
+        "children": [{..., "childCount": 6, "children": []}, ...]
+    }
+    """
+    try:
+        path_param = request.args.get('path', '')
+        path = [int(index) for index in path_param.split('.')] if path_param else []
+        levels = int(request.args.get('levels', 1))
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'path, levels, offset and limit must be integers'}), 400
+    
+    if levels < 1 or offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'levels must be at least 1, offset not negative '
+                                 f'and limit between 1 and {MAX_PAGE_SIZE}'}), 400
+    
+    try:
+        page = tree_store.get_children(search_id, path, levels, offset, limit)
+    except IndexError as e:
+        return jsonify({'error': str(e)}), 400
+    if page is None:
+        return jsonify({'error': 'Unknown or expired searchId'}), 404
+    return jsonify(page), 200
+
+
 @app.route('/', methods=['GET'])
 def home():
     """Home endpoint"""
@@ -154,7 +934,16 @@ def home():
         'message': 'Connect 4 AI Backend',
         'endpoints': {
             '/api/move': 'POST - Get AI move',
-            '/api/health': 'GET - Health check'
+            '/api/move/batch': 'POST - Get AI moves for many positions',
+            '/api/jobs': 'POST - Start a background search',
+            '/api/jobs/<jobId>': 'GET - Search job progress and result, DELETE - Cancel it',
+            '/api/jobs/<jobId>/events': 'GET - Server-sent search progress events',
+            '/api/jobs/stats': 'GET - Search job statistics',
+            '/api/health': 'GET - Health check',
+            '/api/cache/stats': 'GET - Response cache statistics',
+            '/api/tree/<searchId>/children': 'GET - Page of a stored search tree node\'s children',
+            '/api/tree/<searchId>': 'GET - Full stored search tree',
+            '/api/tree/stats': 'GET - Tree store statistics'
         }
     }), 200
 
@@ -199,9 +988,7 @@ def get_score():
         return jsonify(response), 200
     
     except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('request failed')
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
@@ -0,0 +1,56 @@
+"""
+Fixed position corpus for the search benchmarks
+
+Positions are written as the columns played so far (0-6), in order. The
+players alternate and the first player is chosen so that the AI is to
+move, which is what every searcher assumes. Do not edit existing entries:
+baselines are matched by position name.
+"""
+from game.board import HUMAN, AI
+from game.engines import create_board
+
+OPENING = 'opening'
+MIDDLEGAME = 'middlegame'
+ENDGAME = 'endgame'
+
+CATEGORIES = (OPENING, MIDDLEGAME, ENDGAME)
+
+# (name, category, moves)
+POSITIONS = [
+    ('empty', OPENING, ''),
+    ('center', OPENING, '3'),
+    ('edge', OPENING, '0'),
+    ('center-stack', OPENING, '33'),
+    ('split-center', OPENING, '324'),
+    ('open-3', OPENING, '3324'),
+    ('mid-11', MIDDLEGAME, '22443643325'),
+    ('mid-14', MIDDLEGAME, '63434353132234'),
+    ('mid-17', MIDDLEGAME, '60562125655356653'),
+    ('mid-20', MIDDLEGAME, '63303043546415433462'),
+    ('mid-23', MIDDLEGAME, '35242464552225341120344'),
+    ('mid-26', MIDDLEGAME, '53134324423663144425131151'),
+    ('end-33', ENDGAME, '335504361130323124422121016245005'),
+    ('end-35', ENDGAME, '02014434332225422434563111361155600'),
+    ('end-36', ENDGAME, '503360342323065036524121220444514666'),
+    ('end-38', ENDGAME, '45201156231060431534234416152423203006'),
+    ('end-39', ENDGAME, '346242334445216646336355622152011501105'),
+    ('end-40', ENDGAME, '4321332444336422504212056310505161165506'),
+]
+
+
+def build_position(moves, engine='numpy'):
+    """Board of the given engine after playing moves, with the AI to move"""
+    board = create_board(None, engine)
+    player = HUMAN if len(moves) % 2 else AI
+    for col in moves:
+        board.drop_disc(int(col), player)
+        player = HUMAN if player == AI else AI
+    # Start the searcher from a clean move stack
+    return create_board(board.get_state(), engine)
+
+
+def select_positions(categories=None, names=None):
+    """Corpus entries filtered by category and / or name"""
+    return [(name, category, moves) for name, category, moves in POSITIONS
+            if (categories is None or category in categories)
+            and (names is None or name in names)]
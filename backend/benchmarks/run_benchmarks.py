@@ -0,0 +1,358 @@
+"""
+Search benchmark runner
+
+Runs every selected algorithm on the position corpus (benchmarks.corpus)
+at increasing depths and reports, per (algorithm, position, depth): the
+chosen column and evaluation, nodes expanded, nodes per second, wall time
+percentiles over the repeats and the peak memory of one search.
+
+Results are written as JSON. Given a previous results file as baseline,
+the run is compared against it: a different chosen column is a
+correctness regression (exit status 1), and wall time slowdowns beyond
+--slowdown are reported (and fail the run with --fail-on-slowdown).
+
+With --versus, every other algorithm of the run is also compared with the
+given one on the same positions, depth by depth: total nodes, total p50
+wall time and the positions where the chosen column differs.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --baseline results.json --output new.json
+    python -m benchmarks.run_benchmarks --algorithms minimax_alpha_beta --depths 1-10 \\
+        --category endgame --repeat 5
+    python -m benchmarks.run_benchmarks --algorithms minimax_alpha_beta,pvs --depths 4-10 \\
+        --versus minimax_alpha_beta
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from game.engines import BOARD_ENGINES, DEFAULT_ENGINE
+from Algorithms.minimax import MinimaxAlgorithm
+from Algorithms.alpha_beta import AlphaBetaAlgorithm
+from Algorithms.expectiminimax import ExpectiminiMaxAlgorithm
+from Algorithms.expectiminimax_star import StarExpectiminimaxAlgorithm
+from Algorithms.minimax_alpha_beta import WeightedAlphaBetaAlgorithm
+from Algorithms.pvs import PrincipalVariationSearch
+from Algorithms.mtdf import MTDFAlgorithm
+from Algorithms.move_ordering import MoveOrderer
+from Algorithms.transposition import TranspositionTable, size_for_depth
+from Trees.tree_recording import TREE_MODES, TREE_NONE
+from benchmarks.corpus import CATEGORIES, build_position, select_positions
+
+# Searchers as /api/move builds them by default (table sized from the depth,
+# see Algorithms.transposition.size_for_depth), by request name
+ALGORITHMS = {
+    'minimax': lambda depth, tree_mode: MinimaxAlgorithm(depth, tree_mode=tree_mode),
+    'minimax_alpha_beta': lambda depth, tree_mode: AlphaBetaAlgorithm(
+        depth, transposition_table=TranspositionTable(size_for_depth(depth)),
+        move_orderer=MoveOrderer(), tree_mode=tree_mode),
+    'expectiminimax': lambda depth, tree_mode: ExpectiminiMaxAlgorithm(
+        depth, transposition_table=TranspositionTable(size_for_depth(depth)), tree_mode=tree_mode),
+    'expectiminimax_star': lambda depth, tree_mode: StarExpectiminimaxAlgorithm(
+        depth, tree_mode=tree_mode),
+    'weighted_alpha_beta': lambda depth, tree_mode: WeightedAlphaBetaAlgorithm(
+        depth, move_orderer=MoveOrderer(), tree_mode=tree_mode),
+    'pvs': lambda depth, tree_mode: PrincipalVariationSearch(
+        depth, transposition_table=TranspositionTable(size_for_depth(depth)),
+        move_orderer=MoveOrderer(), tree_mode=tree_mode),
+    'mtdf': lambda depth, tree_mode: MTDFAlgorithm(
+        depth, transposition_table=TranspositionTable(size_for_depth(depth)),
+        move_orderer=MoveOrderer(), tree_mode=tree_mode),
+}
+
+DEFAULT_DEPTHS = range(1, 11)
+DEFAULT_REPEAT = 3
+# Deeper depths are skipped once a search takes longer than this
+DEFAULT_MAX_SECONDS = 5.0
+DEFAULT_SLOWDOWN = 1.25
+# Searches faster than this are too noisy for wall time comparisons
+MIN_COMPARE_SECONDS = 0.01
+
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def run_case(algorithm_name, depth, moves, engine, repeat, tree_mode):
+    """
+    Benchmark one search
+    Returns: result dict (without the position fields)
+    """
+    factory = ALGORITHMS[algorithm_name]
+    times = []
+    for _ in range(repeat):
+        algorithm = factory(depth, tree_mode)
+        board = build_position(moves, engine)
+        start = time.perf_counter()
+        column, _, stats = algorithm.get_best_move(board)
+        times.append(time.perf_counter() - start)
+
+    # Peak memory from one extra run: tracemalloc slows the search down, so
+    # it is kept out of the timed runs
+    algorithm = factory(depth, tree_mode)
+    board = build_position(moves, engine)
+    tracemalloc.start()
+    algorithm.get_best_move(board)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = percentile(times, 0.5)
+    return {
+        'column': column,
+        'evaluation': stats['evaluation'],
+        'nodes': stats['nodesExpanded'],
+        'nodesPerSecond': stats['nodesExpanded'] / median if median else None,
+        'wallTime': {
+            'min': min(times),
+            'p50': median,
+            'p90': percentile(times, 0.9),
+            'max': max(times),
+            'mean': sum(times) / len(times)
+        },
+        'peakMemoryBytes': peak
+    }
+
+
+def run_benchmarks(algorithms, depths, positions, engine=DEFAULT_ENGINE,
+                   repeat=DEFAULT_REPEAT, max_seconds=DEFAULT_MAX_SECONDS,
+                   tree_mode=TREE_NONE, log=sys.stderr):
+    """
+    Run the benchmark matrix
+    Returns: (results, skipped), skipped listing the (algorithm, position)
+    pairs whose deeper depths went over max_seconds
+    """
+    results = []
+    skipped = []
+    for algorithm_name in algorithms:
+        for name, category, moves in positions:
+            for depth in depths:
+                result = run_case(algorithm_name, depth, moves, engine, repeat, tree_mode)
+                result.update({
+                    'algorithm': algorithm_name,
+                    'engine': engine,
+                    'position': name,
+                    'category': category,
+                    'depth': depth
+                })
+                results.append(result)
+                if log is not None:
+                    print(f"{algorithm_name:20} {name:14} d={depth:<2} col={result['column']} "
+                          f"nodes={result['nodes']:<9} p50={result['wallTime']['p50'] * 1000:.1f}ms",
+                          file=log)
+
+                if result['wallTime']['p50'] > max_seconds and depth != depths[-1]:
+                    skipped.append({'algorithm': algorithm_name, 'position': name,
+                                    'fromDepth': depth + 1})
+                    break
+    return results, skipped
+
+
+def result_key(result):
+    return result['algorithm'], result['engine'], result['position'], result['depth']
+
+
+def compare(results, baseline_results, slowdown=DEFAULT_SLOWDOWN):
+    """
+    Compare a run with a baseline run
+    Returns: dict of moveChanges (correctness regressions), evaluationChanges,
+    nodeChanges, slowdowns and speedups
+    """
+    baseline = {result_key(result): result for result in baseline_results}
+    comparison = {
+        'compared': 0,
+        'moveChanges': [],
+        'evaluationChanges': [],
+        'nodeChanges': [],
+        'slowdowns': [],
+        'speedups': []
+    }
+
+    for result in results:
+        base = baseline.get(result_key(result))
+        if base is None:
+            continue
+        comparison['compared'] += 1
+        case = dict(zip(('algorithm', 'engine', 'position', 'depth'), result_key(result)))
+
+        if result['column'] != base['column']:
+            comparison['moveChanges'].append(dict(case, baseline=base['column'],
+                                                  current=result['column']))
+        if result['evaluation'] != base['evaluation']:
+            comparison['evaluationChanges'].append(dict(case, baseline=base['evaluation'],
+                                                        current=result['evaluation']))
+        if result['nodes'] != base['nodes']:
+            comparison['nodeChanges'].append(dict(case, baseline=base['nodes'],
+                                                  current=result['nodes']))
+
+        base_time = base['wallTime']['p50']
+        if base_time >= MIN_COMPARE_SECONDS:
+            ratio = result['wallTime']['p50'] / base_time
+            if ratio > slowdown:
+                comparison['slowdowns'].append(dict(case, ratio=ratio))
+            elif ratio < 1 / slowdown:
+                comparison['speedups'].append(dict(case, ratio=ratio))
+
+    return comparison
+
+
+def compare_algorithms(results, base_algorithm):
+    """
+    Compare every algorithm of a run with base_algorithm, per depth, over
+    the positions both searched at that depth
+    Returns: list of dicts (algorithm, depth, positions, nodes, baseNodes,
+    nodesRatio, wallTime, baseWallTime, timeRatio, moveDifferences)
+    """
+    base = {(result['engine'], result['position'], result['depth']): result
+            for result in results if result['algorithm'] == base_algorithm}
+    totals = {}
+    for result in results:
+        if result['algorithm'] == base_algorithm:
+            continue
+        base_result = base.get((result['engine'], result['position'], result['depth']))
+        if base_result is None:
+            continue
+        total = totals.setdefault((result['algorithm'], result['depth']), {
+            'algorithm': result['algorithm'],
+            'depth': result['depth'],
+            'positions': 0,
+            'nodes': 0,
+            'baseNodes': 0,
+            'wallTime': 0.0,
+            'baseWallTime': 0.0,
+            'moveDifferences': []
+        })
+        total['positions'] += 1
+        total['nodes'] += result['nodes']
+        total['baseNodes'] += base_result['nodes']
+        total['wallTime'] += result['wallTime']['p50']
+        total['baseWallTime'] += base_result['wallTime']['p50']
+        if result['column'] != base_result['column']:
+            total['moveDifferences'].append(result['position'])
+
+    summary = []
+    for total in totals.values():
+        total['nodesRatio'] = total['nodes'] / total['baseNodes'] if total['baseNodes'] else None
+        total['timeRatio'] = (total['wallTime'] / total['baseWallTime']
+                              if total['baseWallTime'] else None)
+        summary.append(total)
+    summary.sort(key=lambda total: (total['algorithm'], total['depth']))
+    return summary
+
+
+def parse_depths(text):
+    """'1-10' or '2,4,6' -> list of depths"""
+    depths = []
+    for part in text.split(','):
+        if '-' in part:
+            low, high = part.split('-')
+            depths.extend(range(int(low), int(high) + 1))
+        else:
+            depths.append(int(part))
+    if not depths or min(depths) < 1:
+        raise argparse.ArgumentTypeError('depths must be positive')
+    return sorted(set(depths))
+
+
+def parse_list(text):
+    return [item for item in text.split(',') if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Connect 4 searchers')
+    parser.add_argument('--algorithms', type=parse_list, default=list(ALGORITHMS),
+                        help='comma-separated algorithm names (default: all)')
+    parser.add_argument('--depths', type=parse_depths, default=list(DEFAULT_DEPTHS),
+                        help="depths as '1-10' or '2,4,6' (default 1-10)")
+    parser.add_argument('--engine', choices=sorted(BOARD_ENGINES), default=DEFAULT_ENGINE)
+    parser.add_argument('--category', type=parse_list, default=None,
+                        help=f"comma-separated categories ({', '.join(CATEGORIES)})")
+    parser.add_argument('--positions', type=parse_list, default=None,
+                        help='comma-separated position names from the corpus')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='timed runs per search (default 3)')
+    parser.add_argument('--max-seconds', type=float, default=DEFAULT_MAX_SECONDS,
+                        help='skip deeper depths once a search takes longer (default 5)')
+    parser.add_argument('--tree', choices=TREE_MODES, default=TREE_NONE,
+                        help='tree recording mode of the searchers (default none)')
+    parser.add_argument('--output', help='write results JSON here (default stdout)')
+    parser.add_argument('--baseline', help='results JSON of an earlier run to compare with')
+    parser.add_argument('--slowdown', type=float, default=DEFAULT_SLOWDOWN,
+                        help='p50 wall time ratio reported as a slowdown (default 1.25)')
+    parser.add_argument('--fail-on-slowdown', action='store_true',
+                        help='exit with status 1 on slowdowns too')
+    parser.add_argument('--versus',
+                        help='compare the other algorithms of the run with this one')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.algorithms if name not in ALGORITHMS]
+    if unknown:
+        parser.error(f"unknown algorithms: {', '.join(unknown)}")
+    if args.versus is not None and args.versus not in args.algorithms:
+        parser.error('--versus must be one of the algorithms of the run')
+    positions = select_positions(args.category, args.positions)
+    if not positions:
+        parser.error('no corpus positions selected')
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    results, skipped = run_benchmarks(args.algorithms, args.depths, positions, args.engine,
+                                      args.repeat, args.max_seconds, args.tree)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'engine': args.engine,
+            'repeat': args.repeat,
+            'tree': args.tree
+        },
+        'results': results,
+        'skipped': skipped
+    }
+
+    if args.versus is not None:
+        versus = compare_algorithms(results, args.versus)
+        report['versus'] = {'algorithm': args.versus, 'summary': versus}
+        for total in versus:
+            nodes_ratio = f"{total['nodesRatio']:.3f}" if total['nodesRatio'] is not None else '-'
+            time_ratio = f"{total['timeRatio']:.3f}" if total['timeRatio'] is not None else '-'
+            print(f"{total['algorithm']:20} vs {args.versus} d={total['depth']:<2} "
+                  f"positions={total['positions']:<3} nodes x{nodes_ratio} time x{time_ratio} "
+                  f"move differences={len(total['moveDifferences'])}", file=sys.stderr)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = compare(results, baseline['results'], args.slowdown)
+        report['comparison'] = comparison
+        print(f"compared {comparison['compared']} searches: "
+              f"{len(comparison['moveChanges'])} move changes, "
+              f"{len(comparison['slowdowns'])} slowdowns, "
+              f"{len(comparison['speedups'])} speedups", file=sys.stderr)
+        for change in comparison['moveChanges']:
+            print(f"MOVE CHANGED {change['algorithm']} {change['position']} d={change['depth']}: "
+                  f"{change['baseline']} -> {change['current']}", file=sys.stderr)
+        if comparison['moveChanges'] or (args.fail_on_slowdown and comparison['slowdowns']):
+            status = 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Offline opening book builder
+
+Searches every position with the AI to move and fewer than --plies discs
+(with either player starting) using alpha-beta, and writes the best moves
+to a book file for /api/move.
+
+Usage (from the backend directory):
+    python -m book.build_book --plies 6 --depth 8 [--engine bitboard] [--output path]
+"""
+import argparse
+import time
+
+from game.board import AI, HUMAN
+from game.engines import BOARD_ENGINES, create_board
+from Algorithms.alpha_beta import AlphaBetaAlgorithm
+from Algorithms.move_ordering import MoveOrderer
+from Algorithms.transposition import TranspositionTable
+from Trees.tree_recording import TREE_NONE
+from book.opening_book import write_book, DEFAULT_BOOK_PATH
+
+
+def collect_positions(plies, engine='bitboard'):
+    """
+    All distinct positions with the AI to move and fewer than plies discs,
+    both orientations of each
+    Returns: {position_hash: board}
+    """
+    positions = {}
+
+    def visit(board, player, discs):
+        if discs >= plies or board.is_terminal():
+            return
+        if player == AI:
+            if board.hash in positions:
+                return
+            positions[board.hash] = board.copy()
+        next_player = HUMAN if player == AI else AI
+        for col in board.get_valid_columns():
+            board.drop_disc(col, player)
+            visit(board, next_player, discs + 1)
+            board.undo_disc()
+
+    visit(create_board(None, engine), HUMAN, 0)
+    visit(create_board(None, engine), AI, 0)
+    return positions
+
+
+def build_book(plies, depth, engine='bitboard'):
+    """
+    Search every book position
+    Returns: {position_hash: (column, evaluation)}
+    """
+    positions = collect_positions(plies, engine)
+    # One table for the whole run: positions share most of their subtrees
+    algorithm = AlphaBetaAlgorithm(depth, transposition_table=TranspositionTable(),
+                                   move_orderer=MoveOrderer(), tree_mode=TREE_NONE)
+
+    entries = {}
+    start_time = time.time()
+    for index, (key, board) in enumerate(positions.items(), 1):
+        column, _, stats = algorithm.get_best_move(board)
+        entries[key] = (column, stats['evaluation'])
+        if index % 100 == 0 or index == len(positions):
+            print(f'{index}/{len(positions)} positions, {time.time() - start_time:.1f}s')
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the Connect 4 opening book')
+    parser.add_argument('--plies', type=int, default=6,
+                        help='book positions have fewer discs than this (default 6)')
+    parser.add_argument('--depth', type=int, default=8,
+                        help='alpha-beta search depth per position (default 8)')
+    parser.add_argument('--engine', choices=sorted(BOARD_ENGINES), default='bitboard',
+                        help='board engine used for the searches (default bitboard)')
+    parser.add_argument('--output', default=DEFAULT_BOOK_PATH, help='book file to write')
+    args = parser.parse_args()
+
+    entries = build_book(args.plies, args.depth, args.engine)
+    write_book(args.output, entries, args.plies, args.depth)
+    print(f'Wrote {len(entries)} positions to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Opening book: precomputed AI moves for early positions
+
+The book file is a small header followed by fixed-size records sorted by
+position hash, so it can be memory-mapped and searched in place:
+
+    header:  magic 'C4BK', version, plies, depth, entry count
+    record:  position hash (uint64), column (int8), evaluation (int32)
+
+Positions are keyed by the board's Zobrist hash (game.board), which is the
+same for every board engine and process. A position and its mirror image
+have a record each: the searches prefer the leftmost of equally good
+columns, so the mirror of one answer is not always the other's.
+"""
+import mmap
+import os
+import struct
+
+MAGIC = b'C4BK'
+VERSION = 3
+
+HEADER = struct.Struct('<4sHBBI')
+RECORD = struct.Struct('<Qbi')
+
+DEFAULT_BOOK_PATH = os.environ.get(
+    'CONNECT4_BOOK',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+)
+
+
+def write_book(path, entries, plies, depth):
+    """
+    Write a book file
+    entries: {position_hash: (column, evaluation)}
+    """
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, plies, depth, len(entries)))
+        for key in sorted(entries):
+            column, value = entries[key]
+            f.write(RECORD.pack(key, column, int(value)))
+
+
+class OpeningBook:
+    """Read-only view of a book file, searched by binary search on the mapping"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.plies, self.depth, self.size = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} opening book')
+        if len(self.data) != HEADER.size + self.size * RECORD.size:
+            raise ValueError(f'{path} is truncated')
+
+    @classmethod
+    def load(cls, path=DEFAULT_BOOK_PATH):
+        """Open the book at path, or return None if there is no book file"""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def lookup(self, key):
+        """
+        Find a position by hash
+        Returns: (column, evaluation), or None if the position is not in the book
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, column, value = RECORD.unpack_from(self.data, HEADER.size + middle * RECORD.size)
+            if entry_key == key:
+                return column, value
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def find_move(self, board):
+        """
+        Find a board's position
+        Returns: (column, evaluation), or None
+        """
+        return self.lookup(board.hash)
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        self.data.close()
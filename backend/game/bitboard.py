@@ -0,0 +1,179 @@
+"""
+Bitboard representation of the Connect 4 board
+
+Each player's discs are stored in one integer mask. Every column uses
+ROWS + 1 bits (bottom to top) where the extra bit is an always-empty
+sentinel, so shifting a mask never wraps from one column into the next.
+
+    col:  0  1  2  3  4  5  6
+          6 13 20 27 34 41 48   <- sentinel
+          5 12 19 26 33 40 47
+          4 11 18 25 32 39 46
+          3 10 17 24 31 38 45
+          2  9 16 23 30 37 44
+          1  8 15 22 29 36 43
+          0  7 14 21 28 35 42   <- bottom row
+"""
+from game.board import EMPTY, HUMAN, AI, ROWS, COLS, ZOBRIST_KEYS, canonical_key
+
+HEIGHT = ROWS + 1
+
+# Bit shifts for vertical, horizontal, diagonal (/) and diagonal (\) lines
+DIRECTIONS = (1, HEIGHT, HEIGHT + 1, HEIGHT - 1)
+
+
+def cell_bit(row, col):
+    """Bit for a cell given in Board coordinates (row 0 is the top row)"""
+    return 1 << (col * HEIGHT + (ROWS - 1 - row))
+
+
+def _build_bit_zobrist_keys(mirrored=False):
+    """
+    ZOBRIST_KEYS re-indexed by bit position instead of row * COLS + col
+    With mirrored=True, each bit gets the key of the reflected cell
+    """
+    keys = [[0] * (COLS * HEIGHT) for _ in ZOBRIST_KEYS]
+    for player, player_keys in enumerate(ZOBRIST_KEYS):
+        for row in range(ROWS):
+            for col in range(COLS):
+                key_col = COLS - 1 - col if mirrored else col
+                keys[player][col * HEIGHT + (ROWS - 1 - row)] = player_keys[row * COLS + key_col]
+    return keys
+
+
+BIT_ZOBRIST_KEYS = _build_bit_zobrist_keys()
+BIT_MIRROR_ZOBRIST_KEYS = _build_bit_zobrist_keys(mirrored=True)
+BOARD_MASK = sum(cell_bit(row, col) for row in range(ROWS) for col in range(COLS))
+CENTER_MASK = sum(cell_bit(row, COLS // 2) for row in range(ROWS))
+
+
+def count_fours(mask):
+    """Count the 4-in-a-row windows fully covered by a mask"""
+    count = 0
+    for shift in DIRECTIONS:
+        pairs = mask & (mask >> shift)
+        count += (pairs & (pairs >> (2 * shift))).bit_count()
+    return count
+
+
+class BitBoard:
+    """Connect 4 board stored as two bit masks plus column heights"""
+
+    def __init__(self, board_state=None):
+        """Initialize board from state or create empty board"""
+        # Indexed by player id so masks[HUMAN] / masks[AI] work directly
+        self.masks = [0, 0, 0]
+        self.heights = [0] * COLS
+        self.moves = []
+        # Zobrist hashes, same values as Board.hash / Board.mirror_hash
+        self.hash = 0
+        self.mirror_hash = 0
+        # Optional game.heuristic.IncrementalEvaluator, as on Board
+        self.evaluator = None
+
+        if board_state is not None:
+            for row in range(ROWS):
+                for col in range(COLS):
+                    player = int(board_state[row][col])
+                    if player != EMPTY:
+                        self.masks[player] |= cell_bit(row, col)
+                        self.heights[col] += 1
+                        self.hash ^= ZOBRIST_KEYS[player][row * COLS + col]
+                        self.mirror_hash ^= ZOBRIST_KEYS[player][row * COLS + COLS - 1 - col]
+
+    def copy(self):
+        """Create a copy of the board (the move stack is not copied)"""
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.masks = self.masks[:]
+        new_board.heights = self.heights[:]
+        new_board.hash = self.hash
+        new_board.mirror_hash = self.mirror_hash
+        new_board.moves = []
+        new_board.evaluator = None
+        if self.evaluator is not None:
+            self.evaluator.copy(new_board)
+        return new_board
+
+    def is_valid_column(self, col):
+        """Check if a column has space for a disc"""
+        return self.heights[col] < ROWS
+
+    def get_valid_columns(self):
+        """Get all valid columns"""
+        heights = self.heights
+        return [col for col in range(COLS) if heights[col] < ROWS]
+
+    def drop_disc(self, col, player):
+        """Drop a disc in the specified column"""
+        height = self.heights[col]
+        if height >= ROWS:
+            return False
+
+        index = col * HEIGHT + height
+        self.masks[player] |= 1 << index
+        self.heights[col] = height + 1
+        self.hash ^= BIT_ZOBRIST_KEYS[player][index]
+        self.mirror_hash ^= BIT_MIRROR_ZOBRIST_KEYS[player][index]
+        self.moves.append((col, player))
+        if self.evaluator is not None:
+            self.evaluator.disc_dropped(ROWS - 1 - height, col, player)
+        return True
+
+    def undo_disc(self):
+        """Take back the last disc dropped with drop_disc"""
+        col, player = self.moves.pop()
+        height = self.heights[col] - 1
+        index = col * HEIGHT + height
+        self.masks[player] &= ~(1 << index)
+        self.heights[col] = height
+        self.hash ^= BIT_ZOBRIST_KEYS[player][index]
+        self.mirror_hash ^= BIT_MIRROR_ZOBRIST_KEYS[player][index]
+        if self.evaluator is not None:
+            self.evaluator.disc_undone(ROWS - 1 - height, col, player)
+        return col
+
+    def canonical(self):
+        """Canonical key of the position, see game.board.canonical_key"""
+        return canonical_key(self.hash, self.mirror_hash)
+
+    def is_full(self):
+        """Check if the board is completely full"""
+        return (self.masks[HUMAN] | self.masks[AI]) == BOARD_MASK
+
+    def check_winner(self):
+        """
+        Check for connect-4s and return counts for each player
+        Returns: (human_count, ai_count)
+        """
+        return count_fours(self.masks[HUMAN]), count_fours(self.masks[AI])
+
+    def is_terminal(self):
+        """Check if game is over (board full)"""
+        return self.is_full()
+
+    def get_cell(self, row, col):
+        """Get the player occupying a cell (Board coordinates)"""
+        bit = cell_bit(row, col)
+        if self.masks[HUMAN] & bit:
+            return HUMAN
+        if self.masks[AI] & bit:
+            return AI
+        return EMPTY
+
+    def get_state(self):
+        """Get current board state as list"""
+        return [[self.get_cell(row, col) for col in range(COLS)]
+                for row in range(ROWS)]
+
+    def getScore(self):
+        """Get score as (human_score, ai_score)"""
+        return self.check_winner()
+
+    def __str__(self):
+        """String representation of the board"""
+        result = []
+        for row in self.get_state():
+            result.append(' '.join(['.' if cell == EMPTY else
+                                   'R' if cell == HUMAN else
+                                   'Y' for cell in row]))
+        return '\n'.join(result)
@@ -1,6 +1,8 @@
 """
 Board representation and game logic for Connect 4
 """
+import random
+
 import numpy as np
 
 EMPTY = 0
@@ -10,6 +12,58 @@ AI = 2
 ROWS = 6
 COLS = 7
 
+# Directions: horizontal, vertical, diagonal-right, diagonal-left
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Zobrist hashing: a fixed random 64-bit key per (player, cell). A position's
+# hash is the XOR of the keys of its discs, so a move updates it with one XOR.
+# The generator is seeded so hashes match across processes and board engines.
+_zobrist_rng = random.Random(0x0C04)
+ZOBRIST_KEYS = [
+    [0] * (ROWS * COLS),  # EMPTY
+    [_zobrist_rng.getrandbits(64) for _ in range(ROWS * COLS)],  # HUMAN
+    [_zobrist_rng.getrandbits(64) for _ in range(ROWS * COLS)]   # AI
+]
+# XOR-ed in by searchers when the AI (maximizing player) is to move
+ZOBRIST_SIDE_KEY = _zobrist_rng.getrandbits(64)
+
+
+def zobrist_hash(board_state, mirrored=False):
+    """
+    Compute the Zobrist hash of a board state (rows of cells) from scratch
+    With mirrored=True, hash the state's left-right reflection instead
+    """
+    value = 0
+    for row in range(ROWS):
+        for col in range(COLS):
+            player = int(board_state[row][col])
+            if player != EMPTY:
+                key_col = mirror_column(col) if mirrored else col
+                value ^= ZOBRIST_KEYS[player][row * COLS + key_col]
+    return value
+
+
+# Mirror symmetry: a position and its left-right reflection have the same
+# value, and column c in one is column COLS - 1 - c in the other. Caches
+# key positions by the smaller of the two hashes (the canonical key) and
+# store moves in the orientation of that key.
+
+def mirror_column(col):
+    """Column col as seen in the left-right reflection of the board"""
+    return COLS - 1 - col
+
+
+def canonical_key(position_hash, mirror_hash):
+    """
+    Canonical key of a position given its hash and its reflection's hash
+    Returns: (key, mirrored), mirrored being True when the key is the
+    reflection's, i.e. moves must go through mirror_column
+    """
+    if mirror_hash < position_hash:
+        return mirror_hash, True
+    return position_hash, False
+
+
 class Board:
     """Represents the Connect 4 game board"""
     
@@ -19,10 +73,30 @@ class Board:
             self.board = np.array(board_state)
         else:
             self.board = np.zeros((ROWS, COLS), dtype=int)
+        
+        # Running connect-4 counts and hashes, updated by drop_disc / undo_disc
+        self.human_count, self.ai_count = self.count_connect4s()
+        self.hash = zobrist_hash(self.board)
+        self.mirror_hash = zobrist_hash(self.board, mirrored=True)
+        # Move stack: (row, col, player, connect-4s made by the move)
+        self.moves = []
+        # Optional game.heuristic.IncrementalEvaluator, told about every
+        # drop_disc / undo_disc (see game.engines.create_board)
+        self.evaluator = None
     
     def copy(self):
-        """Create a deep copy of the board"""
-        return Board(self.board.copy())
+        """Create a deep copy of the board (the move stack is not copied)"""
+        new_board = Board.__new__(Board)
+        new_board.board = self.board.copy()
+        new_board.human_count = self.human_count
+        new_board.ai_count = self.ai_count
+        new_board.hash = self.hash
+        new_board.mirror_hash = self.mirror_hash
+        new_board.moves = []
+        new_board.evaluator = None
+        if self.evaluator is not None:
+            self.evaluator.copy(new_board)
+        return new_board
     
     def is_valid_column(self, col):
         """Check if a column has space for a disc"""
@@ -41,9 +115,39 @@ class Board:
         for row in range(ROWS - 1, -1, -1):
             if self.board[row][col] == EMPTY:
                 self.board[row][col] = player
+                
+                # Only lines through the new disc can form new connect-4s
+                new_fours = self.count_connect4s_through(row, col, player)
+                if player == HUMAN:
+                    self.human_count += new_fours
+                else:
+                    self.ai_count += new_fours
+                self.hash ^= ZOBRIST_KEYS[player][row * COLS + col]
+                self.mirror_hash ^= ZOBRIST_KEYS[player][row * COLS + COLS - 1 - col]
+                self.moves.append((row, col, player, new_fours))
+                if self.evaluator is not None:
+                    self.evaluator.disc_dropped(row, col, player)
                 return True
         return False
     
+    def undo_disc(self):
+        """Take back the last disc dropped with drop_disc"""
+        row, col, player, new_fours = self.moves.pop()
+        self.board[row][col] = EMPTY
+        if player == HUMAN:
+            self.human_count -= new_fours
+        else:
+            self.ai_count -= new_fours
+        self.hash ^= ZOBRIST_KEYS[player][row * COLS + col]
+        self.mirror_hash ^= ZOBRIST_KEYS[player][row * COLS + COLS - 1 - col]
+        if self.evaluator is not None:
+            self.evaluator.disc_undone(row, col, player)
+        return col
+    
+    def canonical(self):
+        """Canonical key of the position, see canonical_key"""
+        return canonical_key(self.hash, self.mirror_hash)
+    
     def is_full(self):
         """Check if the board is completely full"""
         return not any(self.board[0][col] == EMPTY for col in range(COLS))
@@ -53,14 +157,16 @@ class Board:
         Check for connect-4s and return counts for each player
         Returns: (human_count, ai_count)
         """
+        return self.human_count, self.ai_count
+    
+    def count_connect4s(self):
+        """
+        Count connect-4s by scanning the whole board
+        Returns: (human_count, ai_count)
+        """
         human_count = 0
         ai_count = 0
         
-        # Directions: horizontal, vertical, diagonal-right, diagonal-left
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        
-        checked = set()
-        
         for row in range(ROWS):
             for col in range(COLS):
                 if self.board[row][col] == EMPTY:
@@ -68,7 +174,7 @@ class Board:
                 
                 player = self.board[row][col]
                 
-                for dr, dc in directions:
+                for dr, dc in DIRECTIONS:
                     # Check if we can form a connect-4 in this direction
                     cells = [(row, col)]
                     
@@ -94,6 +200,38 @@ class Board:
         
         return human_count, ai_count
     
+    def count_connect4s_through(self, row, col, player):
+        """
+        Count the connect-4s of a player that contain the given cell
+        """
+        count = 0
+        
+        for dr, dc in DIRECTIONS:
+            before = self._run_length(row, col, -dr, -dc, player)
+            after = self._run_length(row, col, dr, dc, player)
+            
+            # 4-cell windows inside the run that include (row, col)
+            count += max(0, before + after - 2)
+        
+        return count
+    
+    def _run_length(self, row, col, dr, dc, player):
+        """Count (up to 3) consecutive player discs next to a cell"""
+        length = 0
+        for i in range(1, 4):
+            new_row = row + dr * i
+            new_col = col + dc * i
+            
+            if (new_row < 0 or new_row >= ROWS or 
+                new_col < 0 or new_col >= COLS):
+                break
+            
+            if self.board[new_row, new_col] != player:
+                break
+            
+            length += 1
+        return length
+    
     def is_terminal(self):
         """Check if game is over (board full)"""
         return self.is_full()
@@ -0,0 +1,23 @@
+"""
+Board engines selectable by name (the "boardEngine" request field)
+"""
+from game.board import Board
+from game.bitboard import BitBoard
+from game.heuristic import IncrementalEvaluator
+
+BOARD_ENGINES = {
+    'numpy': Board,
+    'bitboard': BitBoard
+}
+
+DEFAULT_ENGINE = 'numpy'
+
+
+def create_board(board_state=None, engine=DEFAULT_ENGINE):
+    """
+    Build a board of the named engine from a state (list of rows), with an
+    IncrementalEvaluator so that evaluate_board is kept up to date by its moves
+    """
+    board = BOARD_ENGINES[engine](board_state)
+    IncrementalEvaluator(board)
+    return board
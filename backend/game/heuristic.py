@@ -1,7 +1,10 @@
 """
 Heuristic evaluation function for Connect 4
 """
+import numpy as np
+
 from game.board import EMPTY, HUMAN, AI, ROWS, COLS
+from game.bitboard import BitBoard, BOARD_MASK, CENTER_MASK, DIRECTIONS
 
 def evaluate_board(board):
     """
@@ -16,6 +19,10 @@ def evaluate_board(board):
     
     Returns: Higher positive values favor AI, negative values favor human
     """
+    if board.evaluator is not None:
+        return board.evaluator.evaluate()
+    if isinstance(board, BitBoard):
+        return evaluate_bitboard(board)
     
     # Terminal state check
     if board.is_terminal():
@@ -29,12 +36,11 @@ def evaluate_board(board):
     score += (ai_connect4 - human_connect4) * 1000
     
     # 2. Evaluate potential threats and opportunities
-    score += evaluate_windows(board.board, AI) * 10
-    score -= evaluate_windows(board.board, HUMAN) * 10
+    #    (same as evaluate_windows(AI) - evaluate_windows(HUMAN), all windows at once)
+    score += evaluate_windows_vectorized(board.board) * 10
     
     # 3. Center column control (important strategic position)
-    center_col = COLS // 2
-    center_count = sum(1 for row in range(ROWS) if board.board[row][center_col] == AI)
+    center_count = int(np.count_nonzero(board.board[:, CENTER_COL] == AI))
     score += center_count * 3
     
     return score
@@ -103,10 +109,225 @@ def score_window(window, player):
     return score
 
 
+def evaluate_bitboard(board):
+    """
+    Same evaluation as evaluate_board, computed on bit masks
+    
+    All windows of one direction are scored at once: a window is open for a
+    player when the opponent has no disc in it, and the number of own discs
+    in it is added up bit-parallel over the four shifted masks.
+    """
+    human_connect4, ai_connect4 = board.check_winner()
+    score = (ai_connect4 - human_connect4) * 1000
+    
+    if board.is_terminal():
+        return score
+    
+    human = board.masks[HUMAN]
+    ai = board.masks[AI]
+    ai_1, ai_2, ai_3 = count_open_windows(ai, BOARD_MASK & ~human)
+    human_1, human_2, human_3 = count_open_windows(human, BOARD_MASK & ~ai)
+    
+    # Same weights as score_window: 50/10/1 for 3/2/1 discs, 40 for a block
+    ai_windows = ai_3 * 50 + ai_2 * 10 + ai_1 + human_3 * 40
+    human_windows = human_3 * 50 + human_2 * 10 + human_1 + ai_3 * 40
+    
+    score += ai_windows * 10
+    score -= human_windows * 10
+    score += (ai & CENTER_MASK).bit_count() * 3
+    
+    return score
+
+
+def count_open_windows(own, free):
+    """
+    Count windows made only of `free` cells that hold 1, 2 and 3 own discs
+    Returns: (one_count, two_count, three_count)
+    """
+    ones = twos = threes = 0
+    
+    for shift in DIRECTIONS:
+        windows = free & (free >> shift) & (free >> 2 * shift) & (free >> 3 * shift)
+        
+        # Two-bit sum of the four cells of every window (4 discs reads as 0,
+        # which is fine because a full window scores nothing)
+        first = own ^ (own >> shift)
+        second = (own >> 2 * shift) ^ (own >> 3 * shift)
+        low = first ^ second
+        high = ((own & (own >> shift)) ^ ((own >> 2 * shift) & (own >> 3 * shift))
+                ^ (first & second))
+        
+        ones += (windows & low & ~high).bit_count()
+        twos += (windows & high & ~low).bit_count()
+        threes += (windows & low & high).bit_count()
+    
+    return ones, twos, threes
+
+
 def evaluate_board_simple(board):
     """
     Simpler evaluation function (alternative)
     Just based on current scores
     """
     human_score, ai_score = board.check_winner()
-    return (ai_score - human_score) * 100
\ No newline at end of file
+    return (ai_score - human_score) * 100
+
+
+# ---------------------------------------------------------------------------
+# Window tables for the vectorized and incremental evaluations
+# ---------------------------------------------------------------------------
+
+CENTER_COL = COLS // 2
+
+
+def _build_windows():
+    """
+    Flat cell indices (row * COLS + col) of every 4-cell window,
+    in the same order as evaluate_windows
+    """
+    windows = []
+    for row in range(ROWS):
+        for col in range(COLS - 3):
+            windows.append([row * COLS + col + i for i in range(4)])
+    for col in range(COLS):
+        for row in range(ROWS - 3):
+            windows.append([(row + i) * COLS + col for i in range(4)])
+    for row in range(ROWS - 3):
+        for col in range(COLS - 3):
+            windows.append([(row + i) * COLS + col + i for i in range(4)])
+    for row in range(ROWS - 3):
+        for col in range(3, COLS):
+            windows.append([(row + i) * COLS + col - i for i in range(4)])
+    return np.array(windows)
+
+
+WINDOWS = _build_windows()
+
+# Windows through each cell (up to 13 for the middle cells)
+CELL_WINDOWS = [[w for w in range(len(WINDOWS)) if cell in WINDOWS[w]]
+                for cell in range(ROWS * COLS)]
+
+# A window is described by one code: human discs + 5 * AI discs
+CELL_CODES = np.array([0, 1, 5])   # indexed by EMPTY, HUMAN, AI
+PLAYER_CODES = CELL_CODES.tolist()
+CODE_COUNT = 25
+
+
+def _build_window_balance():
+    """score_window(AI) - score_window(HUMAN) for every window code"""
+    balance = [0] * CODE_COUNT
+    for ai_count in range(5):
+        for human_count in range(5 - ai_count):
+            window = ([AI] * ai_count + [HUMAN] * human_count +
+                      [EMPTY] * (4 - ai_count - human_count))
+            balance[human_count + 5 * ai_count] = (score_window(window, AI) -
+                                                   score_window(window, HUMAN))
+    return balance
+
+
+WINDOW_BALANCE = _build_window_balance()
+WINDOW_BALANCE_ARRAY = np.array(WINDOW_BALANCE)
+
+# Bounds of evaluate_board, used by the expectiminimax pruning. Every window
+# adds at most 1000 either way (a connect-4; an open window is worth at most
+# max(WINDOW_BALANCE) * 10), and the center term adds up to 3 * ROWS.
+EVAL_MAX = len(WINDOWS) * 1000 + 3 * ROWS
+EVAL_MIN = -len(WINDOWS) * 1000
+
+
+def evaluate_windows_vectorized(board):
+    """
+    evaluate_windows(board, AI) - evaluate_windows(board, HUMAN)
+    for a 6x7 NumPy board, scoring all windows with array operations
+    """
+    codes = CELL_CODES[board.ravel()][WINDOWS].sum(axis=1)
+    return int(WINDOW_BALANCE_ARRAY[codes].sum())
+
+
+def count_window_patterns(board):
+    """
+    Count the windows holding only one player's discs, by disc count
+    (the building blocks of custom evaluations, e.g. weighted heuristics)
+    Returns: ((human_ones, human_twos, human_threes), (ai_ones, ai_twos, ai_threes))
+    """
+    if isinstance(board, BitBoard):
+        human = board.masks[HUMAN]
+        ai = board.masks[AI]
+        return (count_open_windows(human, BOARD_MASK & ~ai),
+                count_open_windows(ai, BOARD_MASK & ~human))
+
+    codes = CELL_CODES[board.board.ravel()][WINDOWS].sum(axis=1)
+    counts = np.bincount(codes, minlength=CODE_COUNT).tolist()
+    # Code = human discs + 5 * AI discs
+    return ((counts[1], counts[2], counts[3]),
+            (counts[5], counts[10], counts[15]))
+
+
+def count_center_discs(board, player=AI):
+    """Number of a player's discs in the center column"""
+    if isinstance(board, BitBoard):
+        return (board.masks[player] & CENTER_MASK).bit_count()
+    return int(np.count_nonzero(board.board[:, CENTER_COL] == player))
+
+
+class IncrementalEvaluator:
+    """
+    Keeps evaluate_board up to date while moves are made and taken back
+    
+    The evaluator attaches itself to a Board or BitBoard, whose drop_disc
+    and undo_disc then report every move, so only the windows through the
+    placed cell (at most 13) are re-scored and a leaf is evaluated in
+    constant time. evaluate_board uses it when the board has one.
+    """
+    
+    def __init__(self, board):
+        self.board = board
+        state = board.get_state()
+        self.codes = [sum(PLAYER_CODES[int(state[cell // COLS][cell % COLS])]
+                          for cell in window)
+                      for window in WINDOWS.tolist()]
+        self.window_total = sum(WINDOW_BALANCE[code] for code in self.codes)
+        self.center_count = sum(1 for row in range(ROWS) if state[row][CENTER_COL] == AI)
+        board.evaluator = self
+    
+    def copy(self, board):
+        """Attach a copy of this evaluator to a copy of its board"""
+        evaluator = IncrementalEvaluator.__new__(IncrementalEvaluator)
+        evaluator.board = board
+        evaluator.codes = self.codes[:]
+        evaluator.window_total = self.window_total
+        evaluator.center_count = self.center_count
+        board.evaluator = evaluator
+        return evaluator
+    
+    def disc_dropped(self, row, col, player):
+        """The board's drop_disc placed a disc at (row, col)"""
+        self._update(row * COLS + col, PLAYER_CODES[player])
+        if player == AI and col == CENTER_COL:
+            self.center_count += 1
+    
+    def disc_undone(self, row, col, player):
+        """The board's undo_disc removed the disc at (row, col)"""
+        self._update(row * COLS + col, -PLAYER_CODES[player])
+        if player == AI and col == CENTER_COL:
+            self.center_count -= 1
+    
+    def _update(self, cell, delta):
+        """Add delta to the code of every window through a cell"""
+        codes = self.codes
+        total = self.window_total
+        for window in CELL_WINDOWS[cell]:
+            code = codes[window]
+            total += WINDOW_BALANCE[code + delta] - WINDOW_BALANCE[code]
+            codes[window] = code + delta
+        self.window_total = total
+    
+    def evaluate(self):
+        """Same value as evaluate_board(self.board) without an evaluator"""
+        human_connect4, ai_connect4 = self.board.check_winner()
+        score = (ai_connect4 - human_connect4) * 1000
+        
+        if self.board.is_terminal():
+            return score
+        
+        return score + self.window_total * 10 + self.center_count * 3
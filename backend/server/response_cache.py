@@ -0,0 +1,125 @@
+"""
+In-process LRU / TTL cache for /api/move results
+
+Entries are keyed by the position's canonical hash (see game.board) plus
+the search parameters and the orientation of the requesting board.
+
+A position and its mirror image do not share results: on equal values
+the searchers pick the leftmost column, which is a different column once
+reflected, so a mirrored result could differ from what a fresh search
+returns. Each orientation gets its own entry, stored as given; symmetric
+positions, which are their own mirror image, have only one.
+
+The cache is bounded by the approximate memory of its entries rather
+than by entry count, because stored trees range from a few bytes to many
+megabytes. Sizes are estimated from node counts like the TreeStore's.
+
+Configuration (environment variables):
+    CONNECT4_CACHE_MAX_BYTES   byte budget, 0 disables the cache (default 64 MiB)
+    CONNECT4_CACHE_TTL         seconds an entry stays valid (default 600)
+    CONNECT4_CACHE_TREES       1 to cache search trees, 0 to keep only the
+                               column, evaluation and stats (default 1)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from server.tree_store import NODE_BYTES, count_nodes
+
+CACHE_MAX_BYTES = int(os.environ.get('CONNECT4_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+CACHE_TTL = float(os.environ.get('CONNECT4_CACHE_TTL', 600))
+CACHE_TREES = os.environ.get('CONNECT4_CACHE_TREES', '1') != '0'
+
+# Approximate memory of a result without its tree: the column and the
+# stats dict (about 900 bytes measured with tracemalloc)
+RESULT_BYTES = 1024
+
+
+class ResponseCache:
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL, store_trees=CACHE_TREES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.store_trees = store_trees
+        # key -> (result, size, expiry time), least recently used first
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key, mirrored=False):
+        """
+        Look up a result
+        Returns: (column, tree, stats) as stored for the board's orientation,
+        or None on a miss
+        """
+        key = (key, mirrored)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            column, tree, stats = entry[0]
+        return column, tree, dict(stats)
+
+    def put(self, key, mirrored, column, tree, stats):
+        """
+        Store a search result for the requesting board's orientation (the
+        tree is not copied, so it must not be modified later)
+        """
+        if not self.store_trees:
+            tree = None
+        result = (column, tree, dict(stats))
+        key = (key, mirrored)
+        size = RESULT_BYTES + (count_nodes(tree) * NODE_BYTES if tree is not None else 0)
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (result, size, time.monotonic() + self.ttl)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+    def clear(self):
+        """Remove all entries (the counters are kept)"""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def get_stats(self):
+        """Counters for the stats endpoint"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'maxBytes': self.max_bytes,
+                'ttlSeconds': self.ttl,
+                'storeTrees': self.store_trees
+            }
@@ -0,0 +1,265 @@
+"""
+Asynchronous search jobs: submit, poll for progress, cancel
+
+A job runs one search on a bounded thread pool, so a long search no longer
+holds the request that started it. Clients poll the job for its progress
+(iteration depth, nodes so far, best move of the deepest finished
+iteration) and its result, and can cancel it: the job's Deadline is
+checked cooperatively by the searchers, which stop at their next check.
+
+Clients can also subscribe to a job's progress events (server-sent events
+in app.py). While a job has subscribers, its Deadline's sampler publishes
+a progress event every PROGRESS_INTERVAL seconds from inside the search
+loop, and one after every finished iteration; without subscribers the
+sampler is unset and the search runs as before.
+
+At most CONNECT4_JOB_WORKERS jobs run at a time and at most
+CONNECT4_JOB_QUEUE more wait for a worker; submit raises JobQueueFull
+beyond that. Finished jobs are kept for CONNECT4_JOB_TTL seconds.
+
+Configuration (environment variables):
+    CONNECT4_JOB_WORKERS   jobs running at the same time (default 2)
+    CONNECT4_JOB_QUEUE     jobs waiting for a worker (default 16)
+    CONNECT4_JOB_TTL       seconds a finished job can still be polled (default 600)
+    CONNECT4_PROGRESS_INTERVAL  seconds between progress events (default 0.25)
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from Algorithms.search_control import Deadline, SearchCancelled
+
+JOB_WORKERS = int(os.environ.get('CONNECT4_JOB_WORKERS', 2))
+JOB_QUEUE = int(os.environ.get('CONNECT4_JOB_QUEUE', 16))
+JOB_TTL = float(os.environ.get('CONNECT4_JOB_TTL', 600))
+PROGRESS_INTERVAL = float(os.environ.get('CONNECT4_PROGRESS_INTERVAL', 0.25))
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+
+FINISHED = (DONE, CANCELLED, FAILED)
+
+
+class JobQueueFull(Exception):
+    """Raised by submit when every worker is busy and the queue is full"""
+
+
+class SearchJob:
+    def __init__(self, algorithm, depth, time_limit_ms=None):
+        self.id = uuid.uuid4().hex
+        self.algorithm = algorithm
+        self.depth = depth
+        self.status = QUEUED
+        # Checked by the searchers; cancel() stops the search. The clock
+        # starts when a worker picks the job up, not while it is queued
+        self.deadline = Deadline(time_limit_ms, start=False)
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        # Searcher of the running job, for its live node count
+        self.searcher = None
+        # Progress of the finished iterations (see record_iteration)
+        self.depth_completed = 0
+        self.completed_nodes = 0
+        self.best_column = None
+        self.evaluation = None
+        self.principal_variation = []
+        self.result = None
+        self.error = None
+        # Event queues of the progress subscribers (replaced, never mutated,
+        # so the search thread can publish without a lock)
+        self.subscribers = ()
+        self.subscribers_lock = threading.Lock()
+        self.last_sample = 0.0
+
+    def record_iteration(self, depth, best_column, stats):
+        """iterative_deepening callback: an iteration has finished"""
+        self.depth_completed = depth
+        self.completed_nodes += stats['nodesExpanded']
+        self.best_column = best_column
+        self.evaluation = stats['evaluation']
+        # Searchers without a principal variation still have its first move
+        self.principal_variation = stats.get('principalVariation', [best_column])
+        if self.subscribers:
+            self.publish('progress')
+
+    def cancel(self):
+        self.deadline.cancel()
+
+    def subscribe(self):
+        """
+        Start receiving the job's events
+        Returns: a queue of (event, data) pairs; a finished job sends
+        ('done', job dict) last
+        """
+        events = queue.SimpleQueue()
+        with self.subscribers_lock:
+            self.subscribers = self.subscribers + (events,)
+            self.deadline.sampler = self.sample
+        return events
+
+    def unsubscribe(self, events):
+        with self.subscribers_lock:
+            self.subscribers = tuple(q for q in self.subscribers if q is not events)
+            if not self.subscribers:
+                self.deadline.sampler = None
+
+    def sample(self):
+        """Deadline sampler: publish progress at most every PROGRESS_INTERVAL"""
+        now = time.perf_counter()
+        if now - self.last_sample >= PROGRESS_INTERVAL:
+            self.last_sample = now
+            self.publish('progress')
+
+    def publish(self, event):
+        """Send an event to every subscriber"""
+        data = self.to_dict() if event == 'done' else self.progress()
+        for events in self.subscribers:
+            events.put((event, data))
+
+    def progress(self):
+        """Progress fields of the job, readable while it runs"""
+        nodes = self.completed_nodes
+        depth = self.depth_completed
+        searcher = self.searcher
+        if self.status == RUNNING and searcher is not None:
+            # Nodes of the iteration in progress
+            nodes += searcher.nodes_expanded
+            depth = searcher.depth_limit
+        elapsed = 0.0
+        if self.started is not None:
+            elapsed = (self.finished or time.time()) - self.started
+        return {
+            'status': self.status,
+            'depth': depth,
+            'depthCompleted': self.depth_completed,
+            'nodesExpanded': nodes,
+            'nodesPerSecond': nodes / elapsed if elapsed > 0 else 0.0,
+            'bestColumn': self.best_column,
+            'evaluation': self.evaluation,
+            'principalVariation': self.principal_variation,
+            'elapsed': elapsed
+        }
+
+    def to_dict(self):
+        d = {
+            'jobId': self.id,
+            'status': self.status,
+            'algorithm': self.algorithm,
+            'depth': self.depth,
+            'progress': self.progress(),
+            'result': self.result
+        }
+        if self.error is not None:
+            d['error'] = self.error
+        return d
+
+
+class JobManager:
+    def __init__(self, workers=JOB_WORKERS, max_queue=JOB_QUEUE, ttl=JOB_TTL):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='search-job')
+        # jobId -> SearchJob, oldest first
+        self.jobs = OrderedDict()
+        self.active = 0
+        self.lock = threading.Lock()
+        self.rejected = 0
+
+    def submit(self, job, run):
+        """
+        Run run(job) on the pool; its return value becomes job.result
+        Raises: JobQueueFull when workers + max_queue jobs are already active
+        """
+        with self.lock:
+            self._prune()
+            if self.active >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise JobQueueFull()
+            self.active += 1
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job, run)
+        return job
+
+    def finish(self, job, result):
+        """Add a job that is already answered (no search needed)"""
+        job.status = DONE
+        job.result = result
+        job.started = job.finished = time.time()
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+        return job
+
+    def _run(self, job, run):
+        try:
+            if job.deadline.cancelled:
+                job.status = CANCELLED
+                return
+            job.status = RUNNING
+            job.started = time.time()
+            job.deadline.start()
+            try:
+                job.result = run(job)
+                job.status = DONE
+            except SearchCancelled:
+                # Keep the nodes of the iteration that was cut off
+                if job.searcher is not None:
+                    job.completed_nodes += job.searcher.nodes_expanded
+                job.status = CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+        finally:
+            job.searcher = None
+            job.finished = time.time()
+            with self.lock:
+                self.active -= 1
+            job.publish('done')
+
+    def get(self, job_id):
+        """The job with this id, or None (unknown or expired)"""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job (a finished job is left as it is)
+        Returns: the job, or None when unknown
+        """
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED:
+            job.cancel()
+        return job
+
+    def _prune(self):
+        """Forget jobs that finished more than ttl seconds ago (lock held)"""
+        cutoff = time.time() - self.ttl
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished is not None and job.finished < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def get_stats(self):
+        """Counters for the stats endpoint"""
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                'active': self.active,
+                'workers': self.workers,
+                'maxQueue': self.max_queue,
+                'rejected': self.rejected,
+                'jobs': counts
+            }
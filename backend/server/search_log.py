@@ -0,0 +1,160 @@
+"""
+Structured, non-blocking logging for the API, plus on-demand tree dumps
+
+Log records go through a queue and are written by a background listener
+thread, so a request never waits on stdout. Search trees are never
+printed on the request path: when a client asks for a dump, the tree is
+handed to a background writer that renders it to a file.
+
+Configuration (environment variables):
+    CONNECT4_LOG_LEVEL       DEBUG / INFO / WARNING ... (default INFO)
+    CONNECT4_TREE_DUMP_DIR   directory for tree dumps (default tree_dumps)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+LOGGER_NAME = 'connect4'
+
+LOG_LEVEL = os.environ.get('CONNECT4_LOG_LEVEL', 'INFO').upper()
+TREE_DUMP_DIR = os.environ.get('CONNECT4_TREE_DUMP_DIR', 'tree_dumps')
+
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as '<time> <level> <logger> <message> key=value ...'"""
+
+    def format(self, record):
+        line = (f"{self.formatTime(record)} {record.levelname} "
+                f"{record.name} {record.getMessage()}")
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={json.dumps(value, default=str)}'
+                                   for key, value in fields.items())
+        return line
+
+
+def configure_logging(level=LOG_LEVEL):
+    """
+    Route the 'connect4' loggers through a queue to a background thread
+    (safe to call more than once)
+    """
+    global _listener
+    root = logging.getLogger(LOGGER_NAME)
+    root.setLevel(level)
+    if _listener is not None:
+        return root
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(StructuredFormatter())
+
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return root
+
+
+def get_logger(name):
+    """Logger below the 'connect4' root, e.g. get_logger('api')"""
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
+
+
+def write_tree(node, stream, indent=0):
+    """
+    Write a search tree (nested dicts) in readable form
+    """
+    if not node:
+        return
+    
+    prefix = "  " * indent
+    node_type = node.get('type', 'unknown')
+    value = node.get('value', 'N/A')
+    column = node.get('column', '')
+    
+    # Node info
+    if column != '':
+        line = f"{prefix}[{node_type.upper()}] Col:{column} Value:{value}"
+    else:
+        line = f"{prefix}[{node_type.upper()}] Value:{value}"
+    
+    # Alpha-beta values if present
+    if 'alpha' in node and 'beta' in node:
+        line += f" α:{node['alpha']} β:{node['beta']}"
+    
+    # Probability if present (expectiminimax)
+    if 'probability' in node:
+        line += f" P:{node['probability']:.2f}"
+    
+    # Pruned marker
+    if node.get('pruned'):
+        line += " [PRUNED]"
+    
+    stream.write(line + "\n")
+    
+    for child in node.get('children', []):
+        write_tree(child, stream, indent + 1)
+
+
+class TreeDumpWriter:
+    """
+    Writes search trees to files from a background thread
+
+    submit() never blocks: when max_pending dumps are already waiting,
+    the new one is dropped and a warning is logged.
+    """
+
+    def __init__(self, directory=TREE_DUMP_DIR, max_pending=8):
+        self.directory = directory
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.logger = get_logger('tree_dump')
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, tree, label):
+        """
+        Queue a tree for writing
+        Returns: the file path it will be written to, or None if dropped
+        """
+        if tree is None:
+            return None
+        
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}"
+                                            f"-{time.time_ns() % 10**9:09d}-{label}.txt")
+        try:
+            self.queue.put_nowait((path, tree))
+        except queue.Full:
+            self.logger.warning('tree dump dropped', extra={'fields': {'label': label}})
+            return None
+        
+        self._ensure_thread()
+        return path
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='tree-dump-writer',
+                                                daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            path, tree = self.queue.get()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    write_tree(tree, f)
+                self.logger.debug('tree dump written', extra={'fields': {'path': path}})
+            except OSError:
+                self.logger.exception('tree dump failed', extra={'fields': {'path': path}})
+            finally:
+                self.queue.task_done()
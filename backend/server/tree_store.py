@@ -0,0 +1,136 @@
+"""
+Server-side store of recent search trees, for on-demand subtree fetches
+
+/api/move keeps the full tree of a search here under a searchId and only
+returns the top levels; the TreeViewer then fetches a node's children by
+path (child indices from the root) as the user expands it.
+
+The store holds the last CONNECT4_TREE_STORE_SIZE trees and evicts the
+least recently used ones beyond a memory budget. Tree sizes are
+estimated from their node counts, which is far cheaper than serializing
+them.
+
+Configuration (environment variables):
+    CONNECT4_TREE_STORE_SIZE       trees kept, 0 disables the store (default 32)
+    CONNECT4_TREE_STORE_MAX_BYTES  memory budget (default 128 MiB)
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+TREE_STORE_SIZE = int(os.environ.get('CONNECT4_TREE_STORE_SIZE', 32))
+TREE_STORE_MAX_BYTES = int(os.environ.get('CONNECT4_TREE_STORE_MAX_BYTES', 128 * 1024 * 1024))
+
+# Approximate memory of one tree node dict with its values and children
+# list (250-350 bytes measured with tracemalloc on the searchers' trees)
+NODE_BYTES = 350
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def count_nodes(tree):
+    """Number of nodes in a tree of node dicts"""
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.get('children', ()))
+    return count
+
+
+def truncate_tree(node, levels):
+    """
+    Copy of the top `levels` levels of a tree below node. Every copied node
+    gets a childCount; nodes at the cut have an empty children list.
+    """
+    children = node.get('children', [])
+    truncated = dict(node)
+    truncated['childCount'] = len(children)
+    if levels > 0:
+        truncated['children'] = [truncate_tree(child, levels - 1) for child in children]
+    else:
+        truncated['children'] = []
+    return truncated
+
+
+class TreeStore:
+    def __init__(self, size=TREE_STORE_SIZE, max_bytes=TREE_STORE_MAX_BYTES):
+        self.size = size
+        self.max_bytes = max_bytes
+        # searchId -> (tree, estimated bytes), least recently used first
+        self.trees = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.size > 0 and self.max_bytes > 0
+
+    def put(self, tree):
+        """
+        Keep a tree (node dicts; not copied, so it must not be modified later)
+        Returns: its searchId, or None when it does not fit the budget
+        """
+        size = count_nodes(tree) * NODE_BYTES
+        if size > self.max_bytes:
+            return None
+
+        search_id = uuid.uuid4().hex
+        with self.lock:
+            self.trees[search_id] = (tree, size)
+            self.bytes += size
+            while len(self.trees) > self.size or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.trees.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return search_id
+
+    def get(self, search_id):
+        """The tree stored under search_id, or None (unknown or evicted)"""
+        with self.lock:
+            entry = self.trees.get(search_id)
+            if entry is None:
+                return None
+            self.trees.move_to_end(search_id)
+            return entry[0]
+
+    def get_children(self, search_id, path, levels=1, offset=0, limit=DEFAULT_PAGE_SIZE):
+        """
+        A page of the children of the node at path, each truncated to
+        `levels` levels (1: the children themselves, with their childCount)
+        Returns: page dict, or None when the tree is not stored
+        Raises: IndexError for a path that does not exist in the tree
+        """
+        node = self.get(search_id)
+        if node is None:
+            return None
+        for index in path:
+            children = node.get('children', [])
+            if not 0 <= index < len(children):
+                raise IndexError(f'No child {index} on path {path}')
+            node = children[index]
+
+        children = node.get('children', [])
+        page = children[offset:offset + limit]
+        return {
+            'searchId': search_id,
+            'path': list(path),
+            'offset': offset,
+            'total': len(children),
+            'children': [truncate_tree(child, levels - 1) for child in page]
+        }
+
+    def get_stats(self):
+        """Counters for the stats endpoint"""
+        with self.lock:
+            return {
+                'trees': len(self.trees),
+                'bytes': self.bytes,
+                'maxTrees': self.size,
+                'maxBytes': self.max_bytes,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,8 @@
+"""
+pytest setup: the backend modules import each other from the backend
+directory (game.board, Algorithms...), so it goes on sys.path
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
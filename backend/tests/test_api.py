@@ -0,0 +1,147 @@
+"""
+/api/move: strict JSON responses (the frontend's JSON.parse rejects the
+Infinity / NaN constants Python's json module writes by default) and
+response cache hits and opening book answers that match the request, and
+search jobs that share the response cache
+"""
+import json
+import time
+
+import pytest
+
+import app as api
+from app import app, response_cache
+from book.build_book import build_book, collect_positions
+from book.opening_book import OpeningBook, write_book
+
+ALGORITHMS = ('minimax', 'minimax_alpha_beta', 'expectiminimax', 'expectiminimax_star',
+              'weighted_alpha_beta', 'pvs', 'mtdf')
+
+
+def strict_loads(data):
+    """json.loads that fails on non-standard constants"""
+    def reject(constant):
+        raise ValueError(f'Not valid JSON: {constant}')
+    return json.loads(data, parse_constant=reject)
+
+
+def empty_board():
+    board = [[0] * 7 for _ in range(6)]
+    board[5][3] = 1
+    return board
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_move_response_is_strict_json(algorithm):
+    client = app.test_client()
+    body = {'board': empty_board(), 'algorithm': algorithm, 'depth': 3, 'player': 2,
+            'useBook': False, 'tree': 'full'}
+    # The second request is answered from the response cache
+    for _ in range(2):
+        response = client.post('/api/move', json=body)
+        assert response.status_code == 200
+        result = strict_loads(response.get_data(as_text=True))
+        assert result['tree']['children']
+
+
+def test_mirrored_position_answers_like_a_fresh_search():
+    # Columns 1 and 4 tie at depth 2 here, 2 and 5 on the mirror image
+    board = [[0] * 7 for _ in range(6)]
+    board[5][0] = board[5][1] = 1
+    board[5][3] = 2
+    mirror = [row[::-1] for row in board]
+    client = app.test_client()
+    body = {'board': board, 'algorithm': 'minimax_alpha_beta', 'depth': 2, 'player': 2,
+            'useBook': False, 'tree': 'none'}
+
+    response_cache.clear()
+    fresh = client.post('/api/move', json=dict(body, board=mirror, useCache=False)).get_json()
+    client.post('/api/move', json=body)
+    answer = client.post('/api/move', json=dict(body, board=mirror)).get_json()
+
+    assert answer['column'] == fresh['column']
+    assert answer['stats']['principalVariation'] == fresh['stats']['principalVariation']
+
+
+@pytest.fixture
+def small_book(tmp_path, monkeypatch):
+    """An opening book of depth 2 in place of the app's"""
+    path = str(tmp_path / 'book.bin')
+    write_book(path, build_book(plies=2, depth=2), plies=2, depth=2)
+    book = OpeningBook(path)
+    monkeypatch.setattr(api, 'opening_book', book)
+    yield book
+    book.close()
+
+
+@pytest.mark.parametrize('depth, source', [(2, 'book'), (1, 'search'), (4, 'search')])
+def test_book_answers_only_its_own_depth(small_book, depth, source):
+    board = [[0] * 7 for _ in range(6)]
+    board[5][3] = 1
+    body = {'board': board, 'algorithm': 'minimax_alpha_beta', 'depth': depth, 'player': 2,
+            'useCache': False, 'tree': 'none'}
+    result = app.test_client().post('/api/move', json=body).get_json()
+    assert result['source'] == source
+    assert result['stats']['depthReached'] == depth
+
+
+def test_book_matches_fresh_search_in_both_orientations(tmp_path, monkeypatch):
+    # Deep enough for ties between a column and its mirror image
+    path = str(tmp_path / 'book.bin')
+    write_book(path, build_book(plies=3, depth=3), plies=3, depth=3)
+    book = OpeningBook(path)
+    monkeypatch.setattr(api, 'opening_book', book)
+    client = app.test_client()
+    try:
+        states = [board.get_state() for board in collect_positions(3).values()]
+        for state in states + [[row[::-1] for row in state] for state in states]:
+            body = {'board': state, 'algorithm': 'minimax_alpha_beta', 'depth': 3,
+                    'player': 2, 'useCache': False, 'tree': 'none'}
+            answer = client.post('/api/move', json=body).get_json()
+            fresh = client.post('/api/move', json=dict(body, useBook=False)).get_json()
+            assert answer['source'] == 'book'
+            assert answer['column'] == fresh['column']
+    finally:
+        book.close()
+
+
+def finished_job(client, body):
+    job = client.post('/api/jobs', json=body).get_json()
+    for _ in range(500):
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.01)
+        job = client.get(f"/api/jobs/{job['jobId']}").get_json()
+    raise AssertionError('job did not finish')
+
+
+def test_untimed_job_result_is_cached():
+    client = app.test_client()
+    body = {'board': empty_board(), 'algorithm': 'pvs', 'depth': 3, 'player': 2,
+            'useBook': False, 'tree': 'none'}
+
+    response_cache.clear()
+    job = finished_job(client, body)
+    answer = client.post('/api/move', json=body).get_json()
+    assert job['result']['source'] == 'search'
+    assert answer['source'] == 'cache'
+    assert answer['column'] == job['result']['column']
+
+    timed = finished_job(client, dict(body, timeLimitMs=5000))
+    assert timed['result']['source'] == 'search'
+
+
+@pytest.mark.parametrize('option', [{'depth': '3'}, {'depth': True}, {'treeLevels': '2'},
+                                    {'treeInlineLevels': '1'}, {'ttSize': 1.5},
+                                    {'timeLimitMs': '100'}, {'aspirationWindow': None},
+                                    {'boardEngine': ['numpy']}])
+def test_option_of_the_wrong_type_is_rejected(option):
+    client = app.test_client()
+    body = dict({'board': empty_board(), 'algorithm': 'minimax_alpha_beta', 'depth': 2,
+                 'player': 2, 'useBook': False, 'useCache': False}, **option)
+
+    assert client.post('/api/move', json=body).status_code == 400
+    assert client.post('/api/jobs', json=body).status_code == 400
+    if 'treeInlineLevels' not in option:
+        response = client.post('/api/move/batch', json={'jobs': [body]})
+        assert 'error' in strict_loads(response.get_data(as_text=True))
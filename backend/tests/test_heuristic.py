@@ -0,0 +1,35 @@
+"""
+IncrementalEvaluator: boards from create_board evaluate like a full
+evaluate_board after every move and undo
+"""
+import random
+
+import pytest
+
+from game.board import AI, HUMAN
+from game.engines import BOARD_ENGINES, create_board
+from game.heuristic import evaluate_board
+
+
+def full_evaluation(board):
+    """evaluate_board of the same position without an evaluator"""
+    return evaluate_board(type(board)(board.get_state()))
+
+
+@pytest.mark.parametrize('engine', sorted(BOARD_ENGINES))
+def test_incremental_matches_full_evaluation(engine):
+    rng = random.Random(7)
+    for _ in range(20):
+        board = create_board(None, engine)
+        assert board.evaluator is not None
+        player = HUMAN
+        while not board.is_terminal() and rng.random() > 0.02:
+            board.drop_disc(rng.choice(board.get_valid_columns()), player)
+            player = AI if player == HUMAN else HUMAN
+            assert evaluate_board(board) == full_evaluation(board)
+            if rng.random() < 0.3:
+                board.undo_disc()
+                player = AI if player == HUMAN else HUMAN
+                assert evaluate_board(board) == full_evaluation(board)
+        copy = board.copy()
+        assert evaluate_board(copy) == full_evaluation(board)
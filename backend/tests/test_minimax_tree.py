@@ -0,0 +1,26 @@
+"""
+TreeNode: children is always a list, built with add_child or appended to
+"""
+from Trees.minimax_tree import TreeNode, play_move
+
+
+def empty_board():
+    return [[0] * 7 for _ in range(6)]
+
+
+def test_leaf_children_is_a_list():
+    node = TreeNode(empty_board())
+    assert node.children == []
+    assert isinstance(node.children, list)
+
+
+def test_append_and_add_child_give_the_same_boards():
+    root = TreeNode(empty_board(), depth=2)
+    appended_board = empty_board()
+    play_move(appended_board, 3, 2)
+    root.children.append(TreeNode(appended_board, move=3, player=2, depth=1))
+    root.add_child(TreeNode(depth=1), 4, 2)
+
+    first, second = root.to_dict()['children']
+    assert first['board'][5][3] == 2
+    assert second['board'][5][4] == 2
@@ -0,0 +1,55 @@
+"""
+Worker side of the process pool, run in this process
+"""
+import queue
+from concurrent.futures import Future
+
+import pytest
+
+import Algorithms.parallel as parallel
+from Algorithms.search_control import SearchCancelled
+from Algorithms.transposition import REPLACE_ALWAYS, REPLACE_DEPTH
+from game.engines import DEFAULT_ENGINE
+
+
+def test_worker_keeps_one_table():
+    first = parallel._build_algorithm('minimax_alpha_beta', {'depth': 2, 'tt_size': 1024})
+    other = parallel._build_algorithm('pvs', {'depth': 2, 'tt_size': 1024})
+    assert other.transposition_table is not first.transposition_table
+
+    again = parallel._build_algorithm('pvs', {'depth': 3, 'tt_size': 1024,
+                                              'tt_replacement': REPLACE_ALWAYS})
+    assert again.transposition_table is other.transposition_table
+    assert again.transposition_table.replacement == REPLACE_ALWAYS
+
+    larger = parallel._build_algorithm('pvs', {'depth': 3, 'tt_size': 4096,
+                                               'tt_replacement': REPLACE_DEPTH})
+    assert larger.transposition_table.size == 4096
+    assert parallel._worker_table == ('pvs', larger.transposition_table)
+
+
+def test_cancel_flag_stops_worker_search(monkeypatch):
+    monkeypatch.setattr(parallel, '_worker_alpha', [parallel.NO_ALPHA])
+    monkeypatch.setattr(parallel, '_worker_cancel', [1])
+    board_state = [[0] * 7 for _ in range(6)]
+    with pytest.raises(SearchCancelled):
+        parallel._search_position('minimax_alpha_beta', {'depth': 4}, board_state,
+                                  DEFAULT_ENGINE, None, slot=0)
+    with pytest.raises(SearchCancelled):
+        parallel._search_column('pvs', {'depth': 4}, board_state, DEFAULT_ENGINE, 3, 0, 1000)
+
+    parallel._worker_cancel[0] = 0
+    best_col, _, _ = parallel._search_position('minimax_alpha_beta', {'depth': 2},
+                                               board_state, DEFAULT_ENGINE, None, slot=0)
+    assert best_col == 3
+
+
+def test_slot_is_freed_after_its_tasks(monkeypatch):
+    free_slots = queue.Queue()
+    monkeypatch.setattr(parallel, '_free_slots', free_slots)
+    running = [Future(), Future()]
+    parallel.release_slot(5, running)
+    running[0].set_result(None)
+    assert free_slots.empty()
+    running[1].set_result(None)
+    assert free_slots.get_nowait() == 5
@@ -0,0 +1,29 @@
+"""
+ResponseCache: one entry per orientation of the requesting board
+"""
+from server.response_cache import RESULT_BYTES, ResponseCache
+from server.tree_store import NODE_BYTES
+
+TREE = {'column': 1, 'value': 5, 'type': 'root',
+        'children': [{'column': 1, 'value': 5, 'type': 'max', 'children': []}]}
+STATS = {'evaluation': 5, 'principalVariation': [1, 2, 6]}
+
+
+def test_round_trip_in_each_orientation():
+    for mirrored in (False, True):
+        cache = ResponseCache()
+        cache.put('key', mirrored, 1, TREE, STATS)
+        assert cache.get('key', mirrored) == (1, TREE, STATS)
+
+
+def test_size_from_node_count():
+    cache = ResponseCache()
+    cache.put('key', True, 1, TREE, STATS)
+    cache.put('other', False, 1, None, STATS)
+    assert cache.size == 2 * RESULT_BYTES + 2 * NODE_BYTES
+
+
+def test_mirror_image_is_a_miss():
+    cache = ResponseCache()
+    cache.put('key', False, 1, TREE, STATS)
+    assert cache.get('key', True) is None
@@ -0,0 +1,45 @@
+"""
+Search jobs: the time limit counts from when a worker starts the job
+"""
+import threading
+import time
+
+from server.search_jobs import JobManager, SearchJob, CANCELLED, DONE
+
+
+def wait_finished(job, timeout=5.0):
+    end = time.time() + timeout
+    while job.finished is None and time.time() < end:
+        time.sleep(0.01)
+    assert job.finished is not None
+
+
+def test_time_limit_starts_when_the_job_runs():
+    manager = JobManager(workers=1, max_queue=2)
+    release = threading.Event()
+    blocker = manager.submit(SearchJob('minimax', 1), lambda job: release.wait(5))
+
+    queued = manager.submit(SearchJob('minimax', 1, time_limit_ms=100),
+                            lambda job: job.deadline.expired())
+    # Longer than the queued job's time limit
+    time.sleep(0.3)
+    release.set()
+
+    wait_finished(queued)
+    assert blocker.status == DONE
+    assert queued.status == DONE
+    assert queued.result is False
+
+
+def test_cancel_while_queued():
+    manager = JobManager(workers=1, max_queue=2)
+    release = threading.Event()
+    manager.submit(SearchJob('minimax', 1), lambda job: release.wait(5))
+    queued = manager.submit(SearchJob('minimax', 1), lambda job: 'ran')
+
+    manager.cancel(queued.id)
+    release.set()
+
+    wait_finished(queued)
+    assert queued.status == CANCELLED
+    assert queued.result is None
@@ -0,0 +1,12 @@
+"""
+Default transposition table sizes: small for shallow searches, capped at
+DEFAULT_SIZE
+"""
+from Algorithms.transposition import size_for_depth, DEFAULT_SIZE, MIN_SIZE
+
+
+def test_size_for_depth_bounds():
+    sizes = [size_for_depth(depth) for depth in range(1, 11)]
+    assert sizes[0] == MIN_SIZE
+    assert sizes[-1] == DEFAULT_SIZE
+    assert sizes == sorted(sizes)
@@ -11,7 +11,7 @@ import TreeViewer from './components/TreeViewer/TreeViewer';
 import { useGameState } from './hooks/useGameState';
 
 // Services
-import { getAIMove, getScore } from './services/api/gameApi';
+import { getAIMoveWithProgress, getScore } from './services/api/gameApi';
 
 // Constants
 import { HUMAN, AI, GAME_STATUS, ALGORITHM_NAMES } from './utils/constants';
@@ -33,11 +33,14 @@ function App() {
     winner,
     isProcessing,
     treeData,
+    treeSearchId,
     moveStats,
+    searchProgress,
     startGame,
     resetGame,
     makeMove,
     setAIMoveData,
+    setSearchProgress,
     setProcessing,
     setCurrentPlayer,
     setScores
@@ -83,10 +86,12 @@ function App() {
     setProcessing(true);
 
     try {
-      const moveData = await getAIMove(
+      // Progress of the search is shown while it runs
+      const moveData = await getAIMoveWithProgress(
         board,
         settings.algorithm,
-        settings.depth
+        settings.depth,
+        setSearchProgress
       );
       console.log("aaaaa", moveData)
 
@@ -113,9 +118,10 @@ function App() {
       console.error('Error making AI move:', error);
       alert(`Error: ${error.message}\n\nMake sure your backend server is running on http://localhost:5000`);
       setProcessing(false);
+      setSearchProgress(null);
       setCurrentPlayer(HUMAN); // Give turn back to human
     }
-  }, [board, settings, setProcessing, setAIMoveData, makeMove, setCurrentPlayer]);
+  }, [board, settings, setProcessing, setAIMoveData, setSearchProgress, makeMove, setCurrentPlayer]);
 
   /**
    * Auto-trigger AI move when it's AI's turn
@@ -199,13 +205,14 @@ function App() {
               gameStatus={gameStatus}
               winner={winner}
               moveStats={moveStats}
+              searchProgress={searchProgress}
             />
           </div>
         </div>
 
         {/* Tree Viewer - Full Width */}
         <div className="mt-6">
-          <TreeViewer treeData={treeData} />
+          <TreeViewer treeData={treeData} searchId={treeSearchId} />
         </div>
       </div>
     </div>
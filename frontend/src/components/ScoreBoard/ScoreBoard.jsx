@@ -11,7 +11,8 @@ const ScoreBoard = ({
     isProcessing,
     gameStatus,
     winner,
-    moveStats
+    moveStats,
+    searchProgress
 }) => {
     const getCurrentTurnText = () => {
         if (gameStatus === GAME_STATUS.FINISHED) {
@@ -74,6 +75,46 @@ const ScoreBoard = ({
                 </div>
             </div>
 
+            {/* Search Progress (while the AI is thinking) */}
+            {isProcessing && searchProgress && (
+                <div className="bg-indigo-50 rounded-xl p-4 border-2 border-indigo-200">
+                    <h3 className="text-sm font-semibold text-gray-700 mb-3 flex items-center">
+                        <Activity className="w-4 h-4 mr-2" />
+                        Search Progress
+                    </h3>
+                    <div className="space-y-2 text-sm">
+                        <div className="flex justify-between">
+                            <span className="text-gray-600">Depth:</span>
+                            <span className="font-semibold text-gray-800">{searchProgress.depth}</span>
+                        </div>
+                        <div className="flex justify-between">
+                            <span className="text-gray-600">Nodes Expanded:</span>
+                            <span className="font-semibold text-gray-800">{searchProgress.nodesExpanded.toLocaleString()}</span>
+                        </div>
+                        <div className="flex justify-between">
+                            <span className="text-gray-600">Nodes / Second:</span>
+                            <span className="font-semibold text-gray-800">{Math.round(searchProgress.nodesPerSecond).toLocaleString()}</span>
+                        </div>
+                        {searchProgress.bestColumn !== null && (
+                            <div className="flex justify-between">
+                                <span className="text-gray-600">Best Col So Far:</span>
+                                <span className="font-semibold text-gray-800">
+                                    {searchProgress.bestColumn} (depth {searchProgress.depthCompleted})
+                                </span>
+                            </div>
+                        )}
+                        {searchProgress.principalVariation.length > 1 && (
+                            <div className="flex justify-between">
+                                <span className="text-gray-600">Principal Variation:</span>
+                                <span className="font-semibold text-gray-800">
+                                    {searchProgress.principalVariation.join(' ')}
+                                </span>
+                            </div>
+                        )}
+                    </div>
+                </div>
+            )}
+
             {/* Winner Display */}
             {gameStatus === GAME_STATUS.FINISHED && (
                 <div className="bg-gradient-to-r from-purple-100 to-indigo-100 rounded-xl p-6 border-2 border-purple-300 text-center">
@@ -30,6 +30,14 @@ const GameSettings = ({ onStartGame }) => {
                 return 'Minimax with Alpha-Beta Pruning - more efficient, prunes unnecessary branches';
             case ALGORITHMS.EXPECTIMINIMAX:
                 return 'Expected Minimax - handles probability (60% chosen column, 40% adjacent)';
+            case ALGORITHMS.EXPECTIMINIMAX_STAR:
+                return 'Expected Minimax with pruning - same moves, bounds chance nodes to skip branches';
+            case ALGORITHMS.WEIGHTED_ALPHA_BETA:
+                return 'Alpha-Beta with a tunable heuristic - weights for fours, threes, twos and the center';
+            case ALGORITHMS.PVS:
+                return 'Principal Variation Search - same moves as Alpha-Beta, scouts later moves with null windows';
+            case ALGORITHMS.MTDF:
+                return 'MTD(f) - same moves as Alpha-Beta, closes in on the value with zero-window searches';
             default:
                 return '';
         }
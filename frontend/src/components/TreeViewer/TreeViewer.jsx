@@ -1,5 +1,9 @@
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import { ChevronDown, ChevronRight, Eye, EyeOff, Download, Minimize2, Maximize2 } from 'lucide-react';
+import { getTreeChildren, getFullTree } from '../../services/api/gameApi';
+
+// Children fetched per request when expanding a node of a paged tree
+const CHILDREN_PAGE_SIZE = 50;
 
 /**
  * TreeNode component - renders a single node in the tree with visual tree structure
@@ -159,15 +163,33 @@ const TreeNode = ({ node, depth = 0, index = 0, isLast = false, parentLines = []
 
 /**
  * TreeViewer component - displays the minimax tree from AI moves
+ *
+ * With a searchId, treeData only holds the first levels of the tree and the
+ * children of other nodes are fetched from the backend when they are expanded.
  */
-const TreeViewer = ({ treeData }) => {
+const TreeViewer = ({ treeData, searchId }) => {
     const [showTree, setShowTree] = useState(true);
     const [expandAll, setExpandAll] = useState(false);
 
-    const downloadTree = () => {
+    // Children fetched so far, by node path ("0.3"), kept across re-renders
+    const loadedChildren = useRef({ searchId: null, byPath: {} });
+    if (loadedChildren.current.searchId !== searchId) {
+        loadedChildren.current = { searchId, byPath: {} };
+    }
+
+    const downloadTree = async () => {
         if (!treeData) return;
 
-        const dataStr = JSON.stringify(treeData, null, 2);
+        let fullTree = treeData;
+        if (searchId) {
+            try {
+                fullTree = await getFullTree(searchId);
+            } catch (error) {
+                console.error('Error fetching full tree, downloading the loaded part:', error);
+            }
+        }
+
+        const dataStr = JSON.stringify(fullTree, null, 2);
         const dataBlob = new Blob([dataStr], { type: 'application/json' });
         const url = URL.createObjectURL(dataBlob);
         const link = document.createElement('a');
@@ -178,7 +200,12 @@ const TreeViewer = ({ treeData }) => {
     };
 
     // Function to expand/collapse all nodes
-    const ExpandableTreeNode = ({ node, depth = 0, index = 0, isLast = false, parentLines = [], forceExpand = false }) => {
+    const ExpandableTreeNode = ({ node, depth = 0, index = 0, isLast = false, parentLines = [], path = [], forceExpand = false }) => {
+        const pathKey = path.join('.');
+        const [children, setChildren] = useState(
+            () => loadedChildren.current.byPath[pathKey] || (node && node.children) || []
+        );
+        const [loading, setLoading] = useState(false);
         const [isOpen, setIsOpen] = useState(depth < 2);
 
         // Use effect to handle expand all
@@ -190,7 +217,31 @@ const TreeViewer = ({ treeData }) => {
 
         if (!node) return null;
 
-        const hasChildren = node.children && node.children.length > 0;
+        // Paged trees report their full child count before the children are loaded
+        const childCount = node.childCount !== undefined ? node.childCount : children.length;
+        const hasChildren = childCount > 0;
+
+        const loadChildren = async () => {
+            if (!searchId || loading) return;
+            setLoading(true);
+            try {
+                const page = await getTreeChildren(searchId, path, children.length, CHILDREN_PAGE_SIZE);
+                const loaded = [...children, ...page.children];
+                loadedChildren.current.byPath[pathKey] = loaded;
+                setChildren(loaded);
+            } catch (error) {
+                console.error('Error loading tree children:', error);
+            } finally {
+                setLoading(false);
+            }
+        };
+
+        const toggleOpen = () => {
+            if (!isOpen && children.length === 0) {
+                loadChildren();
+            }
+            setIsOpen(!isOpen);
+        };
 
         const getNodeColor = () => {
             if (node.type === 'root') return 'bg-purple-100 border-purple-400 text-purple-900';
@@ -233,7 +284,7 @@ const TreeViewer = ({ treeData }) => {
                     <div className="flex-shrink-0 mr-2">
                         {hasChildren ? (
                             <button
-                                onClick={() => setIsOpen(!isOpen)}
+                                onClick={toggleOpen}
                                 className="p-1 hover:bg-gray-200 rounded transition-colors"
                             >
                                 {isOpen ? (
@@ -296,7 +347,7 @@ const TreeViewer = ({ treeData }) => {
 
                             {hasChildren && (
                                 <div className="text-xs bg-white bg-opacity-70 px-3 py-1 rounded-full font-semibold">
-                                    {node.children.length} {node.children.length === 1 ? 'child' : 'children'}
+                                    {childCount} {childCount === 1 ? 'child' : 'children'}
                                 </div>
                             )}
                         </div>
@@ -305,17 +356,27 @@ const TreeViewer = ({ treeData }) => {
 
                 {hasChildren && isOpen && (
                     <div className="ml-6">
-                        {node.children.map((child, idx) => (
+                        {children.map((child, idx) => (
                             <ExpandableTreeNode
                                 key={`node-${depth}-${idx}`}
                                 node={child}
                                 depth={depth + 1}
                                 index={idx}
-                                isLast={idx === node.children.length - 1}
-                                parentLines={[...parentLines, idx < node.children.length - 1]}
+                                isLast={idx === childCount - 1}
+                                parentLines={[...parentLines, idx < childCount - 1]}
+                                path={[...path, idx]}
                                 forceExpand={forceExpand}
                             />
                         ))}
+                        {children.length < childCount && searchId && (
+                            <button
+                                onClick={loadChildren}
+                                disabled={loading}
+                                className="mb-3 px-3 py-1 text-xs bg-gray-100 text-gray-700 rounded-lg hover:bg-gray-200 transition-colors"
+                            >
+                                {loading ? 'Loading...' : `Load ${childCount - children.length} more`}
+                            </button>
+                        )}
                     </div>
                 )}
             </div>
@@ -396,7 +457,7 @@ const TreeViewer = ({ treeData }) => {
                 <div className="border-2 border-gray-200 rounded-lg p-4 bg-gray-50 max-h-[700px] overflow-auto">
                     {treeData ? (
                         <div className="font-sans text-sm">
-                            <ExpandableTreeNode node={treeData} depth={0} index={0} forceExpand={expandAll} />
+                            <ExpandableTreeNode key={searchId || 'tree'} node={treeData} depth={0} index={0} forceExpand={expandAll} />
                         </div>
                     ) : (
                         <div className="text-center py-12 text-gray-500">
@@ -9,7 +9,9 @@ export const API_BASE_URL = 'http://localhost:5000';
 export const API_ENDPOINTS = {
     MOVE: `${API_BASE_URL}/api/move`,
     HEALTH: `${API_BASE_URL}/api/health`,
-    SCORE: `${API_BASE_URL}/api/score`
+    SCORE: `${API_BASE_URL}/api/score`,
+    TREE: `${API_BASE_URL}/api/tree`,
+    JOBS: `${API_BASE_URL}/api/jobs`
 };
 
 // Game Configuration
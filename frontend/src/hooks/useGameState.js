@@ -20,7 +20,9 @@ export const useGameState = () => {
     const [isProcessing, setIsProcessing] = useState(false);
     const [lastMove, setLastMove] = useState(null);
     const [treeData, setTreeData] = useState(null);
+    const [treeSearchId, setTreeSearchId] = useState(null);
     const [moveStats, setMoveStats] = useState(null);
+    const [searchProgress, setSearchProgress] = useState(null);
 
     /**
      * Start a new game
@@ -34,7 +36,9 @@ export const useGameState = () => {
         setIsProcessing(false);
         setLastMove(null);
         setTreeData(null);
+        setTreeSearchId(null);
         setMoveStats(null);
+        setSearchProgress(null);
     }, []);
 
     /**
@@ -49,7 +53,9 @@ export const useGameState = () => {
         setIsProcessing(false);
         setLastMove(null);
         setTreeData(null);
+        setTreeSearchId(null);
         setMoveStats(null);
+        setSearchProgress(null);
     }, []);
 
     /**
@@ -81,6 +87,8 @@ export const useGameState = () => {
      */
     const setAIMoveData = useCallback((data) => {
         setTreeData(data.tree);
+        setTreeSearchId(data.searchId);
+        setSearchProgress(null);
         setMoveStats({
             nodesExpanded: data.nodesExpanded,
             timeTaken: data.timeTaken,
@@ -115,13 +123,16 @@ export const useGameState = () => {
         isProcessing,
         lastMove,
         treeData,
+        treeSearchId,
         moveStats,
+        searchProgress,
 
         // Actions
         startGame,
         resetGame,
         makeMove,
         setAIMoveData,
+        setSearchProgress,
         setProcessing,
         setCurrentPlayer,
         setScores
@@ -6,9 +6,11 @@ import { API_ENDPOINTS } from '../../config/config';
 /**
  * Get AI move from the backend
  * @param {Array} board - Current board state (2D array)
- * @param {string} algorithm - Algorithm to use ('minimax', 'minimax_alpha_beta', 'expectiminimax')
+ * @param {string} algorithm - Algorithm to use ('minimax', 'minimax_alpha_beta', 'expectiminimax', 'expectiminimax_star', 'weighted_alpha_beta', 'pvs', 'mtdf')
  * @param {number} depth - Depth limit (K value)
- * @returns {Promise<Object>} - Returns { column, tree, evaluation, stats }
+ * @returns {Promise<Object>} - Returns { column, tree, searchId, evaluation, stats }
+ *   The tree only holds its first level; deeper levels are fetched with
+ *   getTreeChildren using searchId
  */
 export const getAIMove = async (board, algorithm, depth) => {
     try {
@@ -30,21 +32,73 @@ export const getAIMove = async (board, algorithm, depth) => {
         }
 
         const data = await response.json();
+        console.log(data)
+        return toMoveData(data);
 
-        // Validate response
-        if (data.column === undefined || data.column === null) {
-            throw new Error('Invalid response: missing column');
+    } catch (error) {
+        console.error('Error getting AI move:', error);
+        throw new Error(`Failed to get AI move: ${error.message}`);
+    }
+};
+
+/**
+ * Shape a move response (from /api/move or a finished search job)
+ * @param {Object} data - Response fields
+ * @returns {Object} - { column, tree, searchId, evaluation, stats, ... }
+ */
+const toMoveData = (data) => {
+    // Validate response
+    if (data.column === undefined || data.column === null) {
+        throw new Error('Invalid response: missing column');
+    }
+    return {
+        column: data.column,
+        tree: data.tree || null,
+        searchId: data.searchId || null,
+        evaluation: data.evaluation || null,
+        stats: data.stats || null,
+        nodesExpanded: data.nodesExpanded || 0,
+        timeTaken: data.timeTaken || 0,
+        score: data.score
+    };
+};
+
+/**
+ * Get AI move through a background search job, reporting its progress
+ * @param {Array} board - Current board state (2D array)
+ * @param {string} algorithm - Algorithm to use (see getAIMove)
+ * @param {number} depth - Depth limit (K value)
+ * @param {Function} onProgress - Called with { depth, depthCompleted, nodesExpanded,
+ *   nodesPerSecond, bestColumn, evaluation, principalVariation, elapsed } while searching
+ * @returns {Promise<Object>} - Same as getAIMove
+ */
+export const getAIMoveWithProgress = async (board, algorithm, depth, onProgress) => {
+    try {
+        const response = await fetch(API_ENDPOINTS.JOBS, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                board: board,
+                algorithm: algorithm,
+                depth: depth,
+                player: 2 // AI player is always 2
+            }),
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
         }
-        console.log(data)
-        return {
-            column: data.column,
-            tree: data.tree || null,
-            evaluation: data.evaluation || null,
-            stats: data.stats || null,
-            nodesExpanded: data.nodesExpanded || 0,
-            timeTaken: data.timeTaken || 0,
-            score: data.score 
-        };
+
+        let job = await response.json();
+        if (job.status !== 'done') {
+            job = await waitForJob(job.jobId, onProgress);
+        }
+        if (job.status !== 'done') {
+            throw new Error(job.error || `search ${job.status}`);
+        }
+        return toMoveData(job.result);
 
     } catch (error) {
         console.error('Error getting AI move:', error);
@@ -52,6 +106,83 @@ export const getAIMove = async (board, algorithm, depth) => {
     }
 };
 
+/**
+ * Follow a search job's progress events until it finishes
+ * @param {string} jobId - Job to follow
+ * @param {Function} onProgress - Called with every progress event
+ * @returns {Promise<Object>} - The finished job
+ */
+const waitForJob = (jobId, onProgress) => new Promise((resolve, reject) => {
+    const events = new EventSource(`${API_ENDPOINTS.JOBS}/${jobId}/events`);
+
+    events.addEventListener('progress', (event) => {
+        if (onProgress) {
+            onProgress(JSON.parse(event.data));
+        }
+    });
+
+    events.addEventListener('done', (event) => {
+        events.close();
+        resolve(JSON.parse(event.data));
+    });
+
+    // The stream broke off: the job may still have finished
+    events.onerror = async () => {
+        events.close();
+        try {
+            const response = await fetch(`${API_ENDPOINTS.JOBS}/${jobId}`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const job = await response.json();
+            if (job.status === 'queued' || job.status === 'running') {
+                throw new Error('lost the search progress stream');
+            }
+            resolve(job);
+        } catch (error) {
+            reject(error);
+        }
+    };
+});
+
+/**
+ * Get a page of the children of a node of a search tree kept by the backend
+ * @param {string} searchId - searchId returned with the AI move
+ * @param {Array<number>} path - Child indices from the root to the node
+ * @param {number} offset - Index of the first child to return
+ * @param {number} limit - Number of children to return
+ * @returns {Promise<Object>} - Returns { children, total, offset }
+ */
+export const getTreeChildren = async (searchId, path, offset = 0, limit = 50) => {
+    const params = new URLSearchParams({
+        path: path.join('.'),
+        offset: String(offset),
+        limit: String(limit)
+    });
+    const response = await fetch(`${API_ENDPOINTS.TREE}/${searchId}/children?${params}`);
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return response.json();
+};
+
+/**
+ * Get the full search tree kept by the backend
+ * @param {string} searchId - searchId returned with the AI move
+ * @returns {Promise<Object>} - The complete tree
+ */
+export const getFullTree = async (searchId) => {
+    const response = await fetch(`${API_ENDPOINTS.TREE}/${searchId}`);
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return response.json();
+};
+
 /**
  * Test API connection
  * @returns {Promise<boolean>} - Returns true if connection successful
@@ -11,14 +11,22 @@ export const AI = 2;
 export const ALGORITHMS = {
     MINIMAX: 'minimax',
     MINIMAX_ALPHA_BETA: 'minimax_alpha_beta',
-    EXPECTIMINIMAX: 'expectiminimax'
+    EXPECTIMINIMAX: 'expectiminimax',
+    EXPECTIMINIMAX_STAR: 'expectiminimax_star',
+    WEIGHTED_ALPHA_BETA: 'weighted_alpha_beta',
+    PVS: 'pvs',
+    MTDF: 'mtdf'
 };
 
 // Algorithm display names
 export const ALGORITHM_NAMES = {
     [ALGORITHMS.MINIMAX]: 'Minimax (No Pruning)',
     [ALGORITHMS.MINIMAX_ALPHA_BETA]: 'Minimax with Alpha-Beta Pruning',
-    [ALGORITHMS.EXPECTIMINIMAX]: 'Expected Minimax'
+    [ALGORITHMS.EXPECTIMINIMAX]: 'Expected Minimax',
+    [ALGORITHMS.EXPECTIMINIMAX_STAR]: 'Expected Minimax with Star1/Star2 Pruning',
+    [ALGORITHMS.WEIGHTED_ALPHA_BETA]: 'Alpha-Beta with Weighted Heuristic',
+    [ALGORITHMS.PVS]: 'Principal Variation Search',
+    [ALGORITHMS.MTDF]: 'MTD(f)'
 };
 
 // Default settings